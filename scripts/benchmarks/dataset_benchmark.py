@@ -0,0 +1,79 @@
+import random
+import time
+from typing import Callable
+
+from torch.utils.data import DataLoader
+
+from src.tabular_sense.components.collate import collate_fn
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.components.dataset import ColumnDataset, TokenizedColumnSample, TokenizedColumnDataset, \
+    worker_init_fn
+from src.tabular_sense.components.tokenizer import Tokenizer
+from src.tabular_sense.path import get_data_dir
+
+# 参与测量的批次数
+N_BATCHES = 200
+
+
+def legacy_getitem(dataset: ColumnDataset, idx: int) -> TokenizedColumnSample:
+    """改造前的读取方式：每个样本 open + seek + readline + close"""
+
+    _file = dataset.sample_file.open("r", encoding="utf-8")
+    _file.seek(int(dataset.offsets[idx]))
+    sample = _file.readline().strip()
+    _file.close()
+
+    return dataset._parse(sample)
+
+
+def measure(label: str, batches: list[list[int]], fetch: Callable[[list[int]], object]) -> float:
+    start = time.perf_counter()
+    for batch in batches:
+        fetch(batch)
+    samples_per_second = sum(map(len, batches)) / (time.perf_counter() - start)
+
+    print(f"    {label}: {samples_per_second:.0f} samples/s")
+    return samples_per_second
+
+
+def main():
+    config = Config.final()
+    tokenizer = Tokenizer()
+    sample_file = get_data_dir() / "samples/samples.txt"
+    dataset = ColumnDataset(sample_file, tokenizer, config)
+
+    indices = list(range(len(dataset)))
+    random.shuffle(indices)
+    batches = [indices[start:start + config.batch_size] for start in
+               range(0, N_BATCHES * config.batch_size, config.batch_size)]
+
+    print("=" * 60)
+    print(f"📏 单进程读取 {N_BATCHES}×{config.batch_size} 个样本")
+    baseline = measure("逐样本open/close", batches, lambda batch: [legacy_getitem(dataset, idx) for idx in batch])
+    persistent = measure("持久内存映射", batches, lambda batch: [dataset[idx] for idx in batch])
+    batched = measure("持久内存映射+批量读取", batches, dataset.__getitems__)
+
+    tokenized = TokenizedColumnDataset(sample_file, tokenizer, config)
+    pretokenized = measure("预tokenized", batches, lambda batch: [tokenized[idx] for idx in batch])
+
+    print(f"    加速: 持久映射×{persistent / baseline:.2f} | 批量读取×{batched / baseline:.2f} | "
+          f"预tokenized×{pretokenized / baseline:.2f}")
+
+    print("=" * 60)
+    print("📏 DataLoader（4 workers）")
+    loader = DataLoader(
+        dataset=dataset,
+        collate_fn=collate_fn,
+        batch_sampler=batches,
+        num_workers=4,
+        worker_init_fn=worker_init_fn,
+    )
+    start = time.perf_counter()
+    for _ in loader:
+        pass
+    print(f"    端到端: {N_BATCHES * config.batch_size / (time.perf_counter() - start):.0f} samples/s")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
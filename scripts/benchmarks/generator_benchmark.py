@@ -0,0 +1,72 @@
+import time
+from functools import partial
+from typing import Callable
+
+# constants须先于各生成器模块导入：constants注册全部生成器，单独先导入某个生成器模块会经sample_utils循环导入
+from src.tabular_sense.core.constants import VARIANT_TYPES, SEED_TYPES, RAW_CORPUS_PER_INPUT, RANDOM_SEED
+from scripts.corpus_generators.email_generator import generate_email
+from scripts.corpus_generators.job_generator import generate_job
+from scripts.corpus_generators.url_generator import generate_url
+from scripts.corpus_generators.useragent_generator import generate_useragent
+from scripts.corpus_generators.username_generator import generate_username
+from scripts.generator_context import derive_seed, generator_context
+from scripts.providers import get_faker, load_bin_table, load_areas
+
+# 每个生成器在每种模式下的测量时长，单位秒
+SECONDS_PER_RUN = 0.5
+
+# 语料生成器逐个生成值的函数；name在一次调用内生成整份语料，不单独测量
+CORPUS_SUPPLIERS: dict[str, Callable[[], str]] = {
+    "email": generate_email,
+    "job": generate_job,
+    "url": generate_url,
+    "useragent": generate_useragent,
+    "username": generate_username,
+}
+
+
+def clear_providers():
+    """清空共享提供者的缓存，下次调用时重新构建Faker实例、重新解析种子文件"""
+
+    get_faker.cache_clear()
+    load_bin_table.cache_clear()
+    load_areas.cache_clear()
+
+
+def measure(supplier: Callable[[], str | list[str]], rebuild: bool) -> float:
+    """
+    :param rebuild: 每次调用前清空提供者缓存，即引入提供者之前每次调用都构建Faker、解析种子文件的开销
+    :return: 每秒生成的值数
+    """
+
+    values = 0
+    start = time.perf_counter()
+
+    while (elapsed := time.perf_counter() - start) < SECONDS_PER_RUN:
+        if rebuild:
+            clear_providers()
+
+        result = supplier()
+        values += len(result) if isinstance(result, list) else 1
+
+    return values / elapsed
+
+
+def main():
+    suppliers: dict[str, Callable[[], str | list[str]]] = {
+        **CORPUS_SUPPLIERS,
+        **{name: partial(generator, RAW_CORPUS_PER_INPUT) for name, generator in {**VARIANT_TYPES, **SEED_TYPES}.items()},
+    }
+
+    print(f"{'生成器':<12}{'每次重建 values/s':>20}{'共享 values/s':>16}{'加速':>8}")
+    for name, supplier in suppliers.items():
+        # 模块级的Faker实例（email、url）不受缓存清空影响，两种模式相同
+        with generator_context(derive_seed(RANDOM_SEED, "benchmark", name)):
+            rebuilt = measure(supplier, rebuild=True)
+            shared = measure(supplier, rebuild=False)
+
+        print(f"{name:<12}{rebuilt:>20.0f}{shared:>16.0f}{shared / rebuilt:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
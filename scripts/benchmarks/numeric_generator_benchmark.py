@@ -0,0 +1,388 @@
+"""
+数值类变体生成器的吞吐量与分布检验
+
+吞吐量：每次调用生成10个值（与生成样本时相同）与一次生成大批量值时的每秒生成值数。
+分布检验：按生成器规定的分布做单样本KS检验与卡方检验，p值过小说明生成的分布与规定不符。
+两样本检验：同一格式/变体下，向量化之前的基线生成器（取自git历史）与当前生成器的输出比较
+形状（数字串折叠后的格式）、长度与首个数值的分布，p值过小说明向量化改变了输出分布。
+"""
+import math
+import re
+import subprocess
+import time
+from collections import Counter
+from functools import partial
+from types import ModuleType
+from typing import Callable, Hashable
+
+import numpy as np
+from numpy.typing import NDArray
+
+from scripts.generator_context import derive_seed, generator_context
+from scripts.variant_generators.age_generator import ages
+from scripts.variant_generators.amount_generator import VARIANT_WEIGHTS, AmountGenerator, amounts
+from scripts.variant_generators.coordinate_generator import (
+    COORDINATE_FORMATS, coordinates, format_coordinate_variants, generate_coordinates
+)
+from scripts.variant_generators.float_generator import floats, generate_random_float_literals
+from scripts.variant_generators.int_generator import ints, generate_random_int_literals
+from scripts.variant_generators.percent_generator import (
+    DECIMAL_FORMATS, EXPLICIT_FORMATS, NUMERIC_FORMATS, VALUE_RANGES, generate_decimal_format,
+    generate_explicit_format, generate_numeric_format, percentage_values, percents
+)
+from scripts.variant_generators.phone_generator import PhoneFormat, PhoneGenerator, phones
+from src.tabular_sense.core.constants import RANDOM_SEED
+from src.tabular_sense.path import get_project_root
+
+# 每个生成器在每种批量下的测量时长，单位秒
+SECONDS_PER_RUN = 0.5
+
+# 吞吐量测量的批量：生成样本时每次调用的数量与大批量
+BATCH_SIZES = (10, 100000)
+
+# 分布检验的样本量与显著性水平
+SAMPLE_SIZE = 200000
+SIGNIFICANCE = 0.001
+
+# 两样本检验的基线：NumPy向量化之前的提交，及每侧的样本量
+BASELINE_REVISION = "b84dbb2^"
+TWO_SAMPLE_SIZE = 20000
+
+# 首个数值：千分位分隔符去除后的无符号十进制数
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+DIGIT_SEPARATOR_PATTERN = re.compile(r"(?<=\d)[,_ ](?=\d)")
+
+GENERATORS: dict[str, Callable[[int], list[str]]] = {
+    "int": ints,
+    "float": floats,
+    "percent": percents,
+    "age": ages,
+    "amount": amounts,
+    "coordinate": coordinates,
+    "phone": phones,
+}
+
+
+def measure(generator: Callable[[int], list[str]], num: int) -> float:
+    """:return: 每秒生成的值数"""
+
+    values = 0
+    start = time.perf_counter()
+
+    while (elapsed := time.perf_counter() - start) < SECONDS_PER_RUN:
+        values += len(generator(num))
+
+    return values / elapsed
+
+
+def ks_test(samples: NDArray[np.float64], cdf: Callable[[NDArray[np.float64]], NDArray[np.float64]]) -> float:
+    """单样本KS检验，p值使用Kolmogorov分布的渐近近似（含小样本修正）"""
+
+    n = len(samples)
+    # [n]
+    expected = cdf(np.sort(samples))
+    statistic = max((np.arange(1, n + 1) / n - expected).max(), (expected - np.arange(n) / n).max())
+
+    return kolmogorov_p(math.sqrt(n), statistic)
+
+
+def ks_two_sample(a: NDArray[np.float64], b: NDArray[np.float64]) -> float:
+    """两样本KS检验，任一侧为空时为nan"""
+
+    if not len(a) or not len(b):
+        return math.nan
+
+    a, b = np.sort(a), np.sort(b)
+    # 两个经验分布函数在所有样本点上的最大差
+    values = np.concatenate([a, b])
+    statistic = np.abs(np.searchsorted(a, values, "right") / len(a)
+                       - np.searchsorted(b, values, "right") / len(b)).max()
+    return kolmogorov_p(math.sqrt(len(a) * len(b) / (len(a) + len(b))), statistic)
+
+
+def kolmogorov_p(effective_n: float, statistic: float) -> float:
+    """KS统计量的p值，使用Kolmogorov分布的渐近近似（含小样本修正）"""
+
+    lam = (effective_n + 0.12 + 0.11 / effective_n) * statistic
+    # 级数在lam趋于0时不收敛，lam < 0.2时p值与1的差小于1e-20
+    if lam < 0.2:
+        return 1.0
+
+    p_value = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam) for k in range(1, 101))
+    return min(max(p_value, 0.0), 1.0)
+
+
+def chi_square_test(observed: NDArray[np.int64], probabilities: NDArray[np.float64]) -> float:
+    """卡方拟合优度检验"""
+
+    expected = probabilities / probabilities.sum() * observed.sum()
+    return chi_square_p(float(((observed - expected) ** 2 / expected).sum()), len(observed) - 1)
+
+
+def homogeneity_test(a: list[Hashable], b: list[Hashable]) -> float:
+    """两样本的类别分布是否相同：2×k列联表的卡方检验，两侧期望频数都不少于5的类别单独成列，其余合并为一列"""
+
+    counts = Counter(a), Counter(b)
+    share = min(len(a), len(b)) / (len(a) + len(b))
+    common = [category for category, total in (counts[0] + counts[1]).items() if total * share >= 5]
+
+    # [2, k]
+    observed = np.array([[count[category] for category in common] for count in counts], dtype=np.float64)
+    rest = np.array([len(a), len(b)]) - observed.sum(axis=1)
+    if rest.sum() * share >= 5:
+        observed = np.column_stack([observed, rest])
+
+    if observed.shape[1] < 2:
+        return 1.0
+
+    expected = observed.sum(axis=1, keepdims=True) * observed.sum(axis=0) / observed.sum()
+    return chi_square_p(float(((observed - expected) ** 2 / expected).sum()), observed.shape[1] - 1)
+
+
+def chi_square_p(statistic: float, k: int) -> float:
+    """自由度为k的卡方统计量的p值，使用Wilson–Hilferty近似"""
+
+    z = ((statistic / k) ** (1 / 3) - (1 - 2 / (9 * k))) / math.sqrt(2 / (9 * k))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def uniform_cdf(low: float, high: float) -> Callable[[NDArray[np.float64]], NDArray[np.float64]]:
+    return lambda x: np.clip((x - low) / (high - low), 0, 1)
+
+
+def mixture_cdf(ranges: NDArray[np.float64]) -> Callable[[NDArray[np.float64]], NDArray[np.float64]]:
+    """等概率混合的均匀分布，ranges为[k, 2]的区间"""
+    return lambda x: np.mean([uniform_cdf(low, high)(x) for low, high in ranges], axis=0)
+
+
+def count_values(values: NDArray[np.int64], low: int, high: int) -> NDArray[np.int64]:
+    """[high - low + 1]，low~high各整数的出现次数"""
+    return np.bincount(values - low, minlength=high - low + 1)
+
+
+def parse_floats(samples: list[str]) -> NDArray[np.float64]:
+    return np.array(samples, dtype=np.float64)
+
+
+def jitter(values: NDArray[np.float64]) -> NDArray[np.float64]:
+    """整数加[0, 1)均匀抖动，离散均匀分布变为连续均匀分布，以便KS检验"""
+    return values + np.random.default_rng(RANDOM_SEED).random(len(values))
+
+
+def distribution_checks() -> dict[str, float]:
+    """:return: 检验名 -> p值"""
+
+    n = SAMPLE_SIZE
+    amount_generator = AmountGenerator()
+    checks: dict[str, Callable[[], float]] = {
+        # 年龄：1~120均匀
+        "age 1~120": lambda: chi_square_test(
+            count_values(np.array([int(re.search(r"\d+", age)[0]) for age in ages(n)]), 1, 120), np.ones(120)),
+
+        # 整数：小数字-1000~1000均匀，普通十进制为位数1~19均匀、值在±10**位数上均匀的混合，十六进制0~2**32均匀
+        "int small": lambda: chi_square_test(
+            count_values(np.array(generate_random_int_literals(8, n), dtype=np.int64), -1000, 1000), np.ones(2001)),
+        "int decimal": lambda: ks_test(
+            jitter(parse_floats(generate_random_int_literals(1, n))),
+            mixture_cdf(np.array([(-10.0 ** d, 10.0 ** d + 1) for d in range(1, 20)]))),
+        "int hex": lambda: ks_test(
+            np.array([int(value, 16) for value in generate_random_int_literals(2, n)], dtype=np.float64),
+            uniform_cdf(0, 2 ** 32)),
+        "int hex underscore": lambda: ks_test(
+            np.array([int(value, 16) for value in generate_random_int_literals(7, n)], dtype=np.float64),
+            uniform_cdf(0, 2 ** 32)),
+
+        # 浮点数：普通小数在±10**15上均匀，超多小数位在[0, 1)上均匀，科学计数法指数-50~50均匀
+        "float decimal": lambda: ks_test(
+            parse_floats(generate_random_float_literals(1, n)), uniform_cdf(-10 ** 15, 10 ** 15)),
+        "float fraction": lambda: ks_test(parse_floats(generate_random_float_literals(8, n)), uniform_cdf(0, 1)),
+        "float exponent": lambda: chi_square_test(
+            count_values(np.array([abs(int(re.split("[eE]", value)[1]))
+                                   for value in generate_random_float_literals(2, n)]), 0, 50),
+            np.r_[1, np.full(50, 2)]),  # 符号独立随机，只检验指数绝对值
+
+        # 百分比：5种区间等概率混合
+        "percent": lambda: ks_test(
+            parse_floats(generate_numeric_format(percentage_values(n), 1)), mixture_cdf(VALUE_RANGES)),
+
+        # 坐标：纬度±90、经度±180均匀，度分秒还原后的纬度绝对值在0~90上均匀
+        "coordinate lat": lambda: ks_test(
+            parse_floats([value.split(",")[0] for value in coordinates_with_format(5, n)]), uniform_cdf(-90, 90)),
+        "coordinate lon": lambda: ks_test(
+            parse_floats([value.split(",")[1] for value in coordinates_with_format(5, n)]), uniform_cdf(-180, 180)),
+        "coordinate dms": lambda: ks_test(
+            np.array([dms_to_dd(value) for value in coordinates_with_format(14, n)]), uniform_cdf(0, 90)),
+
+        # 手机号：运营商代码3~9均匀，后9位每位0~9均匀
+        "phone carrier": lambda: chi_square_test(
+            count_values(np.array([int(phone[1]) for phone in PhoneGenerator()(PhoneFormat.STANDARD, n)]), 3, 9),
+            np.ones(7)),
+        "phone digits": lambda: chi_square_test(
+            count_values(np.frombuffer("".join(
+                phone[2:] for phone in PhoneGenerator()(PhoneFormat.STANDARD, n)).encode(), dtype=np.uint8) - 48, 0, 9),
+            np.ones(10)),
+
+        # 金额：标准格式无符号0.5、正号0.25、负号0.225、会计记账法0.025；普通数字为[0, 7)上均匀值的10次方
+        "amount sign": lambda: chi_square_test(
+            np.bincount([amount_sign(value) for value in amount_generator._generate_standard(n)], minlength=4),
+            np.array([0.5, 0.25, 0.225, 0.025])),
+        "amount number": lambda: ks_test(
+            amount_numbers(amount_generator, n), lambda x: np.clip((x ** 0.1 - 1) / 6, 0, 1)),
+    }
+
+    p_values = {}
+    for name, check in checks.items():
+        with generator_context(derive_seed(RANDOM_SEED, "distribution", name)):
+            p_values[name] = check()
+
+    return p_values
+
+
+def load_baseline(name: str) -> ModuleType:
+    """从BASELINE_REVISION加载向量化之前的生成器模块，基线模块只依赖标准库"""
+
+    path = f"scripts/variant_generators/{name}_generator.py"
+    source = subprocess.run(
+        ["git", "show", f"{BASELINE_REVISION}:{path}"],
+        cwd=get_project_root(), capture_output=True, encoding="utf-8", check=True,
+    ).stdout
+
+    module = ModuleType(f"baseline_{name}_generator")
+    exec(compile(source, f"{BASELINE_REVISION}:{path}", "exec"), module.__dict__)
+    return module
+
+
+def per_value(generate: Callable[[], str]) -> Callable[[int], list[str]]:
+    """逐值生成的基线函数包装为一次生成num个值"""
+    return lambda num: [generate() for _ in range(num)]
+
+
+def variant_pairs() -> dict[str, tuple[Callable[[int], list[str]], Callable[[int], list[str]]]]:
+    """:return: 检验名 -> (基线生成器, 当前生成器)，两者生成同一格式/变体的num个值"""
+
+    baseline = {name: load_baseline(name) for name in ("int", "float", "percent", "age", "amount", "coordinate", "phone")}
+    pairs: dict[str, tuple[Callable[[int], list[str]], Callable[[int], list[str]]]] = {}
+
+    for strategy in range(1, 9):
+        pairs[f"int {strategy}"] = (per_value(partial(baseline["int"].generate_random_int_literal, strategy)),
+                                    partial(generate_random_int_literals, strategy))
+
+    for strategy in range(1, 11):
+        pairs[f"float {strategy}"] = (per_value(partial(baseline["float"].generate_random_float_literal, strategy)),
+                                      partial(generate_random_float_literals, strategy))
+
+    for representation, formats, generate in (("explicit", EXPLICIT_FORMATS, generate_explicit_format),
+                                              ("decimal", DECIMAL_FORMATS, generate_decimal_format),
+                                              ("numeric", NUMERIC_FORMATS, generate_numeric_format)):
+        for strategy in range(len(formats)):
+            pairs[f"percent {representation} {strategy}"] = (
+                per_value(partial(baseline["percent"].generate_percentage, representation, strategy)),
+                lambda num, generate=generate, strategy=strategy: generate(percentage_values(num), strategy),
+            )
+
+    # 年龄的格式在ages内部按调用选择，每次生成1个值，比较各格式混合后的分布
+    pairs["age"] = (per_value(lambda: baseline["age"].ages(1)[0]), per_value(lambda: ages(1)[0]))
+
+    for variant in VARIANT_WEIGHTS:
+        pairs[f"amount {variant}"] = (
+            per_value(getattr(baseline["amount"].AmountGenerator(), f"_generate_{variant}")),
+            getattr(AmountGenerator(), f"_generate_{variant}"),
+        )
+
+    for coordinate_format in range(len(COORDINATE_FORMATS)):
+        pairs[f"coordinate {coordinate_format}"] = (
+            per_value(lambda coordinate_format=coordinate_format: baseline["coordinate"].format_coordinate_variants(
+                *baseline["coordinate"].generate_coordinate(china_only=False), coordinate_format)),
+            partial(coordinates_with_format, coordinate_format),
+        )
+
+    for phone_format in PhoneFormat:
+        pairs[f"phone {phone_format.name.lower()}"] = (
+            per_value(partial(baseline["phone"].PhoneGenerator(), baseline["phone"].PhoneFormat[phone_format.name])),
+            partial(PhoneGenerator(), phone_format),
+        )
+
+    return pairs
+
+
+def shape(value: str) -> str:
+    """数字串折叠为9后的格式，保留符号、分隔符、单位与数字串的个数"""
+    return re.sub(r"\d+", "9", value)
+
+
+def leading_numbers(samples: list[str]) -> NDArray[np.float64]:
+    """各样本中的首个数值，不含数值的样本跳过"""
+
+    numbers = [NUMBER_PATTERN.search(DIGIT_SEPARATOR_PATTERN.sub("", sample)) for sample in samples]
+    return np.array([float(number[0]) for number in numbers if number], dtype=np.float64)
+
+
+def two_sample_checks() -> dict[str, tuple[float, float, float]]:
+    """:return: 检验名 -> 形状、长度与首个数值的p值，没有数值时数值的p值为nan"""
+
+    p_values = {}
+    for name, (baseline, current) in variant_pairs().items():
+        with generator_context(derive_seed(RANDOM_SEED, "two-sample", name, "baseline")):
+            expected = baseline(TWO_SAMPLE_SIZE)
+        with generator_context(derive_seed(RANDOM_SEED, "two-sample", name, "current")):
+            observed = current(TWO_SAMPLE_SIZE)
+
+        p_values[name] = (
+            homogeneity_test(list(map(shape, expected)), list(map(shape, observed))),
+            homogeneity_test(list(map(len, expected)), list(map(len, observed))),
+            ks_two_sample(leading_numbers(expected), leading_numbers(observed)),
+        )
+
+    return p_values
+
+
+def coordinates_with_format(coordinate_format: int, num: int) -> list[str]:
+    return format_coordinate_variants(*generate_coordinates(num, china_only=False), coordinate_format)
+
+
+def dms_to_dd(value: str) -> float:
+    """'25°39'25.44"N,...'中纬度的十进制度"""
+    d, m, s = re.match(r"(\d+)°(\d+)'([\d.]+)\"", value).groups()
+    return int(d) + int(m) / 60 + float(s) / 3600
+
+
+def amount_numbers(generator: AmountGenerator, num: int) -> NDArray[np.float64]:
+    """
+    普通数字变体中不小于1的浮点输出
+
+    取整输出会向下截断，保留5位小数会在0附近形成离散点，只检验其余部分：[1, 7**10)上的条件分布
+    """
+
+    numbers = parse_floats([value for value in generator._generate_number(num) if not value.isdigit()])
+    return numbers[numbers >= 1]
+
+
+def amount_sign(value: str) -> int:
+    """0：无符号，1：正号，2：负号，3：会计记账法"""
+    if value.startswith("("):
+        return 3
+    return 1 if "+" in value else 2 if "-" in value else 0
+
+
+def main():
+    print(f"{'生成器':<12}" + "".join(f"{f'num={num} values/s':>24}" for num in BATCH_SIZES))
+    for name, generator in GENERATORS.items():
+        with generator_context(derive_seed(RANDOM_SEED, "benchmark", name)):
+            throughputs = [measure(generator, num) for num in BATCH_SIZES]
+
+        print(f"{name:<12}" + "".join(f"{throughput:>24.0f}" for throughput in throughputs))
+
+    print()
+    print(f"{'分布检验':<20}{'p值':>12}")
+    for name, p_value in distribution_checks().items():
+        print(f"{name:<20}{p_value:>12.4f}" + ("" if p_value >= SIGNIFICANCE else "  不符合规定分布"))
+
+    print()
+    print(f"{'两样本检验':<24}{'形状p值':>10}{'长度p值':>10}{'数值p值':>10}")
+    for name, p_values in two_sample_checks().items():
+        print(f"{name:<28}" + "".join(f"{p_value:>13.4f}" for p_value in p_values)
+              + ("  与基线不一致" if any(p_value < SIGNIFICANCE for p_value in p_values) else ""))
+
+
+if __name__ == '__main__':
+    main()
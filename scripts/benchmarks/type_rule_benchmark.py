@@ -0,0 +1,35 @@
+import time
+
+from src.tabular_sense.core.constants import VARIANT_TYPES, RAW_CORPUS_PER_INPUT
+from src.tabular_sense.core.type_rule import infer_possible_types, infer_possible_types_batch
+
+# 每种变体类型生成的输入组数
+INPUTS_PER_TYPE = 2000
+
+
+def main():
+    columns: list[list[str]] = []
+    for vocab_type, generator in VARIANT_TYPES.items():
+        columns.extend(generator(RAW_CORPUS_PER_INPUT) for _ in range(INPUTS_PER_TYPE))
+
+    print(f"共{len(columns)}组输入，每组{RAW_CORPUS_PER_INPUT}个值")
+
+    start = time.perf_counter()
+    expected = [infer_possible_types(column) for column in columns]
+    baseline = time.perf_counter() - start
+    print(f"逐组推断: {baseline:.3f}s")
+
+    start = time.perf_counter()
+    actual = infer_possible_types_batch(columns)
+    vectorized = time.perf_counter() - start
+    print(f"向量化推断: {vectorized:.3f}s，加速{baseline / vectorized:.1f}倍")
+
+    mismatches = sum(e != a for e, a in zip(expected, actual))
+    if mismatches:
+        raise AssertionError(f"{mismatches}组输入的推断结果不一致")
+
+    print("推断结果一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import json
 import random
 
 import sentencepiece as spm
@@ -54,11 +55,17 @@ def verify() -> tuple[int, float]:
     samples_per_type = 3000
     test_cases = []
 
+    # 按manifest将各类型的分片归组
+    manifest = json.loads((samples_dir / "manifest.json").read_text(encoding="utf-8"))
+    type_shards: dict[str, list[str]] = {}
+    for entry in manifest["shards"]:
+        type_shards.setdefault(entry["type"], []).append(entry["file"])
+
     print("loading test cases...")
-    for file in samples_dir.iterdir():
-        if not file.name.startswith("samples"):
-            test_cases.extend(random.choices(file.read_text(encoding="utf-8").splitlines(), k=samples_per_type))
-            print(f"file {file.name} loaded")
+    for type_name, files in type_shards.items():
+        lines = [line for file in files for line in (samples_dir / "shards" / file).read_text(encoding="utf-8").splitlines()]
+        test_cases.extend(random.choices(lines, k=samples_per_type))
+        print(f"type {type_name} loaded")
     print("test cases loaded")
 
     # 评估指标
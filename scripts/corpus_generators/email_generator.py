@@ -1,11 +1,9 @@
-from random import Random
-
-from faker import Faker
+import random
 
+from scripts.providers import get_faker
 from scripts.sample_utils import corpus_saver, corpus_constructor
 
-faker = Faker("zh_CN")
-rng = Random()
+faker = get_faker("zh_CN")
 
 EMAIL_DOMAINS = [
     'qq.com',
@@ -52,6 +50,10 @@ EMAIL_DOMAINS = [
 ]
 
 
+def generate_email() -> str:
+    return f"{faker.user_name()}@{random.choice(EMAIL_DOMAINS)}"
+
+
 def emails(num: int):
-    samples = corpus_constructor("email", num, lambda: f"{faker.user_name()}@{rng.choice(EMAIL_DOMAINS)}")
+    samples = corpus_constructor("email", num, generate_email)
     corpus_saver("email", "\n".join(samples))
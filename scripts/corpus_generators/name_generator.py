@@ -1,7 +1,6 @@
-from random import Random
-
-from faker import Faker
+import random
 
+from scripts.providers import get_faker
 from scripts.sample_utils import corpus_saver
 from src.tabular_sense.path import get_data_dir
 
@@ -21,9 +20,8 @@ def names(num: int):
     data_dir = get_data_dir()
     en_radio = 0.1
 
-    rng = Random()
-    faker_zh = Faker("zh_CN")
-    faker_en = Faker("en_US")
+    faker_zh = get_faker("zh_CN")
+    faker_en = get_faker("en_US")
 
     # 初始填充复姓
     samples: list[str] = [*(data_dir / "seed/compound_names.txt").open(encoding="utf-8").read().splitlines()]
@@ -47,14 +45,14 @@ def names(num: int):
     zh_compound_count = compound_name_num
 
     for i in range(num - compound_name_num):
-        if rng.random() < en_radio:
+        if random.random() < en_radio:
             en_count += 1
             samples.append(faker_en.name())
         else:
             zh_count += 1
-            if rng.random() < convert_compound_radio:
+            if random.random() < convert_compound_radio:
                 zh_compound_count += 1
-                surname = rng.choice(COMPOUND_SURNAMES)
+                surname = random.choice(COMPOUND_SURNAMES)
                 given_name = faker_zh.name()[1:]
                 samples.append(surname + given_name)
             else:
@@ -70,6 +68,6 @@ def names(num: int):
     print(f"  中文: {zh_count} ({zh_count / len(samples) * 100:.2f}%)")
     print(f"  复姓: {zh_compound_count} ({zh_compound_count / zh_count * 100:.2f}% of 中文)")
     print(f"  期望复姓比例: {COMPOUND_RADIO * 100}%")
-    rng.shuffle(samples)
+    random.shuffle(samples)
 
     corpus_saver("name", "\n".join(samples))
@@ -1,11 +1,10 @@
 import random
 from urllib.parse import urlencode
 
-from faker import Faker
-
+from scripts.providers import get_faker
 from scripts.sample_utils import corpus_constructor, corpus_saver
 
-faker = Faker("zh_CN")
+faker = get_faker("zh_CN")
 
 # 协议分布
 PROTOCOLS = [
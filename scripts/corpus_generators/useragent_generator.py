@@ -1,15 +1,11 @@
 import random
 
-from faker import Faker
-
+from scripts.providers import get_faker
 from scripts.sample_utils import corpus_constructor, corpus_saver
 
 
 def generate_useragent() -> str:
-    if random.random() > 0.5:
-        faker = Faker("zh")
-    else:
-        faker = Faker("en")
+    faker = get_faker("zh") if random.random() > 0.5 else get_faker("en")
 
     return faker.user_agent()
 
@@ -0,0 +1,91 @@
+"""
+数据生成的随机上下文
+
+所有生成器只使用全局random模块、Faker的共享随机源与numpy_rng()，不持有私有的随机源，
+由generator_context在每个生成任务开始时按种子统一重置，生成结果只取决于种子。
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Sequence, TypeVar
+
+import numpy as np
+from faker import Faker
+from numpy.typing import NDArray
+
+# 日期时间类生成器的参考"当前时间"，使生成结果与运行日期无关
+REFERENCE_TIME = datetime(2025, 10, 30)
+
+T = TypeVar("T")
+
+# 向量化生成器的NumPy随机源，与random模块一样为进程内全局状态
+_numpy_rng = np.random.default_rng()
+
+
+def derive_seed(seed: int, *keys: str | int) -> int:
+    """
+    由基础种子与任务键（类型名、分片序号等）派生64位种子
+
+    使用sha256而非hash()，结果不受PYTHONHASHSEED与进程影响。
+    基础种子由调用方传入：生成器模块经constants注册，本模块不能反向依赖constants
+    """
+
+    digest = hashlib.sha256(":".join(str(key) for key in (seed, *keys)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def numpy_rng() -> np.random.Generator:
+    """当前的NumPy随机源，向量化生成器每次调用时获取，不应长期持有"""
+    return _numpy_rng
+
+
+def uniform_ints(low: int, high: int, num: int) -> NDArray[np.int64]:
+    """
+    [num]，low~high（含两端）上均匀的整数，范围high - low不超过2**32
+
+    由一次random()缩放取整得到。生成器每次只抽取约10个值，Generator.integers与choice的单次调用开销是其数倍；
+    53位精度的均匀浮点数在该范围内取整，各整数的概率相对差异不超过2**-20
+    """
+    return low + (_numpy_rng.random(num) * (high - low + 1)).astype(np.int64)
+
+
+def choose(options: Sequence[T], num: int) -> list[T]:
+    """[num]，从options中等概率有放回地抽取"""
+    return list(map(options.__getitem__, uniform_ints(0, len(options) - 1, num).tolist()))
+
+
+def uniform_table(sizes: Sequence[int], num: int, n_continuous: int = 0) \
+        -> tuple[NDArray[np.int64], NDArray[np.float64]]:
+    """
+    一次抽取一个变体所需的全部随机数
+
+    每个NumPy调用约有1微秒的固定开销，每次只生成约10个值时，逐字段调用uniform_ints与choose的开销占了大部分耗时；
+    这里只调用一次random()，离散字段再一次缩放取整，与逐字段抽取的分布相同
+
+    :param sizes: 各离散字段的取值个数，范围同uniform_ints不超过2**32
+    :param n_continuous: [0, 1)上均匀的连续字段数
+    :return: tuple[[len(sizes), num]，第i行为0~sizes[i]-1上均匀的整数, [n_continuous, num]的均匀浮点数]
+    """
+
+    uniforms = _numpy_rng.random((len(sizes) + n_continuous, num))
+    discrete = (uniforms[:len(sizes)] * np.array(sizes, dtype=np.float64)[:, None]).astype(np.int64)
+    return discrete, uniforms[len(sizes):]
+
+
+@contextmanager
+def generator_context(seed: int):
+    """在上下文内以seed重置random模块、Faker的共享随机源与NumPy随机源，退出时恢复random模块与NumPy随机源"""
+
+    global _numpy_rng
+
+    state = random.getstate()
+    previous_rng = _numpy_rng
+    random.seed(seed)
+    Faker.seed(seed)
+    _numpy_rng = np.random.default_rng(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+        _numpy_rng = previous_rng
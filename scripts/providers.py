@@ -0,0 +1,50 @@
+"""
+生成器共享的数据提供者
+
+Faker实例与种子数据在进程内只构建、解析一次，各生成器复用同一份。Faker实例不单独设置种子，
+均使用Faker的共享随机源，由generator_context统一重置，复用实例不影响生成结果。
+
+get_data_dir在加载函数内导入：导入src.tabular_sense会经constants导入各生成器，而生成器又导入本模块，
+模块级导入会形成循环导入。
+"""
+import csv
+from functools import lru_cache
+
+from faker import Faker
+
+
+@lru_cache(maxsize=None)
+def get_faker(locale: str) -> Faker:
+    """按locale缓存的Faker实例"""
+    return Faker(locale)
+
+
+@lru_cache(maxsize=1)
+def load_bin_table() -> tuple[dict[str, str], ...]:
+    """银行卡BIN表（seed/bank-bin.csv）"""
+
+    from src.tabular_sense.path import get_data_dir
+
+    with open(get_data_dir() / "seed/bank-bin.csv", "r", encoding="utf-8") as f:
+        return tuple(
+            {
+                'bank_name': row[0],  # 银行名
+                'bank_code': row[1],  # 机构代码
+                'bank_abbr': row[2],  # 英文简称
+                'card_name': row[3],  # 卡名
+                'card_type': row[4],  # 卡类型代码
+                'card_length': row[5],  # 卡号长度
+                'bin': row[6],  # BIN
+                'bin_length': row[7],  # BIN长度
+            }
+            for row in csv.reader(f)
+        )
+
+
+@lru_cache(maxsize=1)
+def load_areas() -> tuple[str, ...]:
+    """身份证行政区划代码（seed/area.txt）"""
+
+    from src.tabular_sense.path import get_data_dir
+
+    return tuple((get_data_dir() / "seed/area.txt").read_text(encoding="utf-8").splitlines())
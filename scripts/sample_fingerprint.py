@@ -0,0 +1,74 @@
+"""
+样本生成的内容指纹
+
+指纹覆盖一次生成的全部输入：生成函数所在模块及其引用的项目内模块的源码、读取的数据文件、生成配置。
+生成结果只取决于种子（见generator_context），因此指纹不变时上次的产物可直接复用。
+"""
+import hashlib
+import inspect
+import json
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Iterable
+
+from src.tabular_sense.path import get_project_root
+
+# 项目内模块的顶层包
+PROJECT_PACKAGES = ("scripts", "src")
+# constants注册了全部生成器，不沿其收集依赖，与生成相关的配置由调用方显式计入指纹
+EXCLUDED_MODULES = {"src.tabular_sense.core.constants"}
+
+
+def project_sources(*functions: Callable) -> list[Path]:
+    """函数所在模块及其全局名称引用的项目内模块（递归收集）的源文件，按路径排序"""
+
+    pending = [function.__module__ for function in functions]
+    visited: set[str] = set()
+    sources: set[Path] = set()
+
+    while pending:
+        name = pending.pop()
+        if name in visited or name in EXCLUDED_MODULES:
+            continue
+        visited.add(name)
+
+        module = sys.modules[name]
+        sources.add(Path(inspect.getsourcefile(module)).resolve())
+
+        for value in vars(module).values():
+            dependency = value.__name__ if isinstance(value, ModuleType) else getattr(value, "__module__", None)
+            if isinstance(dependency, str) and dependency.split(".")[0] in PROJECT_PACKAGES:
+                pending.append(dependency)
+
+    return sorted(sources)
+
+
+def file_digest(path: Path) -> str:
+    """文件内容的sha256"""
+
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def fingerprint(functions: Iterable[Callable], files: Iterable[Path], config: dict[str, Any]) -> str:
+    """
+    :param functions: 参与生成的函数，所在模块与引用的项目内模块的源码计入指纹
+    :param files: 生成时读取的数据文件，内容计入指纹
+    :param config: 生成配置，须可JSON序列化
+    :return: sha256十六进制摘要
+    """
+
+    digest = hashlib.sha256()
+    root = get_project_root()
+
+    for source in project_sources(*functions):
+        digest.update(source.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(source.read_bytes())
+
+    for path in files:
+        digest.update(path.name.encode("utf-8"))
+        digest.update(file_digest(path).encode("utf-8"))
+
+    digest.update(json.dumps(config, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
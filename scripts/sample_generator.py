@@ -1,126 +1,321 @@
+import json
 import os
 import random
 import shutil
-
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterator
+
+from scripts.generator_context import derive_seed, generator_context
+from scripts.sample_fingerprint import fingerprint, file_digest
 from scripts.sample_utils import load_corpus
 from src.tabular_sense.core.constants import CORPUS_TYPES, SAMPLES_PER_TYPE, RAW_CORPUS_PER_INPUT, \
-    MAGIC_COLUMN_NAMES, GENERIC_COLUMN_NAMES, SEED_TYPES, VARIANT_TYPES, RAW_CORPUS_PER_TYPE
-from src.tabular_sense.core.type_rule import infer_possible_types
+    MAGIC_COLUMN_NAMES, GENERIC_COLUMN_NAMES, SEED_TYPES, VARIANT_TYPES, RAW_CORPUS_PER_TYPE, ALL_TYPES, RANDOM_SEED
+from src.tabular_sense.core.type_rule import infer_possible_types_batch
 from src.tabular_sense.path import get_data_dir
 
+# 每个分片的样本数，同一类型的各分片并行生成
+SHARD_SIZE = 5000
 
-# 样本文件结构为：可能类型,可能类型|列名|数据<sep>数据<sep>数据
-def main():
-    sample_dir = get_data_dir() / "samples"
-    corpus_dir = get_data_dir() / "corpus"
+# 生成器读取的种子数据（data/seed下），内容计入指纹
+SEED_FILES: dict[str, tuple[str, ...]] = {
+    "name": ("compound_names.txt",),
+    "bank_card": ("bank-bin.csv",),
+    "id_card": ("area.txt",),
+    **{seed_type: (f"{seed_type}.txt",) for seed_type in SEED_TYPES},
+}
 
-    if sample_dir.exists():
-        shutil.rmtree(sample_dir)
 
-    sample_dir.mkdir(parents=True, exist_ok=True)
+@dataclass(frozen=True)
+class Shard:
+    """样本分片，随机种子由类型与分片序号唯一确定，与生成顺序、进程数无关"""
+
+    type_name: str
+    index: int
+    n_samples: int
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.type_name}-{self.index:03d}.txt"
+
+    @property
+    def seed(self) -> int:
+        return derive_seed(RANDOM_SEED, self.type_name, self.index)
+
+
+def plan_shards() -> list[Shard]:
+    """按ALL_TYPES的顺序将每种类型的样本切分为分片"""
+
+    return [
+        Shard(type_name, index, min(SHARD_SIZE, SAMPLES_PER_TYPE - start))
+        for type_name in ALL_TYPES
+        for index, start in enumerate(range(0, SAMPLES_PER_TYPE, SHARD_SIZE))
+    ]
+
+
+def generate_corpus(corpus_type: str):
+    """生成语料类型的原始语料"""
+
+    print(f"Generating corpus for {corpus_type}")
+    with generator_context(derive_seed(RANDOM_SEED, "corpus", corpus_type)):
+        CORPUS_TYPES[corpus_type](RAW_CORPUS_PER_TYPE)
+    print(f"Corpus of {corpus_type} generated")
 
-    for corpus_type, generator in CORPUS_TYPES.items():
-        if (corpus_dir / f"{corpus_type}.txt").exists():
-            print(f"Corpus of {corpus_type} already exists, using it")
-        else:
-            print("Generating corpus for {}".format(corpus_type))
-            generator(RAW_CORPUS_PER_TYPE)
-            print("Corpus generated")
 
-        sample_file = sample_dir / f"{corpus_type}.txt"
-        print(f"Constructing corpus type: {sample_file}")
+def seed_files(type_name: str) -> list[Path]:
+    return [get_data_dir() / "seed" / file_name for file_name in SEED_FILES.get(type_name, ())]
 
-        with load_corpus(corpus_type) as corpus:
-            print(f"Loading {corpus_type} samples...")
 
-            samples = []
-            for i in range(SAMPLES_PER_TYPE):
-                if random.random() > 0.3:
-                    type_name = random.choice(MAGIC_COLUMN_NAMES[corpus_type])
-                else:
-                    type_name = random.choice(GENERIC_COLUMN_NAMES)
+def corpus_fingerprint(corpus_type: str) -> str:
+    """原始语料的指纹：语料生成器源码、种子数据与语料规模"""
 
-                inputs = random.sample(corpus, RAW_CORPUS_PER_INPUT)
-                sample = f"{corpus_type.upper()}|{type_name}|{'<sep>'.join(inputs)}"
-                samples.append(sample)
+    return fingerprint(
+        [CORPUS_TYPES[corpus_type], generate_corpus],
+        seed_files(corpus_type),
+        {"seed": RANDOM_SEED, "raw_corpus_per_type": RAW_CORPUS_PER_TYPE},
+    )
 
-                if i % 1000 == 0:
-                    print(f"Generated {i} samples for {corpus_type}")
 
-            print(f"Writing {sample_file}")
-            with open(sample_file, "w", encoding="utf-8") as f:
-                f.write("\n".join(samples))
+def type_fingerprint(type_name: str) -> str:
+    """
+    类型样本的指纹：样本组装代码（本模块及其依赖）、生成器源码、种子数据与生成配置
 
-        print(f"Wrote {len(samples)} samples to {sample_file}")
+    语料类型以语料文件的内容代替语料生成器，重新生成出相同的语料时样本仍可复用
+    """
 
-    for seed_type, generator in SEED_TYPES.items():
-        sample_file = sample_dir / f"{seed_type}.txt"
-        print(f"Constructing seed type: {sample_file}")
+    config = {
+        "seed": RANDOM_SEED,
+        "samples_per_type": SAMPLES_PER_TYPE,
+        "shard_size": SHARD_SIZE,
+        "raw_corpus_per_input": RAW_CORPUS_PER_INPUT,
+        "generic_column_names": GENERIC_COLUMN_NAMES,
+        "magic_column_names": MAGIC_COLUMN_NAMES[type_name],
+    }
 
-        samples = []
-        for i in range(SAMPLES_PER_TYPE):
+    if type_name in CORPUS_TYPES:
+        return fingerprint([generate_shard], [get_data_dir() / "corpus" / f"{type_name}.txt"], config)
+
+    generator = SEED_TYPES.get(type_name) or VARIANT_TYPES[type_name]
+    if type_name in VARIANT_TYPES:
+        # 泛化列名的样本附加规则推断的可能类型
+        config["all_types"] = ALL_TYPES
+
+    return fingerprint([generator, generate_shard], seed_files(type_name), config)
+
+
+def corpus_samples(corpus_type: str, n_samples: int) -> Iterator[str]:
+    """从原始语料中抽取数据组成样本"""
+
+    with load_corpus(corpus_type) as corpus:
+        for _ in range(n_samples):
             if random.random() > 0.3:
-                type_name = random.choice(MAGIC_COLUMN_NAMES[seed_type])
+                type_name = random.choice(MAGIC_COLUMN_NAMES[corpus_type])
             else:
                 type_name = random.choice(GENERIC_COLUMN_NAMES)
 
-            inputs = generator(RAW_CORPUS_PER_INPUT)
-            sample = f"{seed_type.upper()}|{type_name}|{'<sep>'.join(inputs)}"
-            samples.append(sample)
+            inputs = random.sample(corpus, RAW_CORPUS_PER_INPUT)
+            yield f"{corpus_type.upper()}|{type_name}|{'<sep>'.join(inputs)}"
 
-            if i % 1000 == 0:
-                print(f"Generated {i} samples for {seed_type}")
 
-        print(f"Writing {sample_file}")
-        with open(sample_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(samples))
+def seed_samples(seed_type: str, n_samples: int) -> Iterator[str]:
+    """从种子数据中抽取数据组成样本"""
 
-        print(f"Wrote {len(samples)} samples to {sample_file}")
+    generator = SEED_TYPES[seed_type]
+    for _ in range(n_samples):
+        if random.random() > 0.3:
+            type_name = random.choice(MAGIC_COLUMN_NAMES[seed_type])
+        else:
+            type_name = random.choice(GENERIC_COLUMN_NAMES)
 
-    for vocab_type, generator in VARIANT_TYPES.items():
-        sample_file = sample_dir / f"{vocab_type}.txt"
-        print(f"Constructing vocab type: {sample_file}")
+        inputs = generator(RAW_CORPUS_PER_INPUT)
+        yield f"{seed_type.upper()}|{type_name}|{'<sep>'.join(inputs)}"
 
-        samples = []
-        for i in range(SAMPLES_PER_TYPE):
-            sample: str
-            inputs = generator(RAW_CORPUS_PER_INPUT)
-            data = "<sep>".join(inputs)
 
-            if random.random() > 0.3:
-                type_name = random.choice(GENERIC_COLUMN_NAMES)
-                types = ",".join(set(infer_possible_types(inputs) + [vocab_type.upper()]))
-                sample = f"{types}|{type_name}|{data}"
-            else:
-                type_name = random.choice(MAGIC_COLUMN_NAMES[vocab_type])
-                sample = f"{vocab_type.upper()}|{type_name}|{data}"
+def variant_samples(vocab_type: str, n_samples: int) -> Iterator[str]:
+    """程序化生成数据组成样本，泛化列名的样本附加规则推断的可能类型"""
+
+    generator = VARIANT_TYPES[vocab_type]
 
-            samples.append(sample)
+    # 先生成分片内全部输入，泛化列名的样本再统一批量推断可能类型
+    generated: list[tuple[list[str], str, bool]] = []
+    for _ in range(n_samples):
+        inputs = generator(RAW_CORPUS_PER_INPUT)
 
-            if i % 1000 == 0:
-                print(f"Generated {i} samples for {vocab_type}")
+        if random.random() > 0.3:
+            generated.append((inputs, random.choice(GENERIC_COLUMN_NAMES), True))
+        else:
+            generated.append((inputs, random.choice(MAGIC_COLUMN_NAMES[vocab_type]), False))
+
+    possible_types = iter(infer_possible_types_batch([inputs for inputs, _, generic in generated if generic]))
 
-        print(f"Writing {sample_file}")
-        with open(sample_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(samples))
+    for inputs, type_name, generic in generated:
+        data = "<sep>".join(inputs)
 
-        print(f"Wrote {len(samples)} samples to {sample_file}")
+        if generic:
+            # 排序以保证同一种子下输出一致
+            types = ",".join(sorted(set(next(possible_types) + [vocab_type.upper()])))
+            yield f"{types}|{type_name}|{data}"
+        else:
+            yield f"{vocab_type.upper()}|{type_name}|{data}"
 
-    samples_dir = get_data_dir() / "samples"
-    sample_file = f"{samples_dir}/samples.txt"
 
-    print("Constructing samples file")
-    if os.path.exists(sample_file):
-        print(f"{sample_file} already exists, removing it")
-        os.remove(sample_file)
+def generate_shard(shard: Shard, shard_dir: Path) -> dict:
+    """
+    在工作进程中生成一个分片，逐行写入分片文件
 
-    for file in samples_dir.iterdir():
-        with open(sample_file, "a", encoding="utf-8") as f:
-            f.write(file.read_text(encoding="utf-8"))
+    :return: 分片在manifest中的记录
+    """
+
+    if shard.type_name in CORPUS_TYPES:
+        samples = corpus_samples(shard.type_name, shard.n_samples)
+    elif shard.type_name in SEED_TYPES:
+        samples = seed_samples(shard.type_name, shard.n_samples)
+    else:
+        samples = variant_samples(shard.type_name, shard.n_samples)
+
+    # 样本为惰性生成，写入须在上下文内完成
+    with generator_context(shard.seed), open(shard_dir / shard.file_name, "w", encoding="utf-8") as f:
+        for sample in samples:
+            f.write(sample)
             f.write("\n")
 
-    print("Samples written to {}".format(sample_file))
+    path = shard_dir / shard.file_name
+    print(f"Generated {shard.n_samples} samples for {shard.type_name} (shard {shard.index})")
+    return {
+        "type": shard.type_name,
+        "file": shard.file_name,
+        "samples": shard.n_samples,
+        "seed": shard.seed,
+        "bytes": path.stat().st_size,
+        "sha256": file_digest(path),
+    }
+
+
+def load_manifest(sample_dir: Path) -> dict:
+    """上次生成的manifest，不存在时为空"""
+
+    manifest_file = sample_dir / "manifest.json"
+    if not manifest_file.exists():
+        return {}
+
+    return json.loads(manifest_file.read_text(encoding="utf-8"))
+
+
+def reusable_shards(previous: dict, fingerprints: dict[str, str], shard_dir: Path) -> dict[str, dict]:
+    """
+    上次生成的分片中可直接复用的部分：所属类型的指纹未变，且文件内容与manifest记录一致
+
+    :return: 分片文件名 -> manifest中的记录
+    """
+
+    unchanged = {
+        type_name for type_name, value in previous.get("types", {}).items() if fingerprints.get(type_name) == value
+    }
+
+    return {
+        entry["file"]: entry
+        for entry in previous.get("shards", [])
+        if entry["type"] in unchanged
+        and (shard_dir / entry["file"]).exists()
+        and file_digest(shard_dir / entry["file"]) == entry.get("sha256")
+    }
+
+
+def concatenate(sample_dir: Path, manifest: dict):
+    """按manifest的顺序将分片流式拼接为samples.txt，先写临时文件再替换"""
+
+    sample_file = sample_dir / "samples.txt"
+    temp_file = sample_file.with_suffix(".txt.tmp")
+
+    with open(temp_file, "wb") as f:
+        for entry in manifest["shards"]:
+            with open(sample_dir / "shards" / entry["file"], "rb") as shard:
+                shutil.copyfileobj(shard, f)
+
+    os.replace(temp_file, sample_file)
+
+
+def is_concatenated(sample_dir: Path, previous: dict, entries: list[dict]) -> bool:
+    """samples.txt已由内容相同的分片按相同顺序拼接而成"""
+
+    sample_file = sample_dir / "samples.txt"
+    return (
+        sample_file.exists()
+        and sample_file.stat().st_size == sum(entry["bytes"] for entry in entries)
+        and [entry.get("sha256") for entry in previous.get("shards", [])] == [entry["sha256"] for entry in entries]
+    )
+
+
+# 样本文件结构为：可能类型,可能类型|列名|数据<sep>数据<sep>数据
+def main(workers: int | None = None):
+    """
+    增量生成：只重新生成指纹变化的语料与类型，分片均未变化时不改写samples.txt，下游缓存保持有效
+
+    :param workers: 进程数，默认为CPU核数
+    """
+
+    sample_dir = get_data_dir() / "samples"
+    shard_dir = sample_dir / "shards"
+    corpus_dir = get_data_dir() / "corpus"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    previous = load_manifest(sample_dir)
+    shards = plan_shards()
+
+    with ProcessPoolExecutor(workers) as pool:
+        corpus_fingerprints = {corpus_type: corpus_fingerprint(corpus_type) for corpus_type in CORPUS_TYPES}
+        stale = [
+            corpus_type for corpus_type, value in corpus_fingerprints.items()
+            if previous.get("corpus", {}).get(corpus_type) != value or not (corpus_dir / f"{corpus_type}.txt").exists()
+        ]
+        for corpus_type in CORPUS_TYPES:
+            if corpus_type not in stale:
+                print(f"Corpus of {corpus_type} is up to date")
+        list(pool.map(generate_corpus, stale))
+
+        # 语料就绪后再计算类型指纹，语料类型的指纹包含语料文件内容
+        fingerprints = {type_name: type_fingerprint(type_name) for type_name in ALL_TYPES}
+        reusable = reusable_shards(previous, fingerprints, shard_dir)
+        pending = [shard for shard in shards if shard.file_name not in reusable]
+
+        print(f"{len(shards) - len(pending)} shards up to date, "
+              f"generating {len(pending)} shards with {workers or os.cpu_count()} workers")
+        generated = {entry["file"]: entry for entry in pool.map(partial(generate_shard, shard_dir=shard_dir), pending)}
+
+    # 按分片规划的顺序排列
+    entries = [reusable.get(shard.file_name) or generated[shard.file_name] for shard in shards]
+
+    # 清理不再属于规划的分片，如类型被移除或分片数减少
+    planned = {shard.file_name for shard in shards}
+    for path in shard_dir.glob("*.txt"):
+        if path.name not in planned:
+            path.unlink()
+
+    manifest = {
+        "seed": RANDOM_SEED,
+        "samples_per_type": SAMPLES_PER_TYPE,
+        "shard_size": SHARD_SIZE,
+        "corpus": corpus_fingerprints,
+        "types": fingerprints,
+        "shards": entries,
+    }
+
+    if is_concatenated(sample_dir, previous, entries):
+        print(f"Samples file is up to date: {sample_dir / 'samples.txt'}")
+    else:
+        print("Constructing samples file")
+        concatenate(sample_dir, manifest)
+        print(f"Samples written to {sample_dir / 'samples.txt'}")
+
+    # manifest最后写入，中途失败时下次运行仍以上次的记录为准
+    manifest_file = sample_dir / "manifest.json"
+    temp_file = manifest_file.with_suffix(".json.tmp")
+    temp_file.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temp_file, manifest_file)
 
 
 if __name__ == '__main__':
-    main()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,14 @@
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.components.dataset import TokenizedColumnDataset
+from src.tabular_sense.components.tokenizer import Tokenizer
+from src.tabular_sense.path import get_data_dir
+
+
+# 将samples.txt一次性tokenize为内存映射文件，训练与测试时直接加载
+def main():
+    dataset = TokenizedColumnDataset(get_data_dir() / "samples/samples.txt", Tokenizer(), Config.final())
+    print(f"{len(dataset)} samples, {int(dataset.lengths.sum())} tokens in {dataset.tokenized_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 import random
 from typing import Callable
 
+from scripts.generator_context import uniform_ints
+
 AGR_VARIANTS: list[Callable[[int], str]] = [
     lambda age: str(age),
     lambda age: f"{age}岁",
@@ -20,8 +22,4 @@ AGR_VARIANTS: list[Callable[[int], str]] = [
 
 def ages(num: int) -> list[str]:
     variant: Callable[[int], str] = random.choice(AGR_VARIANTS)
-    samples = []
-    for _ in range(num):
-        age = random.randint(1, 120)
-        samples.append(variant(age))
-    return samples
+    return list(map(variant, uniform_ints(1, 120, num).tolist()))
@@ -1,8 +1,40 @@
-import math
 import random
 
+import numpy as np
+from numpy.typing import NDArray
+
+from scripts.generator_context import uniform_table
+
+# 变体类型及其权重
+VARIANT_WEIGHTS = {
+    'standard': 40,  # 标准格式
+    'with_unit': 15,  # 带单位
+    'chinese_number': 10,  # 中文数字
+    'range': 5,  # 范围
+    'approximate': 5,  # 约数
+    'messy': 15,  # 容错变体
+    'extreme': 5,  # 极端值
+    'number': 10,  # 普通数字
+    'special': 5,  # 特殊格式
+}
+VARIANT_TYPES = list(VARIANT_WEIGHTS)
+VARIANT_CUM_WEIGHTS = np.cumsum(list(VARIANT_WEIGHTS.values())).tolist()
+
+# 小数位数0~4对应的10的幂
+POWERS_OF_TEN = 10 ** np.arange(5)
+
+# 半角可打印字符与空格到全角的映射
+FULL_WIDTH = str.maketrans({**{chr(code): chr(code + 0xFEE0) for code in range(33, 127)}, ' ': chr(0x3000)})
+
 
 class AmountGenerator:
+    """
+    金额生成
+
+    每个_generate_xxx(num)一次生成同一变体的num个值：所需的随机数由uniform_table一次抽取，再逐值拼接字符串，
+    离散字段为选项的下标
+    """
+
     def __init__(self):
         # 基础货币符号
         self.currencies = [
@@ -29,105 +61,126 @@ class AmountGenerator:
 
     def generate(self):
         """主生成函数，随机选择一种变体类型"""
-        variant_type = random.choices(
-            [
-                'standard',  # 标准格式 35%
-                'with_unit',  # 带单位 15%
-                'chinese_number',  # 中文数字 10%
-                'range',  # 范围 5%
-                'approximate',  # 约数 5%
-                'messy',  # 容错变体 10%
-                'extreme',  # 极端值 5%
-                'number',  # 普通数字 10%
-                'special',  # 特殊格式 5%
-            ],
-            weights=[40, 15, 10, 5, 5, 15, 5, 10, 5]
-        )[0]
+        variant_type = random.choices(VARIANT_TYPES, cum_weights=VARIANT_CUM_WEIGHTS)[0]
 
         method = getattr(self, f'_generate_{variant_type}')
-        return method()
+        return method(1)[0]
+
+    def _random_amounts(self, num: int, min_val=0, max_val=10000000) -> list[int | float]:
+        """生成随机金额基数，各值等概率为整数或保留1~4位小数的浮点数"""
 
-    def _random_amount(self, min_val=0, max_val=10000000):
-        """生成随机金额基数"""
-        return random.choice([
-            random.randint(min_val, max_val),
-            round(random.uniform(min_val, max_val), random.randint(1, 4)),
-        ])
+        (is_float, ints, decimal_places), (uniforms,) = uniform_table([2, max_val - min_val + 1, 4], num, 1)
+        # 先乘后除，除法结果是最接近k/10**d的浮点数，与round(x, d)相同
+        scales = 10.0 ** (decimal_places + 1)
+        floats = (np.rint((min_val + uniforms * (max_val - min_val)) * scales) / scales).tolist()
 
-    def _generate_standard(self):
+        return [
+            value if flag else min_val + integer
+            for flag, integer, value in zip(is_float.tolist(), ints.tolist(), floats)
+        ]
+
+    def _generate_standard(self, num: int) -> list[str]:
         """标准格式：符号 + 数字 + 单位"""
-        amount = self._random_amount()
-        currency_prefix, currency_suffix = random.choice(self.currencies)
-        separator = random.choice(self.separators)
-        decimal_places = random.choice([0, 1, 2, 3, 4])
-        sign = random.choice(['', '+', '-', ''] * 3)  # 正号少见
-
-        # 符号处理
-        if sign == '-':
-            amount = -abs(amount)
-            # 10% 概率用会计记账法 (100)
-            if random.random() < 0.1:
-                return self._accounting_format(abs(amount), currency_prefix, currency_suffix, separator, decimal_places)
+
+        signs = ['', '+', '-', '']  # 正号少见
+        amounts = np.array(self._random_amounts(num), dtype=np.float64)
+        # 负数10% 概率用会计记账法 (100)，20% 概率符号在货币符号后（错误但存在）
+        fields, _ = uniform_table([len(self.currencies), len(self.separators), 5, len(signs), 10, 5], num)
+        currency_indices, separator_indices, _, sign_indices, accounting, sign_after = fields.tolist()
 
         # 格式化数字
-        formatted = self._format_number(abs(amount), separator, decimal_places)
+        decimal_places = fields[2]
+        formatted = self._format_numbers(amounts, [self.separators[index] for index in separator_indices], decimal_places)
+
+        samples = []
+        for number, currency_index, sign_index, accounting_draw, after_draw in zip(
+                formatted, currency_indices, sign_indices, accounting, sign_after):
+            prefix, suffix = self.currencies[currency_index]
+            sign = signs[sign_index]
+            if sign == '-' and accounting_draw == 0:
+                samples.append(f"({prefix}{number}{suffix})")
+            elif sign and after_draw == 0:
+                samples.append(f"{prefix}{sign}{number}{suffix}")
+            else:
+                samples.append(f"{sign}{prefix}{number}{suffix}")
 
-        # 符号位置：可能在货币符号前或后
-        if sign and random.random() < 0.2:  # 20% 概率符号在货币符号后（错误但存在）
-            return f"{currency_prefix}{sign}{formatted}{currency_suffix}"
-        else:
-            return f"{sign}{currency_prefix}{formatted}{currency_suffix}"
+        return samples
 
-    def _generate_with_unit(self):
+    def _generate_with_unit(self, num: int) -> list[str]:
         """带单位：1.5万、10.5k"""
-        amount = self._random_amount(1000, 1000000000)
 
-        if random.random() < 0.5:
-            # 中文单位
-            return self._with_chinese_unit(amount)
-        else:
-            # 英文单位
-            return self._with_english_unit(amount)
+        chinese_currencies = ['¥', '$', '']
+        wan_units = ['万', 'w']
+        english_currencies = ['$', '¥', '€', '']
+
+        amounts = self._random_amounts(num, 1000, 1000000000)
+        # 中文或英文单位，小数位数；中文单位的货币、万的写法与20%口语化，英文单位的货币与大小写
+        fields, _ = uniform_table([2, 3, len(chinese_currencies), len(wan_units), 5, len(english_currencies), 2], num)
 
-    def _generate_chinese_number(self):
+        return [
+            self._with_english_unit(amount, english_currencies[english_currency], uppercase == 0, places) if english
+            else self._with_chinese_unit(amount, chinese_currencies[currency], wan_units[wan_unit], spoken == 0, places)
+            for amount, (english, places, currency, wan_unit, spoken, english_currency, uppercase) in zip(
+                amounts, zip(*fields.tolist()))
+        ]
+
+    def _generate_chinese_number(self, num: int) -> list[str]:
         """中文数字"""
-        amount = random.randint(0, 999999)
 
-        variant = random.choice([
+        variants = [
             'lowercase',  # 一百二十三元
             'uppercase',  # 壹佰贰拾叁元整
             'spoken',  # 三块五、一千五
-        ])
+        ]
+        lowercase_suffixes = ['元', '元整', '块']
+        fields, _ = uniform_table([1000000, len(variants), len(lowercase_suffixes)], num)
+
+        samples = []
+        for amount, variant_index, suffix_index in zip(*fields.tolist()):
+            variant = variants[variant_index]
+            if variant == 'lowercase':
+                samples.append(self._to_chinese_lower(amount) + lowercase_suffixes[suffix_index])
+            elif variant == 'uppercase':
+                samples.append(self._to_chinese_upper(amount) + '元整')
+            else:  # spoken
+                samples.append(self._to_chinese_spoken(amount))
+
+        return samples
+
+    def _generate_range(self, num: int) -> list[str]:
+        """范围：100-200、¥50~150"""
 
-        if variant == 'lowercase':
-            return self._to_chinese_lower(amount) + random.choice(['元', '元整', '块'])
-        elif variant == 'uppercase':
-            return self._to_chinese_upper(amount) + '元整'
-        else:  # spoken
-            return self._to_chinese_spoken(amount)
+        separators = ['-', '~', ' to ', '至']
+        currencies = ['¥', '$', '€', '', '']
+        suffixes = ['', '元', 'USD']
 
-    def _generate_range(self):
-        """范围：100-200、¥50~150"""
-        low = self._random_amount(10, 10000)
-        high = low + self._random_amount(10, 5000)
-        separator = random.choice(['-', '~', ' to ', '至'])
-        currency = random.choice(['¥', '$', '€', '', ''])
+        lows = self._random_amounts(num, 10, 10000)
+        widths = self._random_amounts(num, 10, 5000)
+        fields, _ = uniform_table([len(separators), len(currencies), len(suffixes)], num)
 
-        return f"{currency}{low}{separator}{high}" + random.choice(['', '元', 'USD'])
+        return [
+            f"{currencies[currency]}{low}{separators[separator]}{low + width}{suffixes[suffix]}"
+            for low, width, (separator, currency, suffix) in zip(lows, widths, zip(*fields.tolist()))
+        ]
 
-    def _generate_approximate(self):
+    def _generate_approximate(self, num: int) -> list[str]:
         """约数：约¥100、~$50"""
-        amount = self._random_amount()
-        prefix = random.choice(['约', '~', '≈', 'around ', 'about ', '大约'])
-        currency = random.choice(['¥', '$', '€'])
 
-        return f"{prefix}{currency}{amount}"
+        prefixes = ['约', '~', '≈', 'around ', 'about ', '大约']
+        currencies = ['¥', '$', '€']
 
-    def _generate_messy(self):
+        amounts = self._random_amounts(num)
+        fields, _ = uniform_table([len(prefixes), len(currencies)], num)
+
+        return [
+            f"{prefixes[prefix]}{currencies[currency]}{amount}"
+            for amount, (prefix, currency) in zip(amounts, zip(*fields.tolist()))
+        ]
+
+    def _generate_messy(self, num: int) -> list[str]:
         """容错变体：全角、多余空格、混用分隔符等"""
-        base = self._generate_standard()
 
-        mess_type = random.choice([
+        mess_types = [
             'full_width',  # 全角
             'extra_space',  # 多余空格
             'duplicate_symbol',  # 重复符号
@@ -135,194 +188,220 @@ class AmountGenerator:
             'redundant_unit',  # 冗余单位：¥100元RMB
             'html_entity',  # HTML实体
             'wrong_position',  # 符号位置错误
-        ])
-
-        if mess_type == 'full_width':
-            return self._to_full_width(base)
-
-        elif mess_type == 'extra_space':
-            # 随机位置插入空格
-            pos = random.randint(1, len(base) - 1)
-            return base[:pos] + ' ' * random.randint(1, 3) + base[pos:]
-
-        elif mess_type == 'duplicate_symbol':
-            # 重复货币符号
-            for symbol in ['¥', '$', '€', '£']:
-                if symbol in base:
-                    return base.replace(symbol, symbol * 2, 1)
-            return base
-
-        elif mess_type == 'mixed_separator':
-            # 混用分隔符：1,234_567.89
-            if ',' in base:
-                parts = base.split(',')
-                return parts[0] + ',' + parts[1].replace(',', '_') if len(parts) > 2 else base
-            return base
-
-        elif mess_type == 'redundant_unit':
-            # ¥100元RMB
-            if '¥' in base and '元' not in base:
-                return base + random.choice(['元', 'RMB', 'CNY'])
-            return base
-
-        elif mess_type == 'html_entity':
-            # &yen;100 或 &#165;100
-            base = base.replace('¥', random.choice(['&yen;', '&#165;']))
-            base = base.replace('$', random.choice(['&dollar;', '&#36;']))
-            return base
-
-        elif mess_type == 'wrong_position':
-            # 符号在奇怪的地方：100-元
-            if '元' in base and '-' not in base:
-                return base.replace('元', '-元')
-            return base
-
-        return base
+        ]
+        units = ['元', 'RMB', 'CNY']
+        yen_entities = ['&yen;', '&#165;']
+        dollar_entities = ['&dollar;', '&#36;']
+
+        bases = self._generate_standard(num)
+        # 多余空格的插入位置（按长度缩放的[0, 1)均匀数）与空格数1~3，冗余单位，HTML实体
+        fields, (positions,) = uniform_table(
+            [len(mess_types), 3, len(units), len(yen_entities), len(dollar_entities)], num, 1)
+
+        return [
+            self._mess(base, mess_types[mess_type], position, spaces + 1, units[unit], yen_entities[yen],
+                       dollar_entities[dollar])
+            for base, position, (mess_type, spaces, unit, yen, dollar) in zip(
+                bases, positions.tolist(), zip(*fields.tolist()))
+        ]
 
-    def _generate_extreme(self):
+    def _generate_extreme(self, num: int) -> list[str]:
         """极端值：0、负零、NaN、inf、极大值"""
-        extreme_type = random.choice([
+
+        extreme_types = [
             'zero',
             'negative_zero',
             'tiny',
             'huge',
             'scientific',
-        ])
+        ]
+        currencies = ['¥', '$', '€', '']
+        zero_decimals = [0, 2, 4]
+
+        # 首位数字1~9，极小值的0个数5~10，极大值的9个数10~15，科学计数法的底数1~10与指数3~8
+        fields, (bases,) = uniform_table([len(extreme_types), len(currencies), len(zero_decimals), 9, 6, 6, 6], num, 1)
 
-        currency = random.choice(['¥', '$', '€', ''])
+        samples = []
+        for base, (extreme_type, currency_index, decimal_index, digit, zeros, nines, exp) in zip(
+                (1 + bases * 9).tolist(), zip(*fields.tolist())):
+            extreme_type = extreme_types[extreme_type]
+            currency = currencies[currency_index]
 
-        if extreme_type == 'zero':
-            decimal = random.choice([0, 2, 4])
-            if decimal == 0:
-                return f"{currency}0"
-            return f"{currency}0.{'0' * decimal}"
+            if extreme_type == 'zero':
+                decimal = zero_decimals[decimal_index]
+                samples.append(f"{currency}0" if decimal == 0 else f"{currency}0.{'0' * decimal}")
 
-        elif extreme_type == 'negative_zero':
-            return f"{currency}-0.00"
+            elif extreme_type == 'negative_zero':
+                samples.append(f"{currency}-0.00")
 
-        elif extreme_type == 'tiny':
-            # 极小值
-            return f"{currency}0.{'0' * random.randint(5, 10)}{random.randint(1, 9)}"
+            elif extreme_type == 'tiny':
+                # 极小值
+                samples.append(f"{currency}0.{'0' * (zeros + 5)}{digit + 1}")
 
-        elif extreme_type == 'huge':
-            # 极大值
-            return f"{currency}{random.randint(1, 9)}{'9' * random.randint(10, 15)}"
+            elif extreme_type == 'huge':
+                # 极大值
+                samples.append(f"{currency}{digit + 1}{'9' * (nines + 10)}")
 
-        elif extreme_type == 'scientific':
-            # 科学计数法 + 货币
-            base = random.uniform(1, 10)
-            exp = random.randint(3, 8)
-            return f"{currency}{base:.2f}e{exp}"
+            else:  # scientific
+                # 科学计数法 + 货币
+                samples.append(f"{currency}{base:.2f}e{exp + 3}")
 
-    def _generate_number(self):
+        return samples
+
+    def _generate_number(self, num: int) -> list[str]:
         """普通数字"""
-        log_min = math.log10(1)
-        log_max = math.log10(10000000)
-        amount = round(random.uniform(log_min, log_max) ** 10, 5)
 
-        if random.random() > 0.5:
-            return str(int(amount))
-        else:
-            return str(amount)
+        _, (exponents, as_int) = uniform_table([], num, 2)
+        # log10(1) ~ log10(10000000)
+        amounts = np.round((exponents * 7) ** 10, 5).tolist()
 
-    def _generate_special(self):
+        return [str(int(amount)) if flag > 0.5 else str(amount) for amount, flag in zip(amounts, as_int.tolist())]
+
+    def _generate_special(self, num: int) -> list[str]:
         """特殊格式：单价、带说明、计算式"""
-        amount = self._random_amount(10, 1000)
-        currency = random.choice(['¥', '$'])
 
-        special_type = random.choice([
+        currencies = ['¥', '$']
+        special_types = [
             'unit_price',  # ¥100/人
             'with_note',  # ¥100(含税)
             'expression',  # $50*2
-        ])
-
-        if special_type == 'unit_price':
-            unit = random.choice(['/人', '/件', '/天', '/月', '/kg', ' each', ' per item'])
-            return f"{currency}{amount}{unit}"
-
-        elif special_type == 'with_note':
-            note = random.choice(['(含税)', '(不含税)', '(优惠价)', '(原价)', '(预付)'])
-            return f"{currency}{amount}{note}"
-
-        elif special_type == 'expression':
-            op = random.choice(['*', 'x', 'X', '×'])
-            multiplier = random.randint(2, 10)
-            return f"{currency}{amount}{op}{multiplier}"
+        ]
+        units = ['/人', '/件', '/天', '/月', '/kg', ' each', ' per item']
+        notes = ['(含税)', '(不含税)', '(优惠价)', '(原价)', '(预付)']
+        ops = ['*', 'x', 'X', '×']
+
+        amounts = self._random_amounts(num, 10, 1000)
+        # 计算式的乘数2~10
+        fields, _ = uniform_table([len(currencies), len(special_types), len(units), len(notes), len(ops), 9], num)
+
+        samples = []
+        for amount, (currency_index, special_type, unit, note, op, multiplier) in zip(amounts, zip(*fields.tolist())):
+            currency = currencies[currency_index]
+            special_type = special_types[special_type]
+            if special_type == 'unit_price':
+                samples.append(f"{currency}{amount}{units[unit]}")
+            elif special_type == 'with_note':
+                samples.append(f"{currency}{amount}{notes[note]}")
+            else:  # expression
+                samples.append(f"{currency}{amount}{ops[op]}{multiplier + 2}")
+
+        return samples
 
     # ========== 辅助函数 ==========
 
-    def _format_number(self, amount, separator, decimal_places):
-        """格式化数字：千分位 + 小数位"""
-        if decimal_places == 0:
-            integer_part = int(abs(amount))
-        else:
-            integer_part = int(abs(amount))
-            decimal_part = abs(amount) - integer_part
+    def _format_numbers(self, amounts: NDArray[np.float64], separators: list[str],
+                        decimal_places: NDArray[np.int64]) -> list[str]:
+        """格式化非负数字：千分位 + 小数位"""
 
-        # 千分位
-        if separator:
-            formatted = f"{integer_part:,}".replace(',', separator)
-        else:
-            formatted = str(integer_part)
+        # 非负数截断即为向下取整
+        integer_parts = amounts.astype(np.int64)
+        # 小数部分按位数取整后的数字，进位到1时取余为0，即保留"0.xx"去掉"0."后的写法
+        scales = POWERS_OF_TEN[decimal_places]
+        decimal_digits = (np.rint((amounts - integer_parts) * scales).astype(np.int64) % scales).tolist()
+
+        samples = []
+        for integer_part, separator, places, digits in zip(
+                integer_parts.tolist(), separators, decimal_places.tolist(), decimal_digits):
+            # 千分位
+            formatted = f"{integer_part:,}".replace(',', separator) if separator else str(integer_part)
 
-        # 小数
-        if decimal_places > 0:
-            decimal_str = f"{decimal_part:.{decimal_places}f}"[2:]  # 去掉 "0."
-            formatted += f".{decimal_str}"
+            # 小数
+            if places > 0:
+                formatted += f".{digits:0{places}d}"
 
-        return formatted
+            samples.append(formatted)
 
-    def _accounting_format(self, amount, prefix, suffix, separator, decimal_places):
-        """会计记账法：(100)表示负数"""
-        formatted = self._format_number(amount, separator, decimal_places)
-        return f"({prefix}{formatted}{suffix})"
+        return samples
 
-    def _with_chinese_unit(self, amount):
+    def _with_chinese_unit(self, amount: int | float, currency: str, wan_unit: str, spoken: bool,
+                           decimal_places: int) -> str:
         """中文单位：1.5万、10亿"""
-        currency = random.choice(['¥', '$', ''])
 
         if amount >= 100000000:
             value = amount / 100000000
             unit = '亿'
         elif amount >= 10000:
             value = amount / 10000
-            unit = random.choice(['万', 'w'])
+            unit = wan_unit
         else:
             return f"{currency}{amount}"
 
         # 口语化："10个亿"、"3千万"
-        if random.random() < 0.2:
+        if spoken:
             if unit == '亿':
                 return f"{int(value)}个亿"
             elif unit == '万' and value >= 1000:
                 return f"{int(value / 1000)}千万"
 
-        decimal_places = random.choice([0, 1, 2])
         if decimal_places == 0:
             return f"{currency}{int(value)}{unit}"
         return f"{currency}{value:.{decimal_places}f}{unit}"
 
-    def _with_english_unit(self, amount):
+    def _with_english_unit(self, amount: int | float, currency: str, uppercase: bool, decimal_places: int) -> str:
         """英文单位：1.5K、10.5M"""
-        currency = random.choice(['$', '¥', '€', ''])
 
         if amount >= 1e9:
             value = amount / 1e9
-            unit = random.choice(['B', 'b'])
+            unit = 'B'
         elif amount >= 1e6:
             value = amount / 1e6
-            unit = random.choice(['M', 'm'])
+            unit = 'M'
         elif amount >= 1e3:
             value = amount / 1e3
-            unit = random.choice(['K', 'k'])
+            unit = 'K'
         else:
             return f"{currency}{amount}"
 
-        decimal_places = random.choice([0, 1, 2])
+        if not uppercase:
+            unit = unit.lower()
+
         if decimal_places == 0:
             return f"{currency}{int(value)}{unit}"
         return f"{currency}{value:.{decimal_places}f}{unit}"
 
+    def _mess(self, base: str, mess_type: str, position: float, spaces: int, unit: str, yen: str, dollar: str) -> str:
+        """对标准格式施加一种容错变体"""
+
+        if mess_type == 'full_width':
+            return self._to_full_width(base)
+
+        elif mess_type == 'extra_space':
+            # 随机位置插入空格，位置在[1, len(base) - 1]上均匀
+            pos = 1 + int(position * (len(base) - 1))
+            return base[:pos] + ' ' * spaces + base[pos:]
+
+        elif mess_type == 'duplicate_symbol':
+            # 重复货币符号
+            for symbol in ['¥', '$', '€', '£']:
+                if symbol in base:
+                    return base.replace(symbol, symbol * 2, 1)
+            return base
+
+        elif mess_type == 'mixed_separator':
+            # 混用分隔符：1,234_567.89
+            if ',' in base:
+                parts = base.split(',')
+                return parts[0] + ',' + parts[1].replace(',', '_') if len(parts) > 2 else base
+            return base
+
+        elif mess_type == 'redundant_unit':
+            # ¥100元RMB
+            if '¥' in base and '元' not in base:
+                return base + unit
+            return base
+
+        elif mess_type == 'html_entity':
+            # &yen;100 或 &#165;100
+            return base.replace('¥', yen).replace('$', dollar)
+
+        elif mess_type == 'wrong_position':
+            # 符号在奇怪的地方：100-元
+            if '元' in base and '-' not in base:
+                return base.replace('元', '-元')
+            return base
+
+        return base
+
     def _to_chinese_lower(self, amount):
         """转中文小写：一百二十三"""
         if amount == 0:
@@ -382,33 +461,14 @@ class AmountGenerator:
 
     def _to_full_width(self, text):
         """半角转全角"""
-        result = []
-        for char in text:
-            code = ord(char)
-            if 33 <= code <= 126:  # ASCII可打印字符
-                result.append(chr(code + 0xFEE0))
-            elif char == ' ':
-                result.append(chr(0x3000))
-            else:
-                result.append(char)
-        return ''.join(result)
+        return text.translate(FULL_WIDTH)
+
+
+# 生成器不持有随机状态，各次调用共享
+GENERATOR = AmountGenerator()
 
 
 def amounts(num: int) -> list[str]:
-    generator = AmountGenerator()
-    variant_type = random.choices(
-        [
-            'standard',  # 标准格式 35%
-            'with_unit',  # 带单位 15%
-            'chinese_number',  # 中文数字 10%
-            'range',  # 范围 5%
-            'approximate',  # 约数 5%
-            'messy',  # 容错变体 10%
-            'extreme',  # 极端值 5%
-            'number',  # 普通数字 10%
-            'special',  # 特殊格式 5%
-        ],
-        weights=[40, 15, 10, 5, 5, 15, 5, 10, 5]
-    )[0]
-    method = getattr(generator, f'_generate_{variant_type}')
-    return [method() for _ in range(num)]
+    variant_type = random.choices(VARIANT_TYPES, cum_weights=VARIANT_CUM_WEIGHTS)[0]
+    method = getattr(GENERATOR, f'_generate_{variant_type}')
+    return method(num)
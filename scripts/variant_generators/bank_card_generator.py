@@ -1,25 +1,7 @@
-import csv
 import random
-from pathlib import Path
 
-from src.tabular_sense.path import get_data_dir
-
-
-def luhn_checksum(card_number: str) -> int:
-    """计算Luhn校验位"""
-
-    def digits_of(n: str | int) -> list[int]:
-        return [int(digit) for digit in str(n)]
-
-    digits = digits_of(card_number)
-    odd_digits = digits[-1::-2]
-    even_digits = digits[-2::-2]
-
-    checksum = sum(odd_digits)
-    for d in even_digits:
-        checksum += sum(digits_of(d * 2))
-
-    return (10 - (checksum % 10)) % 10
+from scripts.providers import load_bin_table
+from src.tabular_sense.core.utils import luhn_checksum
 
 
 def chunk_string(s: str, chunk_size: int = 4):
@@ -51,29 +33,8 @@ def generate_card_from_bin(bin_info: dict[str, str]) -> str:
     return card_without_check + str(check_digit)
 
 
-def load_bin_data(csv_path: Path) -> list[dict[str, str]]:
-    """加载BIN数据"""
-    bin_infos = []
-
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            bin_infos.append({
-                'bank_name': row[0],  # 银行名
-                'bank_code': row[1],  # 机构代码
-                'bank_abbr': row[2],  # 英文简称
-                'card_name': row[3],  # 卡名
-                'card_type': row[4],  # 卡类型代码
-                'card_length': row[5],  # 卡号长度
-                'bin': row[6],  # BIN
-                'bin_length': row[7],  # BIN长度
-            })
-
-    return bin_infos
-
-
 def bank_cards(num: int) -> list[str]:
-    bin_infos = load_bin_data(get_data_dir() / 'seed/bank-bin.csv')
+    bin_infos = load_bin_table()
     choice = random.random()
     cards = []
 
@@ -1,86 +1,103 @@
 import random
 
+import numpy as np
+from numpy.typing import NDArray
+
+from scripts.generator_context import numpy_rng
+
+# 坐标格式，lat/lon为十进制度，*_d/*_m/*_s为度分秒
+COORDINATE_FORMATS = [
+    # === 小数格式 ===
+    "{lat:.4f},{lon:.4f}",
+    "{lat:.4f} {lon:.4f}",
+    "{lat:.4f};{lon:.4f}",
+    "{lat:.4f}\t{lon:.4f}",
+    "{lat:.2f},{lon:.2f}",
+    "{lat:.6f},{lon:.6f}",
+
+    # === 带方向 ===
+    "{lat:.4f}° N, {lon:.4f}° E",
+    "{lat:.4f}°N, {lon:.4f}°E",
+    "{lat:.4f} N, {lon:.4f} E",
+    "N {lat:.4f}, E {lon:.4f}",
+    "N{lat:.4f} E{lon:.4f}",
+
+    # === 正负号 ===
+    "{lat:+.4f},{lon:+.4f}",
+    "+{lat:.4f},+{lon:.4f}",
+
+    # === 度分秒 ===
+    '{lat_d}°{lat_m}\'{lat_s:.2f}" N, {lon_d}°{lon_m}\'{lon_s:.2f}" E',
+    '{lat_d}°{lat_m}\'{lat_s:.2f}"N,{lon_d}°{lon_m}\'{lon_s:.2f}"E',
+    "{lat_d}°{lat_m}' N, {lon_d}°{lon_m}' E",
+
+    # === 带标签 ===
+    "lat:{lat:.4f},lon:{lon:.4f}",
+    "lat:{lat:.4f}, lng:{lon:.4f}",
+    "latitude:{lat:.4f}, longitude:{lon:.4f}",
+    "纬度:{lat:.4f},经度:{lon:.4f}",
+
+    # === 括号 ===
+    "({lat:.4f},{lon:.4f})",
+    "({lat:.4f}, {lon:.4f})",
+    "[{lat:.4f},{lon:.4f}]",
+
+    # === URL格式 ===
+    "@{lat:.6f},{lon:.6f}",
+    "?lat={lat:.6f}&lon={lon:.6f}",
+
+    # === 中文格式 ===
+    "北纬{lat:.4f}°，东经{lon:.4f}°",
+    "北纬{lat:.4f} 东经{lon:.4f}",
+]
+
+# 度分秒格式的下标
+DMS_FORMATS = range(13, 16)
+DMS_KEYS = ('lat_d', 'lat_m', 'lat_s', 'lon_d', 'lon_m', 'lon_s')
+
 
 # TODO 分开两列 lat: 39.9042, lon: 116.4074
-def generate_coordinate(china_only=True):
-    """生成坐标（默认中国范围）"""
+def generate_coordinates(num: int, china_only=True) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """生成num个坐标（默认中国范围），返回[num]的纬度与经度"""
+
+    rng = numpy_rng()
     if china_only:
-        lat = random.uniform(18, 54)  # 中国纬度范围
-        lon = random.uniform(73, 135)  # 中国经度范围
+        lat = rng.uniform(18, 54, size=num)  # 中国纬度范围
+        lon = rng.uniform(73, 135, size=num)  # 中国经度范围
     else:
-        lat = random.uniform(-90, 90)
-        lon = random.uniform(-180, 180)
+        lat = rng.uniform(-90, 90, size=num)
+        lon = rng.uniform(-180, 180, size=num)
 
     return lat, lon
 
 
-def dd_to_dms(dd):
-    """十进制度转度分秒"""
-    d = int(abs(dd))
-    m = int((abs(dd) - d) * 60)
-    s = ((abs(dd) - d) * 60 - m) * 60
-    return d, m, s
-
-
-def format_coordinate_variants(lat: float, lon: float, coordinate_format: int) -> str:
-    """生成所有格式变体"""
-    lat_d, lat_m, lat_s = dd_to_dms(lat)
-    lon_d, lon_m, lon_s = dd_to_dms(lon)
-
-    formats = [
-        # === 小数格式 ===
-        f"{lat:.4f},{lon:.4f}",
-        f"{lat:.4f} {lon:.4f}",
-        f"{lat:.4f};{lon:.4f}",
-        f"{lat:.4f}\t{lon:.4f}",
-        f"{lat:.2f},{lon:.2f}",
-        f"{lat:.6f},{lon:.6f}",
+def dd_to_dms(dd: NDArray[np.float64]) -> tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.float64]]:
+    """十进制度转度分秒，逐元素计算"""
 
-        # === 带方向 ===
-        f"{lat:.4f}° N, {lon:.4f}° E",
-        f"{lat:.4f}°N, {lon:.4f}°E",
-        f"{lat:.4f} N, {lon:.4f} E",
-        f"N {lat:.4f}, E {lon:.4f}",
-        f"N{lat:.4f} E{lon:.4f}",
+    dd = np.abs(dd)
+    d = np.trunc(dd)
+    minutes = (dd - d) * 60
+    m = np.trunc(minutes)
+    s = (minutes - m) * 60
+    return d.astype(np.int64), m.astype(np.int64), s
 
-        # === 正负号 ===
-        f"{lat:+.4f},{lon:+.4f}",
-        f"+{lat:.4f},+{lon:.4f}",
 
-        # === 度分秒 ===
-        f'{lat_d}°{lat_m}\'{lat_s:.2f}" N, {lon_d}°{lon_m}\'{lon_s:.2f}" E',
-        f'{lat_d}°{lat_m}\'{lat_s:.2f}"N,{lon_d}°{lon_m}\'{lon_s:.2f}"E',
-        f"{lat_d}°{lat_m}' N, {lon_d}°{lon_m}' E",
+def format_coordinate_variants(lat: NDArray[np.float64], lon: NDArray[np.float64], coordinate_format: int) -> list[str]:
+    """按同一格式格式化一批坐标"""
 
-        # === 带标签 ===
-        f"lat:{lat:.4f},lon:{lon:.4f}",
-        f"lat:{lat:.4f}, lng:{lon:.4f}",
-        f"latitude:{lat:.4f}, longitude:{lon:.4f}",
-        f"纬度:{lat:.4f},经度:{lon:.4f}",
+    template = COORDINATE_FORMATS[coordinate_format]
 
-        # === 括号 ===
-        f"({lat:.4f},{lon:.4f})",
-        f"({lat:.4f}, {lon:.4f})",
-        f"[{lat:.4f},{lon:.4f}]",
+    if coordinate_format not in DMS_FORMATS:
+        return [
+            template.format(lat=lat_value, lon=lon_value) for lat_value, lon_value in zip(lat.tolist(), lon.tolist())
+        ]
 
-        # === URL格式 ===
-        f"@{lat:.6f},{lon:.6f}",
-        f"?lat={lat:.6f}&lon={lon:.6f}",
-
-        # === 中文格式 ===
-        f"北纬{lat:.4f}°，东经{lon:.4f}°",
-        f"北纬{lat:.4f} 东经{lon:.4f}",
-    ]
-
-    return formats[coordinate_format]
+    # 6 x [num]
+    columns = [column.tolist() for column in (*dd_to_dms(lat), *dd_to_dms(lon))]
+    return [template.format(**dict(zip(DMS_KEYS, values))) for values in zip(*columns)]
 
 
 def coordinates(num: int) -> list[str]:
-    samples = []
     coordinate_format = random.randint(0, 25)
-
-    for _ in range(num):
-        lat, lon = generate_coordinate(china_only=False)
-        samples.append(format_coordinate_variants(lat, lon, coordinate_format))
-
-    return samples
+    lat, lon = generate_coordinates(num, china_only=False)
+    return format_coordinate_variants(lat, lon, coordinate_format)
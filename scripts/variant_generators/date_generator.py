@@ -1,6 +1,7 @@
 import random
 
-from faker import Faker
+from scripts.generator_context import REFERENCE_TIME
+from scripts.providers import get_faker
 
 # 日期格式数组
 date_formats = [
@@ -76,11 +77,11 @@ date_formats = [
 
 
 def dates(num: int) -> list[str]:
-    faker = Faker("zh_CN")
+    faker = get_faker("zh_CN")
     date_format = random.choice(date_formats)
     samples = []
 
     for _ in range(num):
-        samples.append(faker.date_time().strftime(date_format))
+        samples.append(faker.date_time(end_datetime=REFERENCE_TIME).strftime(date_format))
 
     return samples
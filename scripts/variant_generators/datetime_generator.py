@@ -1,7 +1,14 @@
 import random
+from datetime import timezone
 
 from faker import Faker
 
+from scripts.generator_context import REFERENCE_TIME
+from scripts.providers import get_faker
+
+# 生成的时间范围：参考时间之前50年
+START_TIME = REFERENCE_TIME.replace(year=REFERENCE_TIME.year - 50)
+
 # 日期时间格式变体列表
 datetime_formats = [
     # 标准格式 - 横杠分隔
@@ -90,26 +97,31 @@ datetime_formats = [
 ]
 
 
+def utc_timestamp(faker: Faker) -> float:
+    """时间范围内的随机Unix时间戳，按UTC解释，结果不受本地时区影响"""
+    return faker.date_time_between(start_date=START_TIME, end_date=REFERENCE_TIME, tzinfo=timezone.utc).timestamp()
+
+
 def datetime(num: int) -> list[str]:
-    faker = Faker("zh_CN")
+    faker = get_faker("zh_CN")
     datetime_format = random.choice(datetime_formats)
     samples = []
 
     # 85%使用格式化字符串，15%使用时间戳
     if random.random() < 0.85:
         for _ in range(num):
-            sample = faker.date_time_between(start_date="-50y", end_date="now").strftime(datetime_format)
+            sample = faker.date_time_between(start_date=START_TIME, end_date=REFERENCE_TIME).strftime(datetime_format)
             samples.append(sample)
     else:
         # Unix时间戳（10位秒级或13位毫秒级）
         if random.random() < 0.7:
             for _ in range(num):
-                sample = str(int(faker.date_time_between(start_date="-50y", end_date="now").timestamp()))
+                sample = str(int(utc_timestamp(faker)))
                 samples.append(sample)
         else:
             for _ in range(num):
                 ms = f"{random.randint(0, 999):03}"
-                sample = str(int(faker.date_time_between(start_date="-50y", end_date="now").timestamp())) + ms
+                sample = str(int(utc_timestamp(faker))) + ms
                 samples.append(sample)
 
     return samples
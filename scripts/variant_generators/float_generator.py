@@ -2,112 +2,142 @@ import math
 import random
 import sys
 
+import numpy as np
+from numpy.typing import NDArray
+
+from scripts.generator_context import numpy_rng, uniform_ints, choose
+
+# 特殊值
+SPECIAL_NUMBERS = [
+    0.0,
+    1.0,
+    -1.0,
+    0.5,
+    math.pi,
+    math.e,
+    math.inf,
+    -math.inf,
+    math.nan,
+    math.tau,
+    math.sqrt(2),
+    math.sqrt(3),
+    math.sqrt(5),
+    math.cbrt(2),
+    math.cbrt(3),
+    math.log(2),
+    math.log10(2),
+    math.exp(2),
+    math.pi / 2,
+    (1 + math.sqrt(5)) / 2,
+    sys.float_info.max,
+    sys.float_info.min,
+    sys.float_info.min / 2,
+    sys.float_info.epsilon,
+    sys.float_info.min * sys.float_info.epsilon,
+    sys.float_info.min_exp,
+    sys.float_info.min_10_exp,
+    sys.float_info.max_exp,
+    sys.float_info.max_10_exp,
+]
+
+
+def hex_fractions(digits: str, lengths: NDArray[np.int64]) -> list[str]:
+    """
+    随机十六进制小数部分，第i个长度为lengths[i]
+
+    一次抽取[num, 最大长度]的字符矩阵，按行视为定长字符串后截断
+    """
+
+    # [num, max_len]
+    chars = np.array(list(digits))[numpy_rng().integers(0, len(digits), size=(len(lengths), int(lengths.max())))]
+    rows = np.ascontiguousarray(chars).view(f"<U{chars.shape[1]}").ravel().tolist()
+    return [row[:length] for row, length in zip(rows, lengths.tolist())]
+
+
+def generate_random_float_literals(strategy: int, num: int) -> list[str]:
+    """同一策略的num个浮点数字面量，随机数一次性抽取"""
+
+    rng = numpy_rng()
 
-def generate_random_float_literal(strategy: int):
     if strategy == 1:
         # 普通小数 - 扩大范围和位数
-        decimal_places = random.randint(1, 15)  # 增加小数位
-        num = random.uniform(-10 ** 15, 10 ** 15)  # 扩大整数部分
-        return f"{num:.{decimal_places}f}"
+        decimal_places = uniform_ints(1, 15, num).tolist()  # 增加小数位
+        values = rng.uniform(-10 ** 15, 10 ** 15, size=num).tolist()  # 扩大整数部分
+        return [f"{value:.{places}f}" for value, places in zip(values, decimal_places)]
 
     elif strategy == 2:
         # 科学计数法 - 扩大指数范围
-        base = random.uniform(0.1, 10)
-        exp = random.randint(-50, 50)  # 从-20扩大到-50~50
-        e_char = random.choice(['e', 'E'])
-        sign = random.choice(['-', '+', ''])
-        base_decimals = random.randint(1, 10)
-        return f"{base:.{base_decimals}f}{e_char}{sign}{abs(exp)}"
-
-    elif strategy == 3:
-        # 带f/F后缀 - 增加位数
-        num = random.uniform(-10 ** 12, 10 ** 12)
-        suffix = random.choice(['f', 'F'])
-        return f"{num:.{random.randint(1, 12)}f}{suffix}"
-
-    elif strategy == 4:
-        # 带d/D后缀
-        num = random.uniform(-10 ** 12, 10 ** 12)
-        suffix = random.choice(['d', 'D'])
-        return f"{num:.{random.randint(1, 12)}f}{suffix}"
+        bases = rng.uniform(0.1, 10, size=num).tolist()
+        exps = uniform_ints(-50, 50, num).tolist()  # 从-20扩大到-50~50
+        e_chars = choose(['e', 'E'], num)
+        signs = choose(['-', '+', ''], num)
+        base_decimals = uniform_ints(1, 10, num).tolist()
+        return [
+            f"{base:.{decimals}f}{e_char}{sign}{abs(exp)}"
+            for base, decimals, e_char, sign, exp in zip(bases, base_decimals, e_chars, signs, exps)
+        ]
+
+    elif strategy in (3, 4):
+        # 带f/F或d/D后缀 - 增加位数
+        values = rng.uniform(-10 ** 12, 10 ** 12, size=num).tolist()
+        suffixes = choose(['f', 'F'] if strategy == 3 else ['d', 'D'], num)
+        decimal_places = uniform_ints(1, 12, num).tolist()
+        return [f"{value:.{places}f}{suffix}" for value, places, suffix in zip(values, decimal_places, suffixes)]
 
     elif strategy == 5:
         # 科学计数法 + 后缀
-        base = random.uniform(0.1, 10)
-        exp = random.randint(-50, 50)
-        e_char = random.choice(['e', 'E'])
-        suffix = random.choice(['f', 'F', 'd', 'D', ''])
-        return f"{base:.{random.randint(1, 8)}f}{e_char}{exp}{suffix}"
+        bases = rng.uniform(0.1, 10, size=num).tolist()
+        exps = uniform_ints(-50, 50, num).tolist()
+        e_chars = choose(['e', 'E'], num)
+        suffixes = choose(['f', 'F', 'd', 'D', ''], num)
+        decimal_places = uniform_ints(1, 8, num).tolist()
+        return [
+            f"{base:.{places}f}{e_char}{exp}{suffix}"
+            for base, places, e_char, exp, suffix in zip(bases, decimal_places, e_chars, exps, suffixes)
+        ]
 
     elif strategy == 6:
         # 十六进制浮点
-        integer_part = random.randint(0, 15)
-        frac_part = ''.join(random.choices('0123456789abcdef', k=random.randint(1, 12)))
-        exp = random.randint(-20, 20)
-        p_char = random.choice(['p', 'P'])
-        return f"0x{integer_part:x}.{frac_part}{p_char}{exp}"
+        integer_parts = uniform_ints(0, 15, num).tolist()
+        frac_parts = hex_fractions('0123456789abcdef', uniform_ints(1, 12, num))
+        exps = uniform_ints(-20, 20, num).tolist()
+        p_chars = choose(['p', 'P'], num)
+        return [
+            f"0x{integer_part:x}.{frac_part}{p_char}{exp}"
+            for integer_part, frac_part, p_char, exp in zip(integer_parts, frac_parts, p_chars, exps)
+        ]
 
     elif strategy == 7:
         # 十六进制浮点 + 后缀
-        integer_part = random.randint(0, 15)
-        frac_part = ''.join(random.choices('0123456789ABCDEF', k=random.randint(1, 12)))
-        exp = random.randint(-20, 20)
-        suffix = random.choice(['f', 'F', 'd', 'D'])
-        return f"0x{integer_part:X}.{frac_part}p{exp}{suffix}"
+        integer_parts = uniform_ints(0, 15, num).tolist()
+        frac_parts = hex_fractions('0123456789ABCDEF', uniform_ints(1, 12, num))
+        exps = uniform_ints(-20, 20, num).tolist()
+        suffixes = choose(['f', 'F', 'd', 'D'], num)
+        return [
+            f"0x{integer_part:X}.{frac_part}p{exp}{suffix}"
+            for integer_part, frac_part, exp, suffix in zip(integer_parts, frac_parts, exps, suffixes)
+        ]
 
     elif strategy == 8:
         # 超多小数位
-        frac = random.uniform(0, 1)
-        return f"{frac:.{random.randint(10, 20)}f}"
+        fracs = rng.random(num).tolist()
+        decimal_places = uniform_ints(10, 20, num).tolist()
+        return [f"{frac:.{places}f}" for frac, places in zip(fracs, decimal_places)]
 
     elif strategy == 9:
         # 大整数部分 + 多位小数
-        integer = random.randint(-10 ** 15, 10 ** 15)
-        frac = random.random()
-        decimals = random.randint(5, 15)
-        return f"{integer + frac:.{decimals}f}"
+        integers = rng.integers(-10 ** 15, 10 ** 15, size=num, endpoint=True).tolist()
+        fracs = rng.random(num).tolist()
+        decimal_places = uniform_ints(5, 15, num).tolist()
+        return [f"{integer + frac:.{places}f}" for integer, frac, places in zip(integers, fracs, decimal_places)]
 
     else:
         # 特殊值
-        special_numbers = [
-            0.0,
-            1.0,
-            -1.0,
-            0.5,
-            math.pi,
-            math.e,
-            math.inf,
-            -math.inf,
-            math.nan,
-            math.tau,
-            math.sqrt(2),
-            math.sqrt(3),
-            math.sqrt(5),
-            math.cbrt(2),
-            math.cbrt(3),
-            math.log(2),
-            math.log10(2),
-            math.exp(2),
-            math.pi / 2,
-            (1 + math.sqrt(5)) / 2,
-            sys.float_info.max,
-            sys.float_info.min,
-            sys.float_info.min / 2,
-            sys.float_info.epsilon,
-            sys.float_info.min * sys.float_info.epsilon,
-            sys.float_info.min_exp,
-            sys.float_info.min_10_exp,
-            sys.float_info.max_exp,
-            sys.float_info.max_10_exp,
-        ]
-        return str(round(random.choice(special_numbers), random.randint(1, 10)))
+        indices = uniform_ints(0, len(SPECIAL_NUMBERS) - 1, num).tolist()
+        digits = uniform_ints(1, 10, num).tolist()
+        return [str(round(SPECIAL_NUMBERS[index], ndigits)) for index, ndigits in zip(indices, digits)]
 
 
 def floats(num: int) -> list[str]:
     strategy = random.randint(1, 10)
-    samples = []
-
-    for _ in range(num):
-        samples.append(generate_random_float_literal(strategy))
-
-    return samples
+    return generate_random_float_literals(strategy, num)
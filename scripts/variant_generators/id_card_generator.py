@@ -1,12 +1,9 @@
-from datetime import datetime
+import random
+from datetime import date, timedelta
 from enum import Enum
-from random import Random
-from typing import Optional
-
-from faker import Faker
 
+from scripts.providers import load_areas
 from src.tabular_sense.core.utils import calculate_id_card_checksum
-from src.tabular_sense.path import get_data_dir
 
 
 class IdCardFormat(Enum):
@@ -20,44 +17,40 @@ class IdCardFormat(Enum):
         return self.value.format(area=area, date=date, seq=seq, verify=verify)
 
 
+def random_date(start: date, end: date) -> date:
+    """闭区间内均匀分布的随机日期，按天计算，不受本地时区影响"""
+    return start + timedelta(days=random.randint(0, (end - start).days))
+
+
 class IdCardGenerator:
     """身份证生成"""
 
-    rng: Optional[Random] = None
-    areas: Optional[list[str]] = None
+    areas: tuple[str, ...]
 
     def __init__(self):
-        if self.rng is None:
-            self.rng = Random()
-
-        if self.areas is None:
-            seed_dir = get_data_dir() / "seed"
-
-            with open(seed_dir / "area.txt", "r", encoding="utf-8") as area_file:
-                self.areas = area_file.read().splitlines()
+        self.areas = load_areas()
 
     def __call__(self, fmt: IdCardFormat):
-        faker = Faker("zh_CN")
-
-        if self.rng.random() < 0.5:
-            area = self.rng.choice(self.areas)
-            date = faker.date_between(start_date=datetime(1920, 1, 1), end_date=datetime(2010, 12, 31)) \
-                .strftime('%Y%m%d')
-            seq = f"{self.rng.randint(0, 999):03d}"
-            checksum = calculate_id_card_checksum(area + date + seq)
+        if random.random() < 0.5:
+            area = random.choice(self.areas)
+            birth = random_date(date(1920, 1, 1), date(2010, 12, 31)).strftime('%Y%m%d')
+            seq = f"{random.randint(0, 999):03d}"
+            checksum = calculate_id_card_checksum(area + birth + seq)
+            # 校验码X随机使用大小写
+            if checksum == "X" and random.random() < 0.5:
+                checksum = "x"
         else:
-            area = self.rng.choice(self.areas)
-            date = faker.date_between(start_date=datetime(1920, 1, 1), end_date=datetime(1999, 12, 31)) \
-                .strftime('%y%m%d')
-            seq = f"{self.rng.randint(0, 999):03d}"
+            area = random.choice(self.areas)
+            birth = random_date(date(1920, 1, 1), date(1999, 12, 31)).strftime('%y%m%d')
+            seq = f"{random.randint(0, 999):03d}"
             checksum = ""
 
-        return fmt.format(area, date, seq, checksum)
+        return fmt.format(area, birth, seq, checksum)
 
 
 def id_cards(num: int) -> list[str]:
     generator = IdCardGenerator()
-    fmt = generator.rng.choice(list(IdCardFormat))
+    fmt = random.choice(list(IdCardFormat))
     samples = []
 
     for _ in range(num):
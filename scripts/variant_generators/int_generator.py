@@ -1,66 +1,85 @@
 import random
 
+import numpy as np
+from numpy.typing import NDArray
+
+from scripts.generator_context import numpy_rng, uniform_ints, choose
+
+
+def signed_uniform_ints(digits: NDArray[np.int64]) -> list[int]:
+    """
+    各值在[-10**digits, 10**digits]上均匀分布
+
+    19位时上界超出int64，改为在uint64上抽取绝对值与符号：绝对值在[0, 10**digits]上均匀，
+    负零重新抽取，使0与其他值的概率相同
+    """
+
+    rng = numpy_rng()
+    # [num]
+    magnitudes = rng.integers(0, 10 ** digits.astype(np.uint64), endpoint=True, dtype=np.uint64)
+    negative = rng.random(len(digits)) < 0.5
+
+    while (redraw := np.flatnonzero(negative & (magnitudes == 0))).size:
+        magnitudes[redraw] = rng.integers(0, 10 ** digits[redraw].astype(np.uint64), endpoint=True, dtype=np.uint64)
+        negative[redraw] = rng.random(redraw.size) < 0.5
+
+    return [-magnitude if sign else magnitude for magnitude, sign in zip(magnitudes.tolist(), negative.tolist())]
+
+
+def group_hex(hex_str: str) -> str:
+    """十六进制超过4位时从左起每4位插入下划线"""
+
+    if len(hex_str) > 4:
+        return '_'.join(hex_str[i:i + 4] for i in range(0, len(hex_str), 4))
+    return hex_str
+
+
+def generate_random_int_literals(strategy: int, num: int) -> list[str]:
+    """同一策略的num个整数字面量，随机数一次性抽取"""
+
+    rng = numpy_rng()
 
-def generate_random_int_literal(strategy: int):
     if strategy == 1:
         # 普通十进制整数
-        digits = random.randint(1, 19)
-        return str(random.randint(-10 ** digits, 10 ** digits))
+        return list(map(str, signed_uniform_ints(uniform_ints(1, 19, num))))
 
     elif strategy == 2:
         # 十六进制
-        num = random.randint(0, 2 ** 32)
-        prefix = random.choice(['0x', '0X'])
-        return f"{prefix}{num:X}"
+        numbers = uniform_ints(0, 2 ** 32, num).tolist()
+        prefixes = choose(['0x', '0X'], num)
+        return [f"{prefix}{n:X}" for prefix, n in zip(prefixes, numbers)]
 
     elif strategy == 3:
         # 八进制
-        num = random.randint(0, 2 ** 20)
-        prefix = random.choice(['0o', '0O'])
-        return f"{prefix}{num:o}"
+        numbers = uniform_ints(0, 2 ** 20, num).tolist()
+        prefixes = choose(['0o', '0O'], num)
+        return [f"{prefix}{n:o}" for prefix, n in zip(prefixes, numbers)]
 
     elif strategy == 4:
         # 二进制
-        num = random.randint(0, 2 ** 20)
-        prefix = random.choice(['0b', '0B'])
-        return f"{prefix}{num:b}"
+        numbers = uniform_ints(0, 2 ** 20, num).tolist()
+        prefixes = choose(['0b', '0B'], num)
+        return [f"{prefix}{n:b}" for prefix, n in zip(prefixes, numbers)]
 
     elif strategy == 5:
         # 带后缀
-        num = random.randint(-10 ** 10, 10 ** 10)
-        suffix = random.choice(['L', 'U', 'UL', 'LL', 'l', 'u'])
-        return f"{num}{suffix}"
+        numbers = rng.integers(-10 ** 10, 10 ** 10, size=num, endpoint=True).tolist()
+        suffixes = choose(['L', 'U', 'UL', 'LL', 'l', 'u'], num)
+        return [f"{n}{suffix}" for n, suffix in zip(numbers, suffixes)]
 
     elif strategy == 6:
-        # 带下划线分隔符
-        num = random.randint(-10 ** 12, 10 ** 12)
-        s = str(abs(num))
-        # 每3位插入下划线
-        parts = []
-        for i in range(len(s) - 1, -1, -3):
-            parts.append(s[max(0, i - 2):i + 1])
-        result = '_'.join(reversed(parts))
-        return f"{'-' if num < 0 else ''}{result}"
+        # 带下划线分隔符，每3位插入下划线
+        return [f"{n:_}" for n in rng.integers(-10 ** 12, 10 ** 12, size=num, endpoint=True).tolist()]
 
     elif strategy == 7:
         # 十六进制带下划线
-        num = random.randint(0, 2 ** 32)
-        hex_str = f"{num:X}"
-        if len(hex_str) > 4:
-            parts = [hex_str[i:i + 4] for i in range(0, len(hex_str), 4)]
-            hex_str = '_'.join(parts)
-        return f"0x{hex_str}"
+        return [f"0x{group_hex(f'{n:X}')}" for n in uniform_ints(0, 2 ** 32, num).tolist()]
 
     else:
         # 小数字
-        return str(random.randint(-1000, 1000))
+        return list(map(str, uniform_ints(-1000, 1000, num).tolist()))
 
 
 def ints(num: int) -> list[str]:
     strategy = random.randint(1, 8)
-    samples = []
-
-    for _ in range(num):
-        samples.append(generate_random_int_literal(strategy))
-
-    return samples
+    return generate_random_int_literals(strategy, num)
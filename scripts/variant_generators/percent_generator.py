@@ -1,110 +1,121 @@
 import random
 
+import numpy as np
+from numpy.typing import NDArray
 
-def generate_percentage(representation: str, explicit_format: int):
-    # 1. 生成数值（真实的百分比值，比如50代表50%）
-    value_strategies = [
-        lambda: random.uniform(0, 100),  # 常规 0-100%
-        lambda: random.uniform(100, 500),  # 超过100%
-        lambda: random.uniform(-50, 0),  # 负值
-        lambda: random.uniform(0, 1),  # 小于1%
-        lambda: random.uniform(0.01, 0.1),  # 极小值
-    ]
-    percentage_value = random.choice(value_strategies)()
+from scripts.generator_context import numpy_rng, uniform_ints, choose
 
-    if representation == 'explicit':
-        # 形式A：显式百分比（带%符号）
-        return generate_explicit_format(percentage_value, explicit_format)
+# 数值策略：真实的百分比值（比如50代表50%）的均匀分布区间，各策略等概率
+VALUE_RANGES = np.array([
+    (0, 100),  # 常规 0-100%
+    (100, 500),  # 超过100%
+    (-50, 0),  # 负值
+    (0, 1),  # 小于1%
+    (0.01, 0.1),  # 极小值
+])
 
-    elif representation == 'decimal':
-        # 形式B：小数形式（0.50 = 50%）
-        return generate_decimal_format(percentage_value, explicit_format)
+# 显式百分比的格式，v为数值，a为绝对值，h为范围上限，p为小数位数
+EXPLICIT_FORMATS = [
+    # 标准格式
+    "{v:.{p}f}%",
 
-    else:  # numeric
-        # 形式C：数值形式（50 = 50%，不带%）
-        return generate_numeric_format(percentage_value, explicit_format)
+    # 空格变体
+    "{v:.{p}f} %",
 
+    # 符号变体
+    "+{a:.{p}f}%",
+    "-{a:.{p}f}%",
 
-def generate_explicit_format(value, strategy):
-    """显式百分比：50.5%"""
-    decimal_places = random.choice([0, 1, 2, 3])
+    # 英文变体
+    "{v:.{p}f} percent",
+    "{v:.{p}f}pct",
+    "{v:.{p}f} pc",
 
-    formats = [
-        # 标准格式
-        f"{value:.{decimal_places}f}%",
+    # 范围变体
+    "{v:.{p}f}%-{h:.{p}f}%",
+    "{v:.{p}f}~{h:.{p}f}%",
+]
 
-        # 空格变体
-        f"{value:.{decimal_places}f} %",
+# 小数形式的格式，d为小数值，s为正值的加号
+DECIMAL_FORMATS = [
+    "{d:.{p}f}",  # 0.505000
+    "{d:g}",  # 0.505（自动去除多余0）
+    "{s}{d:.{p}f}",  # 符号变体，负值已经带负号
+]
 
-        # 符号变体
-        f"+{abs(value):.{decimal_places}f}%",
-        f"-{abs(value):.{decimal_places}f}%",
+# 数值形式的格式，r为整数或浮点数的字符串形式
+NUMERIC_FORMATS = [
+    "{v:.{p}f}",  # 50.5
+    "{v:g}",  # 50.5（自动格式）
+    "{s}{v:.{p}f}",  # 符号变体
+    "{r}",  # 整数形式
+]
 
-        # 英文变体
-        f"{value:.{decimal_places}f} percent",
-        f"{value:.{decimal_places}f}pct",
-        f"{value:.{decimal_places}f} pc",
 
-        # 范围变体
-        f"{value:.{decimal_places}f}%-{value + random.uniform(5, 20):.{decimal_places}f}%",
-        f"{value:.{decimal_places}f}~{value + random.uniform(5, 20):.{decimal_places}f}%",
-    ]
+def percentage_values(num: int) -> NDArray[np.float64]:
+    """[num]，每个值先等概率选择数值策略，再在其区间内均匀抽取"""
 
-    return formats[strategy]
+    rng = numpy_rng()
+    low, high = VALUE_RANGES[uniform_ints(0, len(VALUE_RANGES) - 1, num)].T
+    return rng.uniform(low, high)
 
 
-def generate_decimal_format(value, strategy):
-    """小数形式：0.505 = 50.5%"""
-    decimal_value = value / 100  # 50% → 0.50
+def generate_explicit_format(values: NDArray[np.float64], strategy: int) -> list[str]:
+    """显式百分比：50.5%"""
 
-    decimal_places = random.choice([2, 3, 4, 5, 6])
+    rng = numpy_rng()
+    template = EXPLICIT_FORMATS[strategy]
+    decimal_places = choose([0, 1, 2, 3], len(values))
+    highs = (values + rng.uniform(5, 20, size=len(values))).tolist()
 
-    formats = [
-        f"{decimal_value:.{decimal_places}f}",  # 0.505000
-        f"{decimal_value:g}",  # 0.505（自动去除多余0）
+    return [
+        template.format(v=value, a=abs(value), h=high, p=places)
+        for value, high, places in zip(values.tolist(), highs, decimal_places)
     ]
 
-    # 符号变体
-    if value > 0:
-        formats.append(f"+{decimal_value:.{decimal_places}f}")
-    elif value < 0:
-        formats.append(f"{decimal_value:.{decimal_places}f}")  # 已经带负号
-
-    return formats[strategy]
 
+def generate_decimal_format(values: NDArray[np.float64], strategy: int) -> list[str]:
+    """小数形式：0.505 = 50.5%"""
 
-def generate_numeric_format(value, strategy):
-    """数值形式：50.5 = 50.5%（不带%符号）"""
-    decimal_places = random.choice([0, 1, 2, 3])
+    template = DECIMAL_FORMATS[strategy]
+    decimal_values = (values / 100).tolist()  # 50% → 0.50
+    decimal_places = choose([2, 3, 4, 5, 6], len(values))
+    signs = np.where(values > 0, "+", "").tolist()
 
-    formats = [
-        f"{value:.{decimal_places}f}",  # 50.5
-        f"{value:g}",  # 50.5（自动格式）
+    return [
+        template.format(d=decimal_value, s=sign, p=places)
+        for decimal_value, sign, places in zip(decimal_values, signs, decimal_places)
     ]
 
-    # 符号变体
-    if value > 0:
-        formats.append(f"+{value:.{decimal_places}f}")
-    else:
-        formats.append(f"{value:.{decimal_places}f}")
 
-    # 整数形式
-    if value == int(value):
-        formats.append(str(int(value)))
-    else:
-        formats.append(str(float(value)))
+def generate_numeric_format(values: NDArray[np.float64], strategy: int) -> list[str]:
+    """数值形式：50.5 = 50.5%（不带%符号）"""
 
-    return formats[strategy]
+    template = NUMERIC_FORMATS[strategy]
+    decimal_places = choose([0, 1, 2, 3], len(values))
+    signs = np.where(values > 0, "+", "").tolist()
+
+    return [
+        template.format(v=value, s=sign, p=places, r=int(value) if value.is_integer() else value)
+        for value, sign, places in zip(values.tolist(), signs, decimal_places)
+    ]
 
 
 def percents(num: int) -> list[str]:
     representations = [('explicit', 8), ('decimal', 2), ('numeric', 3)]
-    samples = []
 
     representation, format_num = random.choice(representations)
     explicit_format = random.randint(0, format_num)
+    values = percentage_values(num)
 
-    for _ in range(num):
-        samples.append(generate_percentage(representation, explicit_format))
+    if representation == 'explicit':
+        # 形式A：显式百分比（带%符号）
+        return generate_explicit_format(values, explicit_format)
+
+    elif representation == 'decimal':
+        # 形式B：小数形式（0.50 = 50%）
+        return generate_decimal_format(values, explicit_format)
 
-    return samples
+    else:  # numeric
+        # 形式C：数值形式（50 = 50%，不带%）
+        return generate_numeric_format(values, explicit_format)
@@ -1,6 +1,7 @@
+import random
 from enum import Enum
-from random import Random
-from typing import Optional
+
+from scripts.generator_context import uniform_ints, choose
 
 
 class PhoneFormat(Enum):
@@ -24,53 +25,24 @@ class PhoneFormat(Enum):
 class PhoneGenerator:
     """手机号生成"""
 
-    rng: Optional[Random] = None
-
-    def __init__(self):
-        if self.rng is None:
-            self.rng = Random()
+    def __call__(self, fmt: PhoneFormat, num: int) -> list[str]:
+        """同一格式的num个手机号，11位号码一次性抽取为整数后按位切分"""
 
-    def __call__(self, fmt: PhoneFormat) -> str:
-
-        carrier = self._carrier_code()
+        # [num]，1 + 运营商代码（第2位，3~9） + 9位随机数字
+        numbers = 10 ** 10 + uniform_ints(3, 9, num) * 10 ** 9 + uniform_ints(0, 10 ** 9 - 1, num)
+        digits = list(map(str, numbers.tolist()))
 
         if fmt == PhoneFormat.TWO_PART:
-            if self.rng.random() < 0.5:
-                # 138 00001111
-                prefix = f"1{carrier}{self._random_digit()}"
-                middle = ""
-                suffix = self._random_digits(8)
-            else:
-                # 1380 1111222
-                prefix = f"1{carrier}{self._random_digits(2)}"
-                middle = ""
-                suffix = self._random_digits(7)
-        else:
-            prefix = f"1{carrier}{self._random_digit()}"
-            middle = self._random_digits(4)
-            suffix = self._random_digits(4)
-
-        return fmt.format(prefix, middle, suffix)
+            # 138 00001111 或 1380 1111222
+            prefix_lengths = choose([3, 4], num)
+            return [
+                fmt.format(phone[:length], "", phone[length:]) for phone, length in zip(digits, prefix_lengths)
+            ]
 
-    def _carrier_code(self) -> str:
-        """运营商代码（第2位）"""
-        return str(self.rng.choice([3, 4, 5, 6, 7, 8, 9]))
-
-    def _random_digit(self) -> str:
-        """单个随机数字"""
-        return str(self.rng.randint(0, 9))
-
-    def _random_digits(self, n: int) -> str:
-        """n位随机数字"""
-        return ''.join(self._random_digit() for _ in range(n))
+        return [fmt.format(phone[:3], phone[3:7], phone[7:]) for phone in digits]
 
 
 def phones(num: int) -> list[str]:
     generator = PhoneGenerator()
-    fmt = generator.rng.choice(list(PhoneFormat))
-    samples = []
-
-    for _ in range(num):
-        samples.append(generator(fmt))
-
-    return samples
+    fmt = random.choice(list(PhoneFormat))
+    return generator(fmt, num)
@@ -1,6 +1,7 @@
 import random
 
-from faker import Faker
+from scripts.generator_context import REFERENCE_TIME
+from scripts.providers import get_faker
 
 # 时间格式变体列表
 time_formats = [
@@ -57,11 +58,11 @@ time_formats = [
 
 
 def times(num: int) -> list[str]:
-    faker = Faker("zh_CN")
+    faker = get_faker("zh_CN")
     time_format = random.choice(time_formats)
     samples = []
 
     for _ in range(num):
-        samples.append(faker.date_time().strftime(time_format))
+        samples.append(faker.date_time(end_datetime=REFERENCE_TIME).strftime(time_format))
 
     return samples
@@ -1,10 +1,10 @@
 from importlib.metadata import version, PackageNotFoundError
 
-from .interface import ColumnClassifier
+from .interface import ColumnClassifier, TableClassification
 
 try:
     __version__ = version("tabular-sense")
 except PackageNotFoundError:
     __version__ = "unknown"
 
-__all__ = [ColumnClassifier]
+__all__ = [ColumnClassifier, TableClassification]
@@ -0,0 +1,34 @@
+from enum import Enum
+
+import torch
+from torch import Tensor
+
+
+class Aggregation(Enum):
+    """
+    多次抽样推理结果的聚合策略
+
+    同一列组装多个不同的推理窗口分别推理后，按该策略合并为最终的各类型概率。
+
+    Attributes:
+        MEAN_LOGITS: 先对logits取平均，再经sigmoid得到概率
+        MEAN_PROBA: 先经sigmoid得到概率，再取平均
+        VOTE: 各类型以0.5为阈值分别投票，得票比例作为概率
+    """
+
+    MEAN_LOGITS = 0
+    MEAN_PROBA = 1
+    VOTE = 2
+
+    def __call__(self, logits: Tensor) -> Tensor:
+        """
+        :param logits: [n_draws, n_classes]
+        :return: [n_classes]
+        """
+
+        if self == Aggregation.MEAN_LOGITS:
+            return torch.sigmoid(logits.mean(dim=0))
+        elif self == Aggregation.MEAN_PROBA:
+            return torch.sigmoid(logits).mean(dim=0)
+        else:
+            return (torch.sigmoid(logits) > 0.5).float().mean(dim=0)
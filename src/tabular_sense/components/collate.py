@@ -1,41 +1,185 @@
+import bisect
+import math
+from typing import Sequence
+
+import numpy as np
 import torch
+from numpy.typing import NDArray
 from torch import Tensor
-from torch.nn.functional import pad
 
-from src.tabular_sense.components.dataset import TokenizedColumnSample, BatchedColumnSample
+from src.tabular_sense.components.dataset import TokenizedColumnSample, BatchedColumnSample, PackedColumnSample
 from src.tabular_sense.core.constants import PAD_TOKEN_ID
 
+# 最短的长度桶
+MIN_BUCKET_LEN = 32
+
+
+def length_buckets(max_len: int, min_len: int = MIN_BUCKET_LEN) -> tuple[int, ...]:
+    """
+    编译模式下的序列长度分桶：从min_len起的2的幂，最后一个桶为max_len
+
+    如max_len=512时为(32, 64, 128, 256, 512)，批次长度向上取整到所在的桶，编译的图数量以桶数为上限
+    """
+
+    buckets = []
+    length = min_len
+    while length < max_len:
+        buckets.append(length)
+        length *= 2
+    buckets.append(max_len)
+
+    return tuple(buckets)
+
+
+def pad_inputs(
+        input_ids: Sequence[Tensor | NDArray[np.integer]],
+        pad_to_multiple_of: int | None = None,
+        max_len: int | None = None,
+        buckets: Sequence[int] | None = None,
+) -> tuple[Tensor, Tensor]:
+    """
+    批次内输入的右填充，训练与推理共用
+
+    预先分配整个批次的缓冲区，逐行拷贝一次输入，mask由长度向量化生成
 
-def collate_fn(batch: list[TokenizedColumnSample]) -> BatchedColumnSample:
-    """完成分组后批次内数据的padding"""
+    :param input_ids: 各输入的token ids，可为张量或NumPy数组（如内存映射的切片）
+    :param pad_to_multiple_of: 将批次长度向上取整到该值的倍数，便于kernel对齐
+    :param max_len: 批次长度上限，超出的输入被截断，取整后的长度也不超过该值
+    :param buckets: 升序的长度桶（见length_buckets），批次长度向上取整到不小于它的最小桶
+    :return: tuple[input_ids [batch, batch_len], padding_masks [batch, batch_len+1]]；
+        padding_masks已包含首列的[CLS]位置，遵循PyTorch的src_key_padding_mask约定：True表示padding
+    """
 
-    # [seq_len] * batch
-    input_ids = [b.input for b in batch]
-    # [n_classes] * batch
-    labels = [b.target for b in batch]
+    lengths = [len(input_id) if max_len is None else min(len(input_id), max_len) for input_id in input_ids]
+    batch_len = max(lengths)
 
-    # Padding
-    max_input_len = max(len(input_id) for input_id in input_ids)
-    # [max_input_len] * batch
-    padded_inputs: list[Tensor] = []
-    # [max_input_len] * batch
-    attention_masks: list[Tensor] = []
+    if pad_to_multiple_of is not None:
+        batch_len = math.ceil(batch_len / pad_to_multiple_of) * pad_to_multiple_of
+        if max_len is not None:
+            batch_len = min(batch_len, max_len)
 
-    for input_id in input_ids:
-        padding_length = max_input_len - len(input_id)
-        # 简单的右填充
-        padded = pad(input=input_id, pad=(0, padding_length), value=PAD_TOKEN_ID)
-        mask = torch.cat([torch.ones(len(input_id)), torch.zeros(padding_length)])
+    if buckets is not None:
+        batch_len = buckets[min(bisect.bisect_left(buckets, batch_len), len(buckets) - 1)]
 
-        padded_inputs.append(padded)
-        attention_masks.append(mask)
+    # [batch, batch_len]
+    padded = np.full((len(input_ids), batch_len), PAD_TOKEN_ID, dtype=np.int64)
+    for row, (input_id, length) in enumerate(zip(input_ids, lengths)):
+        padded[row, :length] = input_id[:length]
+
+    # 位置从-1开始，-1即[CLS]，恒不屏蔽
+    # [[F, F, F, F, T, T]
+    #  [F, F, F, F, F, F]
+    #  [F, F, T, T, T, T]]
+    # [batch, batch_len+1]
+    padding_masks = torch.arange(-1, batch_len) >= torch.tensor(lengths).unsqueeze(1)
+
+    return torch.from_numpy(padded), padding_masks
+
+
+def collate_fn(
+        batch: list[TokenizedColumnSample],
+        pad_to_multiple_of: int | None = None,
+        max_len: int | None = None,
+        buckets: Sequence[int] | None = None,
+) -> BatchedColumnSample:
+    """完成分组后批次内数据的padding，参数含义见pad_inputs，可通过functools.partial绑定"""
+
+    # [batch, batch_len], [batch, batch_len+1]
+    input_ids, padding_masks = pad_inputs([b.input for b in batch], pad_to_multiple_of, max_len, buckets)
+    # 分桶（编译模式）时始终保留mask，使同一长度桶只对应一个图
+    if buckets is None and not padding_masks.any():
+        padding_masks = None
 
     return BatchedColumnSample(
-        # [batch, max_input_len]
-        input_ids=torch.stack(padded_inputs),
-        # [batch, max_input_len]
-        attention_masks=torch.stack(attention_masks),
+        # [batch, batch_len]
+        input_ids=input_ids,
+        # [batch, batch_len+1]，批次内没有padding时为None，模型跳过mask
+        padding_masks=padding_masks,
         # [batch, n_classes]
         # loss计算需要标准类型为float
-        labels=torch.stack(labels).float(),
+        labels=torch.stack([b.target for b in batch]).float(),
     )
+
+
+def pack_inputs(input_ids: Sequence[Tensor | NDArray[np.integer]], max_len: int) -> tuple[Tensor, Tensor, Tensor, Tensor]:
+    """
+    将多个输入打包为若干行，训练与推理共用
+
+    每个输入前预留一个[CLS]位置，占用len+1个位置，每行至多max_len+1个位置（与位置编码长度一致）。
+    按长度降序依次放入第一个剩余空间足够的行（首次适配递减）。
+
+    :param input_ids: 各输入长度均不超过max_len
+    :return: tuple[input_ids, position_ids, segment_ids, cls_index]，含义见PackedColumnSample，
+        cls_index与输入顺序一致
+    """
+
+    capacity = max_len + 1
+    # 各行已占用的位置数
+    row_fills: list[int] = []
+    # 各输入的放置位置：(行, 起始位置, 行内序号)
+    placements: list[tuple[int, int, int]] = [(0, 0, 0)] * len(input_ids)
+    row_segments: list[int] = []
+
+    for idx in sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]), reverse=True):
+        size = len(input_ids[idx]) + 1
+        row = next((row for row, fill in enumerate(row_fills) if fill + size <= capacity), len(row_fills))
+
+        if row == len(row_fills):
+            row_fills.append(0)
+            row_segments.append(0)
+
+        placements[idx] = (row, row_fills[row], row_segments[row])
+        row_fills[row] += size
+        row_segments[row] += 1
+
+    n_rows, row_len = len(row_fills), max(row_fills)
+    # [n_rows, row_len]
+    packed = np.full((n_rows, row_len), PAD_TOKEN_ID, dtype=np.int64)
+    # [n_rows, row_len]
+    position_ids = np.zeros((n_rows, row_len), dtype=np.int64)
+    # [n_rows, row_len]
+    segment_ids = np.full((n_rows, row_len), -1, dtype=np.int64)
+    # [n_inputs]
+    cls_index = np.empty(len(input_ids), dtype=np.int64)
+
+    for idx, (input_id, (row, start, segment)) in enumerate(zip(input_ids, placements)):
+        length = len(input_id)
+        # [CLS]位于start，输入位于其后
+        packed[row, start + 1:start + 1 + length] = input_id
+        position_ids[row, start:start + 1 + length] = np.arange(length + 1)
+        segment_ids[row, start:start + 1 + length] = segment
+        cls_index[idx] = row * row_len + start
+
+    return tuple(map(torch.from_numpy, (packed, position_ids, segment_ids, cls_index)))
+
+
+def pack_collate_fn(batch: list[TokenizedColumnSample], max_len: int) -> PackedColumnSample:
+    """打包模式的collate_fn，需通过functools.partial绑定max_len"""
+
+    # [n_rows, row_len] * 3, [batch]
+    input_ids, position_ids, segment_ids, cls_index = pack_inputs([b.input for b in batch], max_len)
+
+    return PackedColumnSample(
+        input_ids=input_ids,
+        position_ids=position_ids,
+        segment_ids=segment_ids,
+        cls_index=cls_index,
+        # [batch, n_classes]
+        labels=torch.stack([b.target for b in batch]).float(),
+    )
+
+
+def model_inputs(batch: BatchedColumnSample | PackedColumnSample, device: torch.device) -> tuple[Tensor | None, ...]:
+    """将批次搬到device并按Model.forward的参数顺序排列"""
+
+    if isinstance(batch, PackedColumnSample):
+        return (
+            batch.input_ids.to(device),
+            None,
+            batch.position_ids.to(device),
+            batch.segment_ids.to(device),
+            batch.cls_index.to(device),
+        )
+
+    padding_masks = batch.padding_masks.to(device) if batch.padding_masks is not None else None
+    return batch.input_ids.to(device), padding_masks
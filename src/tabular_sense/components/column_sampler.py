@@ -0,0 +1,108 @@
+import random
+from typing import Iterable
+
+from src.tabular_sense.core.constants import RAW_CORPUS_PER_INPUT
+
+# 视为空值的取值（去除首尾空白并转小写后比较）
+NULL_VALUES = frozenset({"", "null", "none", "nan", "nil", "n/a", "na", "#n/a", "\\n", "-"})
+
+
+class ColumnSampler:
+    """
+    流式列采样器
+
+    单次遍历列值，基于蓄水池采样（Algorithm R）保留至多capacity个值，内存占用为O(capacity)，
+    与列的总长度无关。可选跳过空值、对池内已有值去重，以及在组装推理窗口时优先选择不同的值。
+    """
+
+    capacity: int
+    dedup: bool
+    skip_null: bool
+    prefer_distinct: bool
+    null_values: frozenset[str]
+
+    reservoir: list[str]
+    seen: int
+    _members: set[str]
+
+    def __init__(
+            self,
+            capacity: int = 100,
+            dedup: bool = True,
+            skip_null: bool = True,
+            prefer_distinct: bool = True,
+            null_values: frozenset[str] = NULL_VALUES,
+    ):
+        """
+        :param capacity: 蓄水池容量，即最多保留的值数量
+        :param dedup: 是否跳过池内已存在的值（近似去重，被替换出池的值可再次入池）
+        :param skip_null: 是否跳过空值与空白值
+        :param prefer_distinct: 组装推理窗口时是否优先选择不同的值
+        :param null_values: 视为空值的取值集合，比较前会去除首尾空白并转小写
+        """
+
+        self.capacity = capacity
+        self.dedup = dedup
+        self.skip_null = skip_null
+        self.prefer_distinct = prefer_distinct
+        self.null_values = null_values
+
+        self.reservoir = []
+        # 参与蓄水池采样的值数量（不含被跳过的空值和重复值）
+        self.seen = 0
+        self._members = set()
+
+    def __len__(self) -> int:
+        return len(self.reservoir)
+
+    def add(self, value: str):
+        """采样单个值"""
+
+        if self.skip_null and value.strip().lower() in self.null_values:
+            return
+
+        if self.dedup and value in self._members:
+            return
+
+        self.seen += 1
+
+        if len(self.reservoir) < self.capacity:
+            self.reservoir.append(value)
+            self._members.add(value)
+            return
+
+        # 第n个值以 capacity/n 的概率替换池中随机位置
+        slot = random.randrange(self.seen)
+        if slot < self.capacity:
+            self._members.discard(self.reservoir[slot])
+            self.reservoir[slot] = value
+            self._members.add(value)
+
+    def extend(self, values: Iterable[str]) -> "ColumnSampler":
+        """采样一组值，返回自身以便链式调用"""
+
+        for value in values:
+            self.add(value)
+
+        return self
+
+    def draw(self, k: int = RAW_CORPUS_PER_INPUT) -> list[str]:
+        """
+        从池中组装一个k个值的推理窗口
+
+        优先选择不同值时，不同值数量足够则无放回抽取；不足时全部选入，剩余位置从池中有放回补齐。
+        """
+
+        if not self.reservoir:
+            raise ValueError("No valid values sampled")
+
+        if not self.prefer_distinct:
+            return random.choices(self.reservoir, k=k)
+
+        distinct = list(dict.fromkeys(self.reservoir))
+        if len(distinct) >= k:
+            return random.sample(distinct, k)
+
+        window = distinct + random.choices(self.reservoir, k=k - len(distinct))
+        random.shuffle(window)
+        return window
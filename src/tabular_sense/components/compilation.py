@@ -0,0 +1,127 @@
+import os
+from dataclasses import dataclass, field
+
+import torch
+from torch import Tensor
+from torch.nn import Module
+
+from src.tabular_sense.components.collate import length_buckets
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.path import get_models_dir
+
+# 编译模式下训练开始时先以eager模式运行的步数，作为加速比的基准
+EAGER_REFERENCE_STEPS = 20
+
+
+@dataclass
+class CompileStats:
+    """
+    编译耗时与稳态加速统计，仅统计训练步
+
+    每个序列长度首次出现的训练步包含编译耗时，之后的训练步计为稳态
+    """
+
+    shapes: set[int] = field(default_factory=set)
+    compiles: int = 0
+    eager_seconds: float = 0.0
+    eager_steps: int = 0
+    compile_seconds: float = 0.0
+    steady_seconds: float = 0.0
+    steady_steps: int = 0
+
+    def record(self, seq_len: int, seconds: float, compiled: bool):
+        if not compiled:
+            self.eager_seconds += seconds
+            self.eager_steps += 1
+        elif seq_len not in self.shapes:
+            self.shapes.add(seq_len)
+            self.compiles += 1
+            self.compile_seconds += seconds
+        else:
+            self.steady_seconds += seconds
+            self.steady_steps += 1
+
+    @property
+    def eager_step(self) -> float:
+        return self.eager_seconds / max(self.eager_steps, 1)
+
+    @property
+    def steady_step(self) -> float:
+        return self.steady_seconds / max(self.steady_steps, 1)
+
+    @property
+    def overhead(self) -> float:
+        """编译的额外耗时：首次步骤耗时减去同等数量稳态步骤的耗时"""
+        return max(self.compile_seconds - self.compiles * self.steady_step, 0.0)
+
+    def report(self) -> list[str]:
+        lines = [f"    编译: {self.compiles}次, 额外耗时 {self.overhead:.1f}s"]
+
+        if self.eager_steps and self.steady_steps:
+            saved = self.eager_step - self.steady_step
+            lines.append(
+                f"    稳态: {self.steady_step * 1000:.1f}ms/step, eager {self.eager_step * 1000:.1f}ms/step "
+                f"(×{self.eager_step / self.steady_step:.2f})"
+            )
+            if saved > 0:
+                lines.append(f"    回本: {self.overhead / saved:.0f} steps")
+
+        return lines
+
+
+class CompiledModel:
+    """
+    torch.compile编译的模型前向，训练与推理共用
+
+    序列长度由调用方按length_buckets向上取整（见pad_inputs的buckets参数），batch维标记为动态，
+    因此每个长度桶在train/eval模式下各编译一次。编译产物缓存在models/compile_cache，跨进程复用。
+    仅支持padding模式，且调用方应始终传入padding_masks，避免同一长度桶因mask有无而重复编译。
+    分布式训练时传入的是DistributedDataParallel包装后的模型，只能按前向调用，不能假定有Model的属性。
+    """
+
+    model: Module
+    buckets: tuple[int, ...]
+    stats: CompileStats
+
+    def __init__(self, model: Module, config: Config):
+        if config.packing:
+            raise ValueError("Compiled mode does not support packed batches")
+
+        # inductor在首次编译时读取缓存目录
+        cache_dir = get_models_dir() / "compile_cache"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir))
+
+        self.model = model
+        self.buckets = length_buckets(config.max_len)
+        self.stats = CompileStats()
+
+        # 每个长度桶在train/eval模式下各有一个图
+        torch._dynamo.config.cache_size_limit = max(torch._dynamo.config.cache_size_limit, 2 * len(self.buckets))
+        self._compile()
+
+    def __call__(self, input_ids: Tensor, padding_masks: Tensor | None) -> Tensor:
+        """参数与Model.forward的padding模式一致"""
+
+        # batch维不参与特化，仅序列长度决定编译的图
+        torch._dynamo.maybe_mark_dynamic(input_ids, 0)
+        if padding_masks is not None:
+            torch._dynamo.maybe_mark_dynamic(padding_masks, 0)
+
+        return self.compiled(input_ids, padding_masks)
+
+    def reset(self):
+        """
+        丢弃已编译的图
+
+        dropout概率作为常量编译进图中，DropoutScheduler调整后需要重新编译；
+        重新编译可命中inductor的磁盘缓存
+        """
+
+        torch._dynamo.reset()
+        self.stats.shapes.clear()
+        self._compile()
+
+    def _compile(self):
+        # 序列长度已分桶，静态形状可生成特化的kernel
+        self.compiled = torch.compile(self.model, dynamic=False)
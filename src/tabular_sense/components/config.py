@@ -18,6 +18,18 @@ class Config:
     min_delta: float = 1e-6
     max_len: int = 512
     max_grad_norm: float = 1.0
+    # 每累积多少个批次的梯度更新一次参数，有效批次为batch_size×accumulation_steps
+    accumulation_steps: int = 1
+    # 训练集按token预算组批时每个批次padding后的token数上限，None时按batch_size固定组批
+    max_tokens: int | None = None
+    # 是否将多个样本打包到同一行训练（块对角注意力），短列占多数时提高吞吐
+    packing: bool = False
+    # 批次长度向上取整到该值的倍数（如8），None时不取整
+    pad_to_multiple_of: int | None = None
+    # 是否以bf16自动混合精度运行前向（训练与推理），需设备支持bf16；loss始终以fp32计算
+    mixed_precision: bool = False
+    # 是否以torch.compile编译模型前向，批次长度按length_buckets分桶以限制重新编译的次数，不支持packing
+    compiled: bool = False
     device: torch.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
     def __init__(
@@ -43,6 +55,7 @@ class Config:
             f"{self.d_model}d×{self.n_head}h×{self.n_encoder_layers}L | "
             f"lr={self.learning_rate} | dropout={self.dropout}→{self.max_dropout} | "
             f"batch={self.batch_size}"
+            + (f"×{self.accumulation_steps}" if self.accumulation_steps > 1 else "")
         )
 
     @staticmethod
@@ -1,14 +1,21 @@
-import pickle
+import hashlib
+import json
+import mmap
+import os
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
+from typing import Callable, Iterable
 
+import numpy as np
 import torch
+from numpy.typing import NDArray
 from torch import Tensor, Generator
-from torch.utils.data import Dataset, Subset, random_split
+from torch.utils.data import Dataset, Subset, random_split, get_worker_info
 
 from src.tabular_sense.components.config import Config
 from src.tabular_sense.components.tokenizer import Tokenizer
-from src.tabular_sense.core.constants import VAL_RATIO, TEST_RATIO, RANDOM_SEED
+from src.tabular_sense.core.constants import VAL_RATIO, TEST_RATIO, RANDOM_SEED, N_CLASSES
 from src.tabular_sense.core.enum_util import ColumnType
 
 
@@ -32,10 +39,10 @@ class TokenizedColumnSample:
     单个列训练样本，已tokenized
     
     Attributes:
-        input: 编码后的输入tokens
+        input: 编码后的输入tokens，预tokenized数据集中为内存映射数组的切片
         target: 编码后的输出tokens
     """
-    input: Tensor
+    input: Tensor | NDArray[np.integer]
     target: Tensor
 
 
@@ -45,62 +52,215 @@ class BatchedColumnSample:
     分组后，批次内数据padding之后的结构
     
     Attributes:
-        input_ids: [batch, max_input_len]
-        attention_masks: [batch, max_input_len]
+        input_ids: [batch, batch_len]
+        padding_masks: [batch, batch_len+1]，bool，含首列的[CLS]位置，True表示padding；批次内没有padding时为None
         labels: [batch, n_classes]
     """
 
     input_ids: Tensor
-    attention_masks: Tensor
+    padding_masks: Tensor | None
+    labels: Tensor
+
+
+@dataclass
+class PackedColumnSample:
+    """
+    打包后的批次结构：多个样本首尾相接放入同一行，每个样本前预留一个[CLS]位置，行内各样本互不可见
+
+    Attributes:
+        input_ids: [n_rows, row_len]，[CLS]与padding位置为PAD_TOKEN_ID
+        position_ids: [n_rows, row_len]，各样本从[CLS]的0开始重新计数
+        segment_ids: [n_rows, row_len]，样本在行内的序号，padding为-1
+        cls_index: [batch]，各样本[CLS]在展平后[n_rows*row_len]中的位置
+        labels: [batch, n_classes]
+    """
+
+    input_ids: Tensor
+    position_ids: Tensor
+    segment_ids: Tensor
+    cls_index: Tensor
     labels: Tensor
 
 
 class ColumnDataset(Dataset):
-    """列数据集"""
+    """
+    列数据集
+
+    每个进程持有一份样本文件的内存映射，首次访问时打开并一直复用；fork出的DataLoader worker
+    检测到进程变化后重新打开，也可通过worker_init_fn在worker启动时显式重置。
+    """
 
     sample_file: Path
     tokenizer: Tokenizer
     config: Config
-    offsets: list[int]
+    offsets: NDArray[np.int64]
+
+    _mapped: mmap.mmap | None
+    _pid: int | None
+    _lengths: NDArray[np.int32] | None
 
     def __init__(self, sample_file: Path, tokenizer: Tokenizer, config: Config):
         self.sample_file = sample_file
         self.tokenizer = tokenizer
         self.config = config
+        self._mapped = None
+        self._pid = None
+        self._lengths = None
         self._prepare_offset()
 
     def _prepare_offset(self):
-        _file = self.sample_file.open("r", encoding="utf-8")
-        cache_file = self.sample_file.with_suffix(".offset.pkl")
+        """
+        各行起始位置的索引，缓存为int64的.npy文件
 
-        if cache_file.exists() and cache_file.stat().st_mtime > self.sample_file.stat().st_mtime:
-            with open(cache_file, "rb") as cache:
-                self.offsets = pickle.load(cache)
-            return
+        样本文件由manifest记录的分片拼接而成时，索引以分片内容寻址，缓存在与样本文件同名的.index目录：
+        各分片的行偏移缓存在shards/下，重新生成部分类型后只扫描变化的分片，再按分片位置拼接；
+        否则按修改时间判断与样本文件并列的.offset.npy是否过期，过期时重新扫描整个文件。
+        以内存映射方式加载，DataLoader的各worker共享同一份只读页面，不随fork复制
+        """
+
+        shards = manifest_shards(self.sample_file)
+
+        if shards is None:
+            cache_file = self.sample_file.with_suffix(".offset.npy")
+            if not (cache_file.exists() and cache_file.stat().st_mtime > self.sample_file.stat().st_mtime):
+                np.save(cache_file, line_offsets(self.sample_file))
         else:
-            self.offsets = []
+            cache_file = self._index_file("offset", shards_digest(shards))
+            if not cache_file.exists():
+                keys = [shard.sha256 for shard in shards]
+                # 各分片的起始字节位置
+                starts = np.cumsum([0] + [shard.size for shard in shards[:-1]]).tolist()
+                offsets = [self._shard_index("offset", shard, key, line_offsets) + start
+                           for shard, key, start in zip(shards, keys, starts)]
+                self._save_index("offset", cache_file, np.concatenate(offsets, dtype=np.int64), keys)
+
+        self.offsets = np.load(cache_file, mmap_mode="r")
+
+    @property
+    def lengths(self) -> NDArray[np.int32]:
+        """
+        [n_samples]，各样本截断到max_len后的token数
 
-        self.offsets.append(_file.tell())
-        while _file.readline():
-            self.offsets.append(_file.tell())
-        self.offsets.pop()
+        未截断的长度与offset索引一同缓存，首次访问时分块批量多线程tokenize生成。
+        样本文件由分片拼接而成时按分片内容与词表寻址，只tokenize变化的分片；否则为按修改时间判断过期的.length.npy
+        """
 
-        cache_file.write_bytes(pickle.dumps(self.offsets))
-        _file.close()
+        if self._lengths is None:
+            shards = manifest_shards(self.sample_file)
+
+            if shards is None:
+                cache_file = self.sample_file.with_suffix(".length.npy")
+                if not (cache_file.exists() and cache_file.stat().st_mtime > self.sample_file.stat().st_mtime):
+                    np.save(cache_file, self._count_tokens(self.sample_file))
+            else:
+                cache_file = self._index_file("length", f"{shards_digest(shards)}:{self.tokenizer.digest}")
+                if not cache_file.exists():
+                    keys = [f"{shard.sha256}:{self.tokenizer.digest}" for shard in shards]
+                    lengths = [self._shard_index("length", shard, key, self._count_tokens)
+                               for shard, key in zip(shards, keys)]
+                    self._save_index("length", cache_file, np.concatenate(lengths, dtype=np.int32), keys)
+
+            self._lengths = np.minimum(np.load(cache_file), self.config.max_len)
+
+        return self._lengths
+
+    @staticmethod
+    def _index_key(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+    def _index_file(self, kind: str, content: str) -> Path:
+        """以内容寻址的索引文件，kind为offset或length"""
+        return self.sample_file.with_suffix(".index") / f"{self._index_key(content)}.{kind}.npy"
+
+    def _shard_index(self, kind: str, shard: "SampleShard", key: str, build: Callable[[Path], NDArray]) -> NDArray:
+        """单个分片的索引，缓存在.index/shards/下，不存在时由build从分片文件生成"""
+
+        cache_file = self.sample_file.with_suffix(".index") / "shards" / f"{self._index_key(key)}.{kind}.npy"
+        if not cache_file.exists():
+            save_array(cache_file, build(shard.path))
+
+        return np.load(cache_file)
+
+    def _save_index(self, kind: str, cache_file: Path, index: NDArray, keys: list[str]):
+        """写入拼接后的索引，并清理同类的旧索引与不再属于样本文件的分片索引"""
+
+        save_array(cache_file, index)
+        shard_files = {f"{self._index_key(key)}.{kind}.npy" for key in keys}
+
+        for path in cache_file.parent.glob(f"*.{kind}.npy"):
+            if path != cache_file:
+                path.unlink()
+        for path in (cache_file.parent / "shards").glob(f"*.{kind}.npy"):
+            if path.name not in shard_files:
+                path.unlink()
+
+    def _count_tokens(self, path: Path, chunk_size: int = 100000) -> NDArray[np.int32]:
+        """流式读取样本文件，分块批量tokenize统计未截断的token数"""
+
+        print(f"Counting tokens of {path}")
+        lengths: list[int] = []
+
+        with path.open("r", encoding="utf-8") as sample_file:
+            while chunk := list(islice(sample_file, chunk_size)):
+                texts = [encode_text(line.strip()) for line in chunk]
+                lengths.extend(map(len, self.tokenizer.encode_batch(texts)))
+                print(f"Tokens counted: {len(lengths)}")
+
+        return np.array(lengths, dtype=np.int32)
 
     def __len__(self):
         return len(self.offsets)
 
-    # 样本文件结构为：可能类型,可能类型|列名|数据<sep>数据<sep>数据
     def __getitem__(self, idx) -> TokenizedColumnSample:
-        _file = self.sample_file.open("r", encoding="utf-8")
-        _file.seek(self.offsets[idx])
-        sample = _file.readline().strip()
-        _file.close()
+        return self._parse(self._read_line(idx))
+
+    def __getitems__(self, indices: list[int]) -> list[TokenizedColumnSample]:
+        """批量读取，按文件位置顺序访问以提高局部性，返回顺序与indices一致"""
+
+        order = np.argsort(self.offsets[indices], kind="stable")
+        samples: list[TokenizedColumnSample | None] = [None] * len(indices)
+        for position in order.tolist():
+            samples[position] = self._parse(self._read_line(indices[position]))
 
-        types, column_name, data = sample.split("|", maxsplit=2)
+        return samples
+
+    def __getstate__(self) -> dict:
+        # 文件映射不随序列化传递，由接收方进程自行打开
+        state = self.__dict__.copy()
+        state["_mapped"] = None
+        state["_pid"] = None
+        return state
+
+    def _open(self) -> mmap.mmap:
+        """当前进程的样本文件映射，进程内只打开一次"""
+
+        if self._mapped is None or self._pid != os.getpid():
+            with self.sample_file.open("rb") as file:
+                self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._pid = os.getpid()
+
+        return self._mapped
+
+    def close(self):
+        """关闭当前持有的文件映射，下次访问时重新打开"""
+
+        if self._mapped is not None:
+            self._mapped.close()
+
+        self._mapped = None
+        self._pid = None
+
+    def _read_line(self, idx: int) -> str:
+        mapped = self._open()
+        start = int(self.offsets[idx])
+        end = int(self.offsets[idx + 1]) if idx + 1 < len(self.offsets) else len(mapped)
+        return mapped[start:end].decode("utf-8").strip()
+
+    # 样本文件结构为：可能类型,可能类型|列名|数据<sep>数据<sep>数据
+    def _parse(self, sample: str) -> TokenizedColumnSample:
+        types, _ = sample.split("|", maxsplit=1)
         # [seq_len]
-        encoded = self.tokenizer.encode(f"{column_name}|{data}")
+        encoded = self.tokenizer.encode(encode_text(sample))
 
         # [min(max_len, seq_len)]
         if len(encoded) > self.config.max_len:
@@ -114,9 +274,312 @@ class ColumnDataset(Dataset):
         )
 
     def split(self) -> list[Subset["ColumnDataset"]]:
-        total = len(self.offsets)
-        val_size = int(total * VAL_RATIO)
-        test_size = int(total * TEST_RATIO)
-        train_size = total - val_size - test_size
+        return random_split(self, split_sizes(len(self.offsets)), Generator().manual_seed(RANDOM_SEED))
+
+
+class TokenizedColumnDataset(Dataset):
+    """
+    预tokenized的列数据集
+
+    首次使用时将样本文件一次性tokenize，写入与样本文件同名的.tokenized目录：
+    - tokens.bin: 所有样本的token id首尾相接，词表不超过65536时为uint16，否则为int32
+    - offsets.npy: [n_samples+1]，int64，第i个样本为tokens[offsets[i]:offsets[i+1]]
+    - labels.npy: [n_samples, ceil(n_classes/8)]，uint8，按位压缩的多标签
+    - meta.json: 样本数、类别数、max_len、词表大小、词表摘要与token类型
+    - shards/: 样本文件由sample_generator的分片拼接而成时，各分片的tokenize结果，以分片内容与词表寻址
+
+    各文件均以内存映射方式加载，取样本只做零拷贝切片，不再打开文件、解析文本和tokenize。
+    样本顺序与ColumnDataset一致，相同随机种子下split结果相同。
+    """
+
+    sample_file: Path
+    tokenized_dir: Path
+    tokenizer: Tokenizer
+    config: Config
+    tokens: NDArray[np.uint16 | np.int32]
+    offsets: NDArray[np.int64]
+    labels: NDArray[np.uint8]
+
+    def __init__(self, sample_file: Path, tokenizer: Tokenizer, config: Config):
+        self.sample_file = sample_file
+        self.tokenized_dir = sample_file.with_suffix(".tokenized")
+        self.tokenizer = tokenizer
+        self.config = config
+
+        if not self._is_fresh():
+            self._tokenize()
+
+        meta = json.loads((self.tokenized_dir / "meta.json").read_text(encoding="utf-8"))
+        self.tokens = np.memmap(self.tokenized_dir / "tokens.bin", dtype=meta["dtype"], mode="r")
+        self.offsets = np.load(self.tokenized_dir / "offsets.npy", mmap_mode="r")
+        self.labels = np.load(self.tokenized_dir / "labels.npy", mmap_mode="r")
+
+    def _is_fresh(self) -> bool:
+        """
+        已有的tokenized文件对应当前的样本文件，且max_len与词表一致
+
+        样本文件由分片拼接而成时比较各分片sha256的摘要，否则要求tokenized文件晚于样本文件生成
+        """
+
+        meta_file = self.tokenized_dir / "meta.json"
+        if not meta_file.exists():
+            return False
+
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        shards = manifest_shards(self.sample_file)
+        if shards is None:
+            if meta_file.stat().st_mtime <= self.sample_file.stat().st_mtime:
+                return False
+        elif meta.get("samples") != shards_digest(shards):
+            return False
+
+        return (
+            meta["max_len"] == self.config.max_len
+            and meta["vocab_size"] == self.tokenizer.vocab_size
+            and meta.get("tokenizer") == self.tokenizer.digest
+        )
+
+    @property
+    def _dtype(self) -> type[np.integer]:
+        return np.uint16 if self.tokenizer.vocab_size <= np.iinfo(np.uint16).max + 1 else np.int32
+
+    def _tokenize(self, chunk_size: int = 10000):
+        """
+        tokenize样本文件并写入tokens.bin、offsets.npy与labels.npy
+
+        样本文件由manifest记录的分片拼接而成时逐分片处理，内容未变的分片直接读取shards/下的缓存，
+        重新生成部分类型后只tokenize变化的分片；否则流式读取样本文件分块tokenize
+        """
+
+        print(f"Tokenizing {self.sample_file}")
+        self.tokenized_dir.mkdir(parents=True, exist_ok=True)
+        shards = manifest_shards(self.sample_file)
+
+        if shards is None:
+            with self.sample_file.open("r", encoding="utf-8") as sample_file:
+                parts = (self._encode(chunk) for chunk in iter(lambda: list(islice(sample_file, chunk_size)), []))
+                lengths, labels = self._write(parts)
+        else:
+            cache_dir = self.tokenized_dir / "shards"
+            cache_dir.mkdir(exist_ok=True)
+            cache_files = [cache_dir / f"{self._cache_key(shard.sha256)}.npz" for shard in shards]
+
+            lengths, labels = self._write(
+                self._encode_shard(shard.path, cache_file) for shard, cache_file in zip(shards, cache_files)
+            )
+
+            # 清理不再属于样本文件的分片缓存
+            for path in set(cache_dir.glob("*.npz")) - set(cache_files):
+                path.unlink()
+
+        # [n_samples+1]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        np.save(self.tokenized_dir / "offsets.npy", offsets)
+        # [n_samples, ceil(n_classes/8)]
+        np.save(self.tokenized_dir / "labels.npy", labels)
+
+        # meta最后写入，记录样本文件的分片摘要，其修改时间作为整个目录的生成时间
+        (self.tokenized_dir / "meta.json").write_text(json.dumps({
+            "n_samples": len(lengths),
+            "samples": shards_digest(shards) if shards is not None else None,
+            "n_classes": N_CLASSES,
+            "max_len": self.config.max_len,
+            "vocab_size": self.tokenizer.vocab_size,
+            "tokenizer": self.tokenizer.digest,
+            "dtype": np.dtype(self._dtype).name,
+        }), encoding="utf-8")
+        print(f"Tokenized {len(lengths)} samples to {self.tokenized_dir}")
+
+    def _write(self, parts: Iterable[tuple[NDArray, NDArray[np.int64], NDArray[np.uint8]]]) \
+            -> tuple[NDArray[np.int64], NDArray[np.uint8]]:
+        """
+        将各部分的token依次写入tokens.bin
+
+        :return: tuple[各样本长度 [n_samples], 压缩标签 [n_samples, ceil(n_classes/8)]]
+        """
+
+        lengths: list[NDArray[np.int64]] = []
+        labels: list[NDArray[np.uint8]] = []
+
+        with (self.tokenized_dir / "tokens.bin").open("wb") as token_file:
+            for tokens, part_lengths, part_labels in parts:
+                tokens.tofile(token_file)
+                lengths.append(part_lengths)
+                labels.append(part_labels)
+                print(f"Tokenized: {sum(map(len, lengths))}")
+
+        if not lengths:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, (N_CLASSES + 7) // 8), dtype=np.uint8)
+
+        return np.concatenate(lengths), np.concatenate(labels)
+
+    def _encode(self, lines: list[str]) -> tuple[NDArray, NDArray[np.int64], NDArray[np.uint8]]:
+        """
+        :return: tuple[首尾相接的token [n_tokens], 各样本长度 [n_lines], 压缩标签 [n_lines, ceil(n_classes/8)]]
+        """
+
+        lines = [line.strip() for line in lines]
+        # [min(max_len, seq_len)] * n_lines
+        encoded = [ids[:self.config.max_len] for ids in self.tokenizer.encode_batch(list(map(encode_text, lines)))]
+
+        labels = []
+        for line in lines:
+            types, _ = line.split("|", maxsplit=1)
+            labels.append(ColumnType.to_multiple_label(*map(ColumnType.__getitem__, types.split(","))))
+
+        return (
+            np.fromiter((t for ids in encoded for t in ids), dtype=self._dtype),
+            np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+            np.packbits(np.array(labels, dtype=np.uint8).reshape(len(lines), N_CLASSES), axis=1, bitorder="little"),
+        )
+
+    def _encode_shard(self, path: Path, cache_file: Path) -> tuple[NDArray, NDArray[np.int64], NDArray[np.uint8]]:
+        """tokenize单个分片，结果缓存为npz"""
+
+        if cache_file.exists():
+            with np.load(cache_file) as cached:
+                return cached["tokens"], cached["lengths"], cached["labels"]
+
+        tokens, lengths, labels = self._encode(path.read_text(encoding="utf-8").splitlines())
+        # 先写临时文件再替换，中断时不留下不完整的缓存
+        temp_file = cache_file.with_suffix(".tmp.npz")
+        np.savez(temp_file, tokens=tokens, lengths=lengths, labels=labels)
+        os.replace(temp_file, cache_file)
+
+        return tokens, lengths, labels
+
+    def _cache_key(self, shard_digest: str) -> str:
+        """分片缓存的文件名：由分片内容、词表、max_len与类别数共同决定"""
+
+        key = f"{shard_digest}:{self.tokenizer.digest}:{self.config.max_len}:{N_CLASSES}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    @property
+    def lengths(self) -> NDArray[np.int64]:
+        """[n_samples]，各样本的token数"""
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx) -> TokenizedColumnSample:
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+
+        return TokenizedColumnSample(
+            # [seq_len]，内存映射的切片，不拷贝，collate时写入批次缓冲区
+            self.tokens[start:end],
+            # [n_classes]
+            torch.from_numpy(np.unpackbits(self.labels[idx], count=N_CLASSES, bitorder="little").astype(np.int64)),
+        )
+
+    def split(self) -> list[Subset["TokenizedColumnDataset"]]:
+        return random_split(self, split_sizes(len(self)), Generator().manual_seed(RANDOM_SEED))
+
+
+@dataclass(frozen=True)
+class SampleShard:
+    """
+    样本文件中的一个分片，由sample_generator写入manifest.json
+
+    Attributes:
+        path: 分片文件路径
+        sha256: 分片内容的sha256
+        size: 分片的字节数
+    """
+
+    path: Path
+    sha256: str
+    size: int
+
+
+def manifest_shards(sample_file: Path) -> list[SampleShard] | None:
+    """
+    样本文件按顺序拼接的各分片，取自同目录下sample_generator写入的manifest.json
+
+    :return: 样本文件不是由manifest中的分片拼接而成时为None
+    """
+
+    manifest_file = sample_file.parent / "manifest.json"
+    if not manifest_file.exists():
+        return None
+
+    entries = json.loads(manifest_file.read_text(encoding="utf-8")).get("shards", [])
+    if not entries or any("sha256" not in entry for entry in entries) \
+            or sum(entry["bytes"] for entry in entries) != sample_file.stat().st_size:
+        return None
+
+    return [SampleShard(sample_file.parent / "shards" / entry["file"], entry["sha256"], entry["bytes"])
+            for entry in entries]
+
+
+def shards_digest(shards: list[SampleShard]) -> str:
+    """拼接后样本文件的内容摘要，由各分片的sha256按顺序决定"""
+    return hashlib.sha256("\n".join(shard.sha256 for shard in shards).encode("ascii")).hexdigest()
+
+
+def save_array(path: Path, array: NDArray):
+    """先写临时文件再替换，中断时不留下不完整的缓存"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_suffix(".tmp.npy")
+    np.save(temp_file, array)
+    os.replace(temp_file, path)
+
+
+def encode_text(sample: str) -> str:
+    """样本行中送入tokenizer的部分：可能类型|列名|数据 -> 列名|数据"""
+    return sample.split("|", maxsplit=1)[1]
+
+
+def worker_init_fn(_: int):
+    """
+    DataLoader worker初始化：关闭从父进程继承的文件映射，worker首次访问时重新打开
+
+    TokenizedColumnDataset的只读np.memmap不带文件位置等进程内状态，fork后可直接共享，无需重置
+    """
+
+    dataset = get_worker_info().dataset
+    while isinstance(dataset, Subset):
+        dataset = dataset.dataset
+
+    if isinstance(dataset, ColumnDataset):
+        dataset.close()
+
+
+def line_offsets(path: Path, chunk_size: int = 64 * 2 ** 20) -> NDArray[np.int64]:
+    """
+    扫描文件中的换行符，得到每一行的起始字节位置
+
+    文件以内存映射方式分块扫描，每块在NumPy中向量化查找换行符，不逐行读取和解码
+
+    :param chunk_size: 每块的字节数
+    :return: [n_lines]，末尾换行之后的空行不计入
+    """
+
+    size = path.stat().st_size
+    if size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # 第一行从0开始，其余各行从换行符的下一个字节开始
+    starts = [np.zeros(1, dtype=np.int64)]
+    with path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for start in range(0, size, chunk_size):
+            chunk = np.frombuffer(mapped, dtype=np.uint8, count=min(chunk_size, size - start), offset=start)
+            starts.append(np.flatnonzero(chunk == ord("\n")).astype(np.int64) + start + 1)
+            # 释放对mmap的引用，否则无法关闭
+            del chunk
+
+    offsets = np.concatenate(starts)
+    # 以换行结尾时，最后一个换行之后没有新行
+    return offsets[offsets < size]
+
+
+def split_sizes(total: int) -> list[int]:
+    """训练、验证、测试集的样本数"""
+
+    val_size = int(total * VAL_RATIO)
+    test_size = int(total * TEST_RATIO)
+    train_size = total - val_size - test_size
 
-        return random_split(self, [train_size, val_size, test_size], Generator().manual_seed(RANDOM_SEED))
+    return [train_size, val_size, test_size]
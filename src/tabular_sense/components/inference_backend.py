@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from typing import Callable
+
+import torch
+from torch import Tensor
+
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.path import get_models_dir
+
+# 推理函数：(input_ids [batch, seq_len], padding_masks [batch, seq_len+1]) -> logits [batch, n_classes]
+Runner = Callable[[Tensor, Tensor], Tensor]
+
+
+class InferenceBackend(Enum):
+    """
+    推理后端
+
+    TORCHSCRIPT与ONNX后端运行由export导出的静态图，不构建Model、不含dropout模块；
+    INT8后端加载checkpoint后做动态int8量化。除EAGER外均固定在CPU上推理。
+
+    Attributes:
+        EAGER: 加载训练checkpoint，以PyTorch eager模式推理
+        TORCHSCRIPT: 加载导出的TorchScript图
+        ONNX: 通过onnxruntime运行导出的ONNX图，需额外安装onnxruntime
+        INT8: 编码器前馈层与分类头的Linear动态量化为int8
+        INT8_EMBEDDING: 在INT8基础上同时量化词嵌入表
+    """
+
+    EAGER = 0
+    TORCHSCRIPT = 1
+    ONNX = 2
+    INT8 = 3
+    INT8_EMBEDDING = 4
+
+    @property
+    def quantized(self) -> bool:
+        return self in (InferenceBackend.INT8, InferenceBackend.INT8_EMBEDDING)
+
+    @property
+    def exported(self) -> bool:
+        """运行导出的静态图，输入签名固定为(input_ids, padding_masks)"""
+        return self in (InferenceBackend.TORCHSCRIPT, InferenceBackend.ONNX)
+
+    def path(self, checkpoint_name: str) -> Path:
+        """导出文件路径：models/export/{checkpoint_name}/model_{checkpoint_name}.{pt|onnx}"""
+
+        if not self.exported:
+            raise ValueError(f"{self.name} backend loads the training checkpoint directly")
+
+        suffix = "pt" if self == InferenceBackend.TORCHSCRIPT else "onnx"
+        return get_models_dir() / f"export/{checkpoint_name}/model_{checkpoint_name}.{suffix}"
+
+    def device(self, config: Config) -> torch.device:
+        """后端运行所在设备，导出图与量化模型固定在CPU"""
+        return config.device if self == InferenceBackend.EAGER else torch.device("cpu")
+
+    def load(self, checkpoint_name: str, vocab_size: int, config: Config) -> Runner:
+        """加载checkpoint或导出文件，返回推理函数"""
+
+        if self == InferenceBackend.EAGER or self.quantized:
+            # 仅eager与量化后端需要完整的模型定义
+            from src.tabular_sense.components.model import Model
+
+            model = Model(vocab_size, config)
+            model.load(checkpoint_name)
+            # 推理时关闭dropout
+            model.eval()
+
+            if self == InferenceBackend.EAGER:
+                return model
+
+            from src.tabular_sense.components.quantization import QuantizedModel
+
+            return QuantizedModel(model.cpu(), self == InferenceBackend.INT8_EMBEDDING)
+
+        path = self.path(checkpoint_name)
+        if not path.exists():
+            raise FileNotFoundError(f"Exported model not found: {path}, run src/tabular_sense/export.py first")
+
+        if self == InferenceBackend.TORCHSCRIPT:
+            return torch.jit.load(str(path), map_location="cpu")
+
+        return OnnxRunner(path)
+
+
+@contextmanager
+def standard_attention():
+    """关闭MultiheadAttention的融合快速路径，使用标准算子实现的注意力"""
+
+    enabled = torch.backends.mha.get_fastpath_enabled()
+    torch.backends.mha.set_fastpath_enabled(False)
+    try:
+        yield
+    finally:
+        torch.backends.mha.set_fastpath_enabled(enabled)
+
+
+class OnnxRunner:
+    """onnxruntime推理会话，输入输出与Model.forward保持一致"""
+
+    def __init__(self, path: Path):
+        # onnxruntime为可选依赖，仅使用ONNX后端时需要
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids: Tensor, padding_masks: Tensor) -> Tensor:
+        # [batch, n_classes]
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": input_ids.cpu().numpy(),
+                "padding_masks": padding_masks.cpu().numpy(),
+            },
+        )
+        return torch.from_numpy(logits)
@@ -27,6 +27,15 @@ class MultiLabelMetrics:
     """多标签指标计算算法"""
 
     def __call__(self, all_predictions: list[Tensor], all_labels: list[Tensor]) -> Metrics:
+        return self.from_counts(self.counts(all_predictions, all_labels))
+
+    def counts(self, all_predictions: list[Tensor], all_labels: list[Tensor]) -> Tensor:
+        """
+        统计计数，可跨进程求和（all_reduce）后由from_counts计算指标
+
+        :return: [6]，float64，依次为tp、tn、fp、fn、完全匹配的样本数、样本数
+        """
+
         # 模型预测结果
         # [[1, 0, 1]
         #  [0, 1, 0]]
@@ -76,6 +85,20 @@ class MultiLabelMetrics:
         total = predictions.numel()
         assert tp + tn + fp + fn == total, f"四类统计结果之和应为{total}，实际得到{tp + fp + fn + tn}，存在重复计数或漏统计"
 
+        # 所有标签完全预测正确的样本数
+        exact_match = (predictions == labels).all(1).sum()
+
+        return torch.tensor(
+            [tp.item(), tn.item(), fp.item(), fn.item(), exact_match.item(), labels.shape[0]],
+            dtype=torch.float64,
+        )
+
+    @staticmethod
+    def from_counts(counts: Tensor) -> Metrics:
+        """由counts的统计计数计算指标"""
+
+        tp, tn, fp, fn, exact_match, n_samples = counts.tolist()
+
         # 精确率，预测为正的样本中，真正为正的比例
         precision = tp / (tp + fp + 1e-10)
 
@@ -86,11 +109,9 @@ class MultiLabelMetrics:
         f1 = 2 * precision * recall / (precision + recall + 1e-10)
 
         # Hamming Loss，平均每个标签位置上预测错误的比例
-        incorrect = (predictions != labels).float()
-        hamming_loss = incorrect.mean()  # incorrect.sum() / predictions.numel()
+        hamming_loss = (fp + fn) / (tp + tn + fp + fn)
 
         # EM，所有标签完全预测正确的样本比例
-        exact_match = (predictions == labels).all(1).float()
-        em = exact_match.mean()  # exact_match.sum() / exact_match.shape[0]
+        em = exact_match / n_samples
 
-        return Metrics(precision.item(), recall.item(), f1.item(), hamming_loss.item(), em.item())
+        return Metrics(precision, recall, f1, hamming_loss, em)
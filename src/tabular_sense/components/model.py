@@ -10,6 +10,7 @@ from src.tabular_sense.path import get_models_dir
 
 
 class Model(Module):
+    n_head: int
     embedding: Embedding
     cls_parameter: Parameter
     pos_encoding: Parameter
@@ -19,6 +20,8 @@ class Model(Module):
     def __init__(self, vocab_size: int, config: Config):
         super().__init__()
 
+        self.n_head = config.n_head
+
         # 词嵌入，将词表中的每个token都映射到d_model维度的向量空间，初始值为随机浮点值
         # [[e0_0, e0_1, e0_2, ..., e0_{d_model-1}]  <- tokens[v0]
         #  [e1_0, e1_1, e1_2, ..., e1_{d_model-1}]  <- tokens[v1]
@@ -62,7 +65,26 @@ class Model(Module):
 
         self.to(config.device)
 
-    def forward(self, input_ids: Tensor, attention_masks: Tensor) -> Tensor:
+    def forward(
+            self,
+            input_ids: Tensor,
+            padding_masks: Tensor | None,
+            position_ids: Tensor | None = None,
+            segment_ids: Tensor | None = None,
+            cls_index: Tensor | None = None,
+    ) -> Tensor:
+        """
+        :param padding_masks: bool，True表示padding；[batch, seq_len+1]时已包含[CLS]位置，直接使用，
+            [batch, seq_len]时在首列补上[CLS]位置；None表示没有padding，跳过mask，注意力可使用无mask的融合kernel。
+            非bool的mask按旧约定（1表示有效token，0表示padding）转换
+        传入segment_ids时为打包模式（见PackedColumnSample），忽略padding_masks
+
+        :return: [batch, n_classes]，打包模式下batch为样本数
+        """
+
+        if segment_ids is not None:
+            return self._forward_packed(input_ids, position_ids, segment_ids, cls_index)
+
         batch_size, seq_len = input_ids.shape
 
         # token_id映射为实际向量
@@ -76,30 +98,31 @@ class Model(Module):
         # [batch, seq_len+1, d_model]
         x = x + self.pos_encoding[:, :seq_len + 1, :]
 
-        # cls元素为明确不需要mask的部分，所以直接构建值为1的张量
-        # [[1]  <- input_0
-        #  [1]  <- input_1
-        #  [1]  <- input_2
-        #  ...
-        #  [1]] <- input_batch-1
-        # [batch, 1]
-        cls_mask = torch.ones(batch_size, 1, device=x.device)
-        # 在第一个维度将cls的mask和输入的mask连接
-        # [[1, 1, 1, ..., 1]  <- input_0
-        #  [1, 1, 1, ..., 1]  <- input_1
-        #  [1, 1, 1, ..., 1]  <- input_2
-        #  ...
-        #  [1, 1, 1, ..., 1]] <- input_batch-1
-        # [batch, seq_len+1]
-        attention_masks = torch.cat([cls_mask, attention_masks], dim=1)
-
-        # PyTorch的src_key_padding_mask约定：True表示屏蔽该位置
-        # 输入的attention_masks遵循HuggingFace约定：1表示有效，0表示padding
-        # 因此需要翻转：将0（padding）转为True（屏蔽）
-        attention_masks = attention_masks == 0
+        if padding_masks is not None and padding_masks.dtype != torch.bool:
+            # 旧约定的attention_masks：1表示有效token；直接作为src_key_padding_mask会被当作加性的浮点mask
+            padding_masks = padding_masks == 0
+
+        if padding_masks is not None and padding_masks.shape[1] == seq_len:
+            # cls元素为明确不需要mask的部分，所以直接构建值为False的张量
+            # [[F]  <- input_0
+            #  [F]  <- input_1
+            #  [F]  <- input_2
+            #  ...
+            #  [F]] <- input_batch-1
+            # [batch, 1]
+            cls_mask = torch.zeros(batch_size, 1, dtype=torch.bool, device=x.device)
+            # 在第一个维度将cls的mask和输入的mask连接，遵循PyTorch的src_key_padding_mask约定：True表示屏蔽该位置
+            # [[F, F, F, ..., T]  <- input_0
+            #  [F, F, F, ..., F]  <- input_1
+            #  [F, F, T, ..., T]  <- input_2
+            #  ...
+            #  [F, F, F, ..., T]] <- input_batch-1
+            # [batch, seq_len+1]
+            padding_masks = torch.cat([cls_mask, padding_masks], dim=1)
+
         # 将初始向量和mask送入编码器
         # [batch, seq_len+1, d_model]
-        encoded = self.encoder(x, src_key_padding_mask=attention_masks)
+        encoded = self.encoder(x, src_key_padding_mask=padding_masks)
 
         # 张量切片语法，获取第一和第三维全部数据，只取第二维的第一个元素，消除第二个维度
         # 切片语法中，标量索引意味着消除对应维度；如果要保留维度，需要使用切片索引
@@ -109,6 +132,48 @@ class Model(Module):
         # [batch, n_classes]
         return self.classifier(cls_output)
 
+    def _forward_packed(self, input_ids: Tensor, position_ids: Tensor, segment_ids: Tensor, cls_index: Tensor) -> Tensor:
+        """多个样本打包在同一行，各自的[CLS]只能看到本样本的token"""
+
+        n_rows, row_len = input_ids.shape
+
+        # [n_rows, row_len, d_model]
+        x = self.embedding(input_ids)
+
+        # 各样本的第0个位置为[CLS]，padding的segment为-1
+        # [n_rows, row_len, 1]
+        is_cls = ((position_ids == 0) & (segment_ids >= 0)).unsqueeze(-1)
+        # [1, 1, d_model]广播到所有[CLS]位置
+        # [n_rows, row_len, d_model]
+        x = torch.where(is_cls, self.cls_parameter, x)
+
+        # 位置编码按各样本内的位置取出
+        # [n_rows, row_len, d_model]
+        x = x + self.pos_encoding[0, position_ids]
+
+        # 块对角mask：只有segment相同的位置相互可见，True表示屏蔽
+        # padding的segment均为-1，只在padding之间可见，保证每一行softmax至少有一个有效位置
+        # [[F, F, T, T, T]  <- 样本0的[CLS]
+        #  [F, F, T, T, T]  <- 样本0的token
+        #  [T, T, F, F, T]  <- 样本1的[CLS]
+        #  [T, T, F, F, T]  <- 样本1的token
+        #  [T, T, T, T, F]] <- padding
+        # [n_rows, row_len, row_len]
+        attention_masks = segment_ids.unsqueeze(2) != segment_ids.unsqueeze(1)
+        # 每个注意力头使用相同的mask
+        # [n_rows*n_head, row_len, row_len]
+        attention_masks = attention_masks.repeat_interleave(self.n_head, dim=0)
+
+        # [n_rows, row_len, d_model]
+        encoded = self.encoder(x, mask=attention_masks)
+
+        # 按[CLS]在展平后的位置取出各样本的表示
+        # [batch, d_model]
+        cls_output = encoded.reshape(n_rows * row_len, -1)[cls_index]
+
+        # [batch, n_classes]
+        return self.classifier(cls_output)
+
     @property
     def param_num(self) -> str:
         return f"{sum(p.numel() for p in self.parameters()) / 1e6:.1f}M"
@@ -119,5 +184,6 @@ class Model(Module):
         if not checkpoint_dir.exists():
             raise FileNotFoundError(f"Checkpoint not found: {checkpoint_name}")
 
-        checkpoint = torch.load(checkpoint_dir)
+        # 加载到模型所在设备，GPU上训练的checkpoint也可在CPU上加载
+        checkpoint = torch.load(checkpoint_dir, map_location=self.cls_parameter.device)
         self.load_state_dict(checkpoint["model_state"])
@@ -0,0 +1,50 @@
+import io
+
+import torch
+from torch import Tensor
+from torch.ao.quantization import quantize_dynamic, default_dynamic_qconfig, float_qparams_weight_only_qconfig
+from torch.nn import Linear, Embedding, Module
+
+from src.tabular_sense.components.inference_backend import standard_attention
+from src.tabular_sense.components.model import Model
+
+
+class QuantizedModel:
+    """
+    动态int8量化模型
+
+    权重离线量化为int8，激活在推理时按批次动态量化，仅支持CPU。量化范围：
+    - 编码器前馈层与分类头的Linear
+    - 可选：词嵌入表（按行量化，float_qparams）
+    注意力的输入投影为裸参数、输出投影为NonDynamicallyQuantizableLinear，均保持fp32。
+    """
+
+    model: Model
+
+    def __init__(self, model: Model, embedding: bool = False):
+        """
+        :param model: 已加载checkpoint并处于eval模式的CPU模型
+        :param embedding: 是否同时量化词嵌入表
+        """
+
+        qconfig_spec = {Linear: default_dynamic_qconfig}
+        if embedding:
+            qconfig_spec[Embedding] = float_qparams_weight_only_qconfig
+
+        self.model = quantize_dynamic(model, qconfig_spec, dtype=torch.qint8)
+
+    @torch.no_grad()
+    def __call__(self, input_ids: Tensor, *inputs: Tensor | None) -> Tensor:
+        """参数与Model.forward一致"""
+
+        # 量化后的Linear没有weight张量，不满足融合快速路径的条件，使用标准注意力实现
+        with standard_attention():
+            return self.model(input_ids, *inputs)
+
+
+def model_size(model: Module) -> int:
+    """序列化后的state_dict大小，单位字节"""
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
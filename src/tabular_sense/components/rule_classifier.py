@@ -0,0 +1,59 @@
+from src.tabular_sense.core.constants import GENERIC_COLUMN_NAMES
+from src.tabular_sense.core.type_rule import infer_possible_types_batch, infer_fast_path_rules, all_satisfy, is_short_int
+
+# 短整数列（如布尔0/1、枚举编码、年龄）按数值规则判定的置信度
+SHORT_INT_CONFIDENCE = 0.95
+# 短整数的最大位数，4位及以上可能是时间（1430）或日期（240101），交由模型判断
+# 带前导零的编码（如性别00/01）无法由数值规则还原真实类型，同样交由模型判断
+SHORT_INT_MAX_DIGITS = 3
+
+
+class RuleClassifier:
+    """
+    基于规则的前置分类器
+
+    在模型推理前对列的采样值运行廉价的格式校验，结果明确时直接给出类型，跳过模型。
+    标签约定与样本生成一致：泛化列名下，类型为满足的所有数值规则加上真实类型；有含义的列名下只有真实类型。
+
+    - 强格式（身份证校验码、Luhn银行卡号、IP、邮箱、手机号）恰好满足一种时直接判定
+    - 泛化列名且全部为短整数时，按数值规则判定所有可能类型
+    - 其余情况（多种强格式同时满足、有含义列名下的纯数值等）交由模型判断
+    """
+
+    min_confidence: float
+
+    def __init__(self, min_confidence: float = 0.99):
+        """
+        :param min_confidence: 规则置信度不低于该值时才跳过模型
+        """
+
+        self.min_confidence = min_confidence
+
+    def __call__(self, column_name: str, values: list[str]) -> tuple[list[str], float] | None:
+        """
+        :return: tuple[类型名列表, 置信度]，无法明确判定时为None
+        """
+
+        generic = column_name in GENERIC_COLUMN_NAMES
+        rules = infer_fast_path_rules(values)
+
+        # 多种强格式同时满足（如同时通过身份证与Luhn校验的18位数字），交由模型
+        if len(rules) > 1:
+            return None
+
+        if rules:
+            rule = rules[0]
+            if rule.confidence < self.min_confidence:
+                return None
+
+            types = [rule.name, *infer_possible_types_batch([values])[0]] if generic else [rule.name]
+            return list(dict.fromkeys(types)), rule.confidence
+
+        if (
+                generic
+                and SHORT_INT_CONFIDENCE >= self.min_confidence
+                and all_satisfy(is_short_int, SHORT_INT_MAX_DIGITS)(values)
+        ):
+            return infer_possible_types_batch([values])[0], SHORT_INT_CONFIDENCE
+
+        return None
@@ -1,84 +1,92 @@
-import pickle
-import random
-from typing import cast, Iterator
+import math
+from typing import Iterator
 
+import numpy as np
+from numpy.typing import NDArray
 from torch.utils.data import Subset
 
-from src.tabular_sense.components.dataset import ColumnDataset, TokenizedColumnSample
-from src.tabular_sense.path import get_data_dir
+from src.tabular_sense.components.dataset import ColumnDataset, TokenizedColumnDataset
+from src.tabular_sense.core.constants import RANDOM_SEED
 
 
 class LengthGroupSampler:
-    """按长度分组的批次采样器，减少padding开销"""
+    """
+    按长度分组的批次采样器，减少padding开销
 
-    dataset: Subset[ColumnDataset]
+    样本长度取自数据集的长度索引（ColumnDataset.lengths或TokenizedColumnDataset的offsets），
+    分组为一次稳定排序后按batch_size切分，不再逐样本读取和tokenize
+
+    组内与批次间的打乱以(seed, epoch)为种子，分布式训练时各rank得到相同的批次序列，再按rank交错切分，
+    每个rank的批次数相同，尾部不足num_replicas的批次丢弃。
+    """
+
+    dataset: Subset[ColumnDataset | TokenizedColumnDataset]
     batch_size: int
     drop_last: bool
+    seed: int
+    rank: int
+    num_replicas: int
+    epoch: int
     length_groups: list[list[int]]
 
-    def __init__(self, dataset_type: str, dataset: Subset[ColumnDataset], batch_size: int, drop_last: bool = False):
+    def __init__(
+            self,
+            dataset_type: str,
+            dataset: Subset[ColumnDataset | TokenizedColumnDataset],
+            batch_size: int,
+            drop_last: bool = False,
+            seed: int = RANDOM_SEED,
+            rank: int = 0,
+            num_replicas: int = 1,
+    ):
+        """
+        :param dataset_type: 数据集名称（train/val/test），用于日志
+        :param rank: 分布式训练中当前进程的序号
+        :param num_replicas: 分布式训练的进程数
+        """
+
         self.dataset = dataset
         self.batch_size = batch_size
         self.drop_last = drop_last
-
-        sample_file = (get_data_dir() / "samples/samples.txt")
-        cache_file = sample_file.with_suffix(f".length-groups-{dataset_type}.pkl")
-
-        if cache_file.exists() and cache_file.stat().st_mtime > sample_file.stat().st_mtime:
-            with open(cache_file, "rb") as cache:
-                self.length_groups = pickle.load(cache)
-            return
+        self.seed = seed
+        self.rank = rank
+        self.num_replicas = num_replicas
+        self.epoch = 0
 
         print(f"Sampler[{dataset_type}] initialing")
         self.length_groups = self._group_by_length()
-        cache_file.write_bytes(pickle.dumps(self.length_groups))
         print(f"Sampler[{dataset_type}] initialed")
 
     def _group_by_length(self) -> list[list[int]]:
         """按序列长度对样本分组"""
 
-        print("Grouping by length, fetching length-index pairs")
-        # 获取所有样本的长度和索引对
-        length_index_pairs: list[tuple[int, int]] = []
-        for idx in range(len(self.dataset)):
-            dataset = cast(TokenizedColumnSample, cast(object, self.dataset[idx]))
-            length_index_pairs.append((len(dataset.input), idx))
-
-            if idx % 1000 == 0:
-                print(f"Length-index fetched: {idx}/{len(self.dataset)}")
-        print(f"Length-index pairs fetched: {len(length_index_pairs)}")
-
-        # 按长度排序
-        print("Length-index pairs sorting")
-        length_index_pairs.sort(key=lambda p: p[0])
-        print("Length-index pairs sorted")
-
-        # 按长度分组
-        print("Grouping by length")
-        groups: list[list[int]] = []
-        for idx in range(0, len(length_index_pairs), self.batch_size):
-            group: list[int] = []
-            for pair in length_index_pairs[idx: idx + self.batch_size]:
-                group.append(pair[1])
-            groups.append(group)
-
-            if idx % 1000 == 0:
-                print(f"Length-index pairs grouped: {idx}/{len(length_index_pairs)}")
-
-        print("Grouped")
-        return groups
+        # [n_subset]，子集内各样本的长度
+        lengths = self.dataset.dataset.lengths[self.dataset.indices]
+        # 稳定排序，长度相同的样本保持子集内的原有顺序
+        order = np.argsort(lengths, kind="stable")
+        # 每batch_size个切分为一组，最后一组可能不足batch_size
+        groups = np.split(order, range(self.batch_size, len(order), self.batch_size))
+
+        return [group.tolist() for group in groups if len(group)]
+
+    def set_epoch(self, epoch: int):
+        """切换到指定epoch，各rank需使用相同的epoch"""
+        self.epoch = epoch
 
     def __len__(self) -> int:
-        """返回批次总数"""
+        """返回当前rank的批次数"""
 
         if self.drop_last:
-            return len(self.dataset) // self.batch_size
+            n_batches = len(self.dataset) // self.batch_size
         else:
-            return len(self.dataset)
+            n_batches = math.ceil(len(self.dataset) / self.batch_size)
+
+        return n_batches // self.num_replicas
 
     def __iter__(self) -> Iterator[list[int]]:
-        """生成批次序列"""
+        """生成当前rank的批次序列，完整生成后自动进入下一个epoch"""
 
+        rng = np.random.default_rng([self.seed, self.epoch])
         batches: list[list[int]] = []
 
         # 为每个长度组创建批次
@@ -87,8 +95,139 @@ class LengthGroupSampler:
             if len(indices) < self.batch_size and self.drop_last:
                 continue
 
-            random.shuffle(indices)  # 组内随机
-            batches.append(indices)
+            # 组内随机
+            batches.append([indices[idx] for idx in rng.permutation(len(indices)).tolist()])
+
+        # 批次间随机
+        batches = [batches[idx] for idx in rng.permutation(len(batches)).tolist()]
+        # 各rank的批次数相同，避免梯度同步时互相等待
+        batches = batches[:len(batches) // self.num_replicas * self.num_replicas]
+
+        self.epoch += 1
+        return iter(batches[self.rank::self.num_replicas])
+
+
+class TokenBudgetSampler:
+    """
+    按token预算组批的批次采样器
+
+    每个批次padding后的token数（样本数×批次内最大长度）不超过max_tokens：短列（性别、布尔）组成大批次，
+    长列（URL、User Agent）组成小批次，每步的计算量与显存占用稳定。单个样本超出预算时独占一个批次。
+
+    每个epoch以(seed, epoch)为种子打乱样本，按bucket_size切分为桶，桶内按长度排序后贪心组批，最后打乱批次顺序。
+    桶越大padding越少、随机性越低。批次序列由seed与epoch唯一确定，__len__为当前epoch剩余的精确批次数。
+
+    采样器记录当前epoch已产出的批次数，可通过state_dict/load_state_dict从中断处继续；完整遍历一个epoch后自动进入下一个epoch。
+    DataLoader会预取批次，多worker时已产出的批次数可能略多于已训练的批次数。
+
+    分布式训练时各rank计算相同的批次序列后按rank交错切分，批次数相同；位置为rank内的批次数，各rank一致。
+    """
+
+    dataset: Subset[ColumnDataset | TokenizedColumnDataset]
+    max_tokens: int
+    bucket_size: int
+    seed: int
+    rank: int
+    num_replicas: int
+    lengths: NDArray[np.int64]
+    epoch: int
+    position: int
+    _batches: tuple[int, list[list[int]]] | None
+
+    def __init__(
+            self,
+            dataset_type: str,
+            dataset: Subset[ColumnDataset | TokenizedColumnDataset],
+            max_tokens: int = 65536,
+            bucket_size: int = 16384,
+            seed: int = RANDOM_SEED,
+            rank: int = 0,
+            num_replicas: int = 1,
+    ):
+        """
+        :param dataset_type: 数据集名称（train/val/test），用于日志
+        :param max_tokens: 每个批次padding后的token数上限
+        :param bucket_size: 每个桶的样本数，桶内按长度排序后组批
+        :param rank: 分布式训练中当前进程的序号
+        :param num_replicas: 分布式训练的进程数
+        """
+
+        self.dataset = dataset
+        self.max_tokens = max_tokens
+        self.bucket_size = bucket_size
+        self.seed = seed
+        self.rank = rank
+        self.num_replicas = num_replicas
+        # [n_subset]，子集内各样本的长度
+        self.lengths = np.asarray(dataset.dataset.lengths[dataset.indices], dtype=np.int64)
+        self.epoch = 0
+        self.position = 0
+        self._batches = None
+
+        print(f"Sampler[{dataset_type}] {len(self.lengths)} samples, max {max_tokens} tokens per batch")
+
+    def set_epoch(self, epoch: int):
+        """切换到指定epoch；与当前epoch相同时保留已产出的位置，以便恢复后继续"""
+
+        if epoch != self.epoch:
+            self.epoch = epoch
+            self.position = 0
+
+    def state_dict(self) -> dict:
+        return {"epoch": self.epoch, "position": self.position, "seed": self.seed}
+
+    def load_state_dict(self, state_dict: dict):
+        self.epoch = state_dict["epoch"]
+        self.position = state_dict["position"]
+        self.seed = state_dict["seed"]
+
+    def batches(self) -> list[list[int]]:
+        """当前epoch中当前rank的全部批次，同一epoch内只计算一次"""
+
+        if self._batches is None or self._batches[0] != self.epoch:
+            self._batches = (self.epoch, self._build_batches(self.epoch))
+
+        return self._batches[1]
+
+    def _build_batches(self, epoch: int) -> list[list[int]]:
+        rng = np.random.default_rng([self.seed, epoch])
+        permutation = rng.permutation(len(self.lengths))
+        batches: list[list[int]] = []
+
+        for start in range(0, len(permutation), self.bucket_size):
+            bucket = permutation[start:start + self.bucket_size]
+            # 桶内按长度升序
+            bucket = bucket[np.argsort(self.lengths[bucket], kind="stable")]
+
+            batch: list[int] = []
+            for idx, length in zip(bucket.tolist(), self.lengths[bucket].tolist()):
+                # 升序排列，加入当前样本后批次内最大长度即为当前样本长度
+                if batch and (len(batch) + 1) * length > self.max_tokens:
+                    batches.append(batch)
+                    batch = []
+                batch.append(idx)
+
+            if batch:
+                batches.append(batch)
+
+        # 批次间随机
+        batches = [batches[idx] for idx in rng.permutation(len(batches)).tolist()]
+        # 各rank的批次数相同，避免梯度同步时互相等待
+        batches = batches[:len(batches) // self.num_replicas * self.num_replicas]
+
+        return batches[self.rank::self.num_replicas]
+
+    def __len__(self) -> int:
+        """当前epoch剩余的批次数，从中断处恢复时即本次迭代将产出的批次数"""
+        return len(self.batches()) - self.position
+
+    def __iter__(self) -> Iterator[list[int]]:
+        batches = self.batches()
+
+        while self.position < len(batches):
+            batch = batches[self.position]
+            self.position += 1
+            yield batch
 
-        random.shuffle(batches)  # 批次间随机
-        return iter(batches)
+        self.epoch += 1
+        self.position = 0
@@ -0,0 +1,116 @@
+import csv
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from tqdm import tqdm
+
+from src.tabular_sense.components.column_sampler import ColumnSampler
+
+# 单个字段的长度上限，csv模块默认的128KiB会让个别超长字段中断整个表格的读取；取C long在各平台都可容纳的值
+FIELD_SIZE_LIMIT = 2 ** 31 - 1
+
+
+@dataclass
+class TableSample:
+    """
+    表格单次遍历后的列采样结果
+
+    Attributes:
+        columns: dict[列名, 列采样器]，顺序与表头一致
+        rows: 读取的数据行数（不含表头）
+        elapsed: 读取耗时，单位秒
+    """
+
+    columns: dict[str, ColumnSampler]
+    rows: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class TableReader:
+    """
+    CSV/TSV表格流式读取器
+
+    逐行读取文件，每列交给独立的列采样器，内存占用只与列数和采样数相关，与文件大小无关
+    """
+
+    path: Path
+    sampler_factory: Callable[[], ColumnSampler]
+    delimiter: str
+    encoding: str
+
+    def __init__(
+            self,
+            path: Path,
+            sampler_factory: Callable[[], ColumnSampler] = ColumnSampler,
+            delimiter: str | None = None,
+            encoding: str = "utf-8-sig",
+    ):
+        """
+        :param sampler_factory: 为每一列创建列采样器
+        :param delimiter: 字段分隔符，默认依据扩展名推断（.tsv/.tab为制表符，其余为逗号）
+        :param encoding: 文件编码，默认utf-8-sig，兼容Excel导出的带BOM的UTF-8文件
+        """
+
+        self.path = path
+        self.sampler_factory = sampler_factory
+        self.delimiter = delimiter or ("\t" if path.suffix.lower() in (".tsv", ".tab") else ",")
+        self.encoding = encoding
+
+    def read(self, progress: bool = True) -> TableSample:
+        """单次遍历表格，返回各列的采样结果"""
+
+        start = time.perf_counter()
+        # 字段长度上限是csv模块的全局设置，读取结束后恢复
+        field_size_limit = csv.field_size_limit(FIELD_SIZE_LIMIT)
+
+        try:
+            with self.path.open("r", encoding=self.encoding, newline="") as file:
+                reader = csv.reader(file, delimiter=self.delimiter)
+                header = next(reader, None)
+
+                if header is None:
+                    raise ValueError(f"Empty table: {self.path}")
+
+                names = self._unique_names(header)
+                samplers = [self.sampler_factory() for _ in names]
+                rows = 0
+
+                for row in tqdm(reader, f"[Table] {self.path.name}", unit="rows", disable=not progress):
+                    rows += 1
+
+                    # 短行缺失的列不参与采样，多出的字段忽略
+                    for sampler, value in zip(samplers, row):
+                        sampler.add(value)
+        finally:
+            csv.field_size_limit(field_size_limit)
+
+        return TableSample(dict(zip(names, samplers)), rows, time.perf_counter() - start)
+
+    @staticmethod
+    def _unique_names(header: list[str]) -> list[str]:
+        """
+        表头去重，重复列名追加序号：name, name.1, name.2
+
+        序号递增到与已有列名（含表头中原有的name.1等）都不重复为止，保证每列都有唯一的名称
+        """
+
+        names: list[str] = []
+        seen: set[str] = set()
+        counts: dict[str, int] = {}
+
+        for name in header:
+            name = unique = name.strip()
+            while unique in seen:
+                counts[name] = counts.get(name, 0) + 1
+                unique = f"{name}.{counts[name]}"
+
+            seen.add(unique)
+            names.append(unique)
+
+        return names
@@ -1,4 +1,6 @@
+import hashlib
 import os
+from functools import cached_property
 
 from sentencepiece import SentencePieceProcessor
 
@@ -20,6 +22,11 @@ class Tokenizer:
     def vocab_size(self) -> int:
         return self.tokenizer.vocab_size()
 
+    @cached_property
+    def digest(self) -> str:
+        """词表模型内容的sha256，用于判断tokenize缓存是否由同一词表生成"""
+        return hashlib.sha256(self.tokenizer.serialized_model_proto()).hexdigest()
+
     def piece_to_id(self, text: str) -> int:
         """编码单个token为id"""
         return self.tokenizer.PieceToId(text)
@@ -28,6 +35,10 @@ class Tokenizer:
         """编码文本为token ids"""
         return self.tokenizer.Encode(text)
 
+    def encode_batch(self, texts: list[str], num_threads: int = -1) -> list[list[int]]:
+        """批量编码文本为token ids，在SentencePiece内部多线程并行，num_threads为-1时使用全部核心"""
+        return self.tokenizer.Encode(texts, num_threads=num_threads)
+
     def decode(self, token_ids: list[int]) -> str:
         """解码token ids为文本"""
         return self.tokenizer.Decode(token_ids)
@@ -1,5 +1,16 @@
+import ipaddress
+import re
 from dataclasses import dataclass
-from typing import Callable, List, TypeVarTuple, overload
+from typing import Callable, List, Sequence, TypeVarTuple, overload
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.tabular_sense.core.utils import calculate_id_card_checksum, is_luhn_valid
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)+")
+MOBILE_PATTERN = re.compile(r"1[3-9]\d{9}")
+SHORT_INT_PATTERN = re.compile(r"[+-]?(0|[1-9]\d*)")
 
 
 # ============ 第一层：单元素验证器（纯粹的判断） ============
@@ -36,6 +47,81 @@ def is_binary(s: str) -> bool:
     return s in ('0', '1')
 
 
+def is_short_int(s: str, max_digits: int) -> bool:
+    """单个值是否是不超过max_digits位、无前导零的十进制整数字面量"""
+    return SHORT_INT_PATTERN.fullmatch(s) is not None and len(s.lstrip("+-")) <= max_digits
+
+
+def _compact_digits(s: str) -> str:
+    """去除空格与连字符分隔"""
+    return s.replace(" ", "").replace("-", "")
+
+
+def is_id_card(s: str) -> bool:
+    """单个值是否是校验码正确的18位身份证号（允许空格或连字符分隔）"""
+    compact = _compact_digits(s)
+    return (
+            len(compact) == 18
+            and compact[:17].isascii()
+            and compact[:17].isdigit()
+            and calculate_id_card_checksum(compact[:17]).upper() == compact[17].upper()
+    )
+
+
+def is_bank_card(s: str) -> bool:
+    """单个值是否是通过Luhn校验的16~19位银行卡号（允许空格或连字符分隔）"""
+    compact = _compact_digits(s)
+    return (
+            16 <= len(compact) <= 19
+            and compact.isascii()
+            and compact.isdigit()
+            and is_luhn_valid(compact)
+    )
+
+
+def is_ip(s: str) -> bool:
+    """单个值是否是IPv4/IPv6地址，允许端口或CIDR后缀（IPv4前缀长度0~32，IPv6为0~128）"""
+    address = s
+
+    if address.startswith("["):
+        # [IPv6]:port
+        address, _, port = address[1:].partition("]:")
+        if not port.isdigit():
+            return False
+    elif address.count(":") == 1:
+        # IPv4:port
+        address, _, port = address.partition(":")
+        if not port.isdigit():
+            return False
+
+    address, _, prefix = address.partition("/")
+    if "/" in s and not prefix.isdigit():
+        return False
+
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+
+    return not prefix or int(prefix) <= ip.max_prefixlen
+
+
+def is_email(s: str) -> bool:
+    """单个值是否符合邮箱地址的基本形态"""
+    return EMAIL_PATTERN.fullmatch(s) is not None
+
+
+def is_phone(s: str) -> bool:
+    """单个值是否是中国大陆手机号，允许+86/0前缀以及空格、连字符、括号分隔"""
+    compact = _compact_digits(s).replace("(", "").replace(")", "")
+    compact = compact.removeprefix("+86")
+
+    if len(compact) == 12 and compact.startswith("0"):
+        compact = compact[1:]
+
+    return MOBILE_PATTERN.fullmatch(compact) is not None
+
+
 # ============ 第二层：通用组合器（框架） ============
 T = TypeVarTuple("T")
 
@@ -85,6 +171,99 @@ TYPE_RULES = [
 ]
 
 
+# 推理快速路径使用的强格式规则：格式本身足以确定类型，无需模型
+@dataclass
+class FastPathRule(TypeRule):
+    """
+    Attributes:
+        confidence: 规则命中时给出的置信度
+        min_values: 规则生效所需的最少样本值数量，避免少量值偶然满足校验
+    """
+
+    confidence: float
+    min_values: int = 1
+
+
+FAST_PATH_RULES = [
+    FastPathRule("ID_CARD", all_satisfy(is_id_card), 0.999, 3),
+    FastPathRule("BANK_CARD", all_satisfy(is_bank_card), 0.999, 3),
+    FastPathRule("IP", all_satisfy(is_ip), 0.999, 3),
+    FastPathRule("EMAIL", all_satisfy(is_email), 0.999, 3),
+    FastPathRule("PHONE", all_satisfy(is_phone), 0.999, 3),
+]
+
+
+# ============ 向量化规则：与TYPE_RULES一一对应，基于一次解析的结果做整列比较 ============
+@dataclass
+class ParsedValues:
+    """
+    一组字符串解析一次后的数值视图，判定语义与第一层单元素验证器一致
+
+    Attributes:
+        numeric: [n_values] 是否可解析为数字，对应is_numeric
+        integer: [n_values] 是否是整数，对应is_int
+        binary: [n_values] 是否是0或1，对应is_binary
+        values: [n_values] 解析后的浮点值，不可解析处为nan
+    """
+
+    numeric: NDArray[np.bool_]
+    integer: NDArray[np.bool_]
+    binary: NDArray[np.bool_]
+    values: NDArray[np.float64]
+
+
+def parse_values(data: Sequence[str]) -> ParsedValues:
+    """解析一组字符串，每个不同的字符串只解析一次"""
+
+    # 不同字符串 -> (可解析为数字, 是整数, 是0或1, 浮点值)
+    parsed: dict[str, tuple[bool, bool, bool, float]] = {}
+    for s in dict.fromkeys(data):
+        try:
+            value = float(s)
+        except ValueError:
+            parsed[s] = (False, False, False, np.nan)
+            continue
+
+        parsed[s] = (True, is_int(s), is_binary(s), value)
+
+    if not data:
+        return ParsedValues(*(np.zeros(0, dtype=np.bool_),) * 3, np.zeros(0, dtype=np.float64))
+
+    numeric, integer, binary, values = zip(*map(parsed.__getitem__, data))
+    return ParsedValues(
+        np.array(numeric, dtype=np.bool_),
+        np.array(integer, dtype=np.bool_),
+        np.array(binary, dtype=np.bool_),
+        np.array(values, dtype=np.float64),
+    )
+
+
+@dataclass
+class VectorizedTypeRule:
+    name: str
+    predicate: Callable[[ParsedValues], NDArray[np.bool_]]
+
+
+def vectorized_in_range(min_value: float, max_value: float) -> Callable[[ParsedValues], NDArray[np.bool_]]:
+    """is_in_range的向量化版本，nan参与比较恒为False"""
+    return lambda p: p.numeric & (min_value <= p.values) & (p.values <= max_value)
+
+
+VECTORIZED_TYPE_RULES = [
+    VectorizedTypeRule("AGE", vectorized_in_range(1, 120)),
+    VectorizedTypeRule("AMOUNT", lambda p: p.numeric),
+    VectorizedTypeRule("BOOLEAN", lambda p: p.binary),
+    VectorizedTypeRule("EDUCATION", vectorized_in_range(1, 13)),
+    VectorizedTypeRule("ETHNICITY", vectorized_in_range(1, 56)),
+    VectorizedTypeRule("GENDER", lambda p: p.binary),
+    VectorizedTypeRule("FLOAT", lambda p: p.numeric & ~p.integer),
+    VectorizedTypeRule("INT", lambda p: p.integer),
+    VectorizedTypeRule("PERCENT", vectorized_in_range(-50.0, 500.0)),
+    VectorizedTypeRule("PRIORITY", vectorized_in_range(0, 5)),
+    VectorizedTypeRule("STATE", vectorized_in_range(-1, 6)),
+]
+
+
 # ============ 第四层：执行器 ============
 def infer_possible_types(data: List[str]) -> List[str]:
     """推断数据的所有可能类型"""
@@ -95,3 +274,34 @@ def infer_possible_types(data: List[str]) -> List[str]:
             possible_types.append(rule.name)
 
     return possible_types
+
+
+def infer_fast_path_rules(data: List[str]) -> List[FastPathRule]:
+    """推断数据满足的所有强格式规则"""
+    return [rule for rule in FAST_PATH_RULES if len(data) >= rule.min_values and rule.validator(data)]
+
+
+def infer_possible_types_batch(columns: Sequence[Sequence[str]]) -> List[List[str]]:
+    """
+    向量化推断多组数据各自的所有可能类型，结果与逐组调用infer_possible_types一致
+
+    所有值拼接后只解析一次，每条规则对全部值做一次向量化比较，再按组统计不满足的值数量
+    """
+
+    lengths = np.fromiter(map(len, columns), dtype=np.int64, count=len(columns))
+    # 各组在拼接数组中的结束位置，与起始位置
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    parsed = parse_values([value for column in columns for value in column])
+
+    # [n_rules, n_values]
+    violations = np.stack([~rule.predicate(parsed) for rule in VECTORIZED_TYPE_RULES])
+    # 前缀和作差得到每组不满足的值数量，空组天然为0（与all([])一致）
+    # [n_rules, n_values+1]
+    cumulative = np.concatenate([np.zeros((len(VECTORIZED_TYPE_RULES), 1), dtype=np.int64),
+                                 np.cumsum(violations, axis=1)], axis=1)
+    # [n_rules, n_columns]
+    satisfied = (cumulative[:, ends] - cumulative[:, starts]) == 0
+
+    names = [rule.name for rule in VECTORIZED_TYPE_RULES]
+    return [[names[idx] for idx in np.flatnonzero(column)] for column in satisfied.T]
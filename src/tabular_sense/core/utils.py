@@ -1,23 +1,41 @@
-from random import Random
-
-
 def calculate_id_card_checksum(id_17: str) -> str:
     """
     计算18位身份证的校验码
     id_17: 前17位字符串
+    余数为2时返回大写X
     """
     # 加权因子
     weights = [7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2]
 
     # 校验码映射
-    checksum_map = ['1', '0', ['X', 'x'], '9', '8', '7', '6', '5', '4', '3', '2']
+    checksum_map = ['1', '0', 'X', '9', '8', '7', '6', '5', '4', '3', '2']
 
     # 计算加权和
     total = sum(int(id_17[i]) * weights[i] for i in range(17))
 
     # 模11取余，映射到校验码
-    checksum = total % 11
-    if checksum == 2:
-        return Random().choice(checksum_map[checksum])
-    else:
-        return checksum_map[checksum]
+    return checksum_map[total % 11]
+
+
+def luhn_sum(number: str, double_rightmost: bool) -> int:
+    """
+    Luhn加权和：从右往左每隔一位乘2，乘积大于9时减9
+
+    double_rightmost为True时最右一位乘2（number为不含校验位的卡号），否则从右数第二位开始乘2（完整卡号）
+    """
+
+    digits = [int(digit) for digit in reversed(number)]
+    doubled = digits[0::2] if double_rightmost else digits[1::2]
+    kept = digits[1::2] if double_rightmost else digits[0::2]
+
+    return sum(kept) + sum(d * 2 - 9 if d > 4 else d * 2 for d in doubled)
+
+
+def luhn_checksum(card_number: str) -> int:
+    """计算不含校验位的卡号的Luhn校验位"""
+    return (10 - luhn_sum(card_number, True) % 10) % 10
+
+
+def is_luhn_valid(card_number: str) -> bool:
+    """含校验位的完整卡号是否通过Luhn校验"""
+    return luhn_sum(card_number, False) % 10 == 0
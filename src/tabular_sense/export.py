@@ -0,0 +1,157 @@
+"""
+将训练checkpoint导出为TorchScript与ONNX，供轻量的CPU推理后端使用
+"""
+import time
+
+import torch
+from torch import Tensor
+
+from src.tabular_sense.components.collate import pad_inputs
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.components.inference_backend import InferenceBackend, Runner, standard_attention
+from src.tabular_sense.components.model import Model
+from src.tabular_sense.components.tokenizer import Tokenizer
+
+# ONNX算子集版本
+OPSET_VERSION = 17
+# 导出图与eager模型logits的最大允许绝对误差
+PARITY_ATOL = 1e-4
+
+
+def example_inputs(vocab_size: int, lengths: list[int]) -> tuple[Tensor, Tensor]:
+    """按给定长度构造随机输入，长度不一时右侧padding"""
+
+    generator = torch.Generator().manual_seed(0)
+    # 跳过unk/bos/eos/pad特殊token
+    input_ids = [torch.randint(4, vocab_size, (length,), generator=generator) for length in lengths]
+    # [batch, max_len], [batch, max_len+1]
+    return pad_inputs(input_ids)
+
+
+@torch.no_grad()
+def export_torchscript(model: Model, inputs: tuple[Tensor, Tensor], checkpoint_name: str):
+    """追踪导出TorchScript，冻结参数后保存"""
+
+    path = InferenceBackend.TORCHSCRIPT.path(checkpoint_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # 使导出的图只包含标准算子
+    with standard_attention():
+        traced = torch.jit.trace(model, inputs)
+
+    torch.jit.save(torch.jit.freeze(traced), str(path))
+
+
+@torch.no_grad()
+def export_onnx(model: Model, inputs: tuple[Tensor, Tensor], checkpoint_name: str):
+    """导出ONNX，batch与序列长度为动态维度"""
+
+    path = InferenceBackend.ONNX.path(checkpoint_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # 使导出的图只包含标准算子
+    with standard_attention():
+        torch.onnx.export(
+            model,
+            inputs,
+            str(path),
+            input_names=["input_ids", "padding_masks"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "seq_len"},
+                # 含[CLS]位置，比input_ids多一列
+                "padding_masks": {0: "batch", 1: "mask_len"},
+                "logits": {0: "batch"},
+            },
+            opset_version=OPSET_VERSION,
+            dynamo=False,
+        )
+
+
+@torch.no_grad()
+def check_parity(model: Model, runner: Runner, inputs: tuple[Tensor, Tensor]) -> float:
+    """
+    比较导出图与Model.forward的输出
+
+    :return: logits的最大绝对误差
+    """
+
+    expected = model(*inputs)
+    actual = runner(*inputs)
+    diff = (expected - actual).abs().max().item()
+
+    if diff > PARITY_ATOL:
+        raise RuntimeError(f"Exported model diverges from Model.forward: max abs diff {diff:.2e} > {PARITY_ATOL:.0e}")
+
+    return diff
+
+
+@torch.no_grad()
+def measure(backend: InferenceBackend, checkpoint_name: str, vocab_size: int, config: Config,
+            inputs: tuple[Tensor, Tensor], repeat: int = 20) -> tuple[float, float]:
+    """
+    :return: tuple[加载耗时, 单次推理平均耗时]，单位毫秒
+    """
+
+    start = time.perf_counter()
+    runner = backend.load(checkpoint_name, vocab_size, config)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    # 预热
+    runner(*inputs)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        runner(*inputs)
+
+    return load_ms, (time.perf_counter() - start) * 1000 / repeat
+
+
+def export(checkpoint_name: str):
+    """导出TorchScript与ONNX，校验数值一致性并对比各后端的加载与推理耗时"""
+
+    config = Config.final()
+    # 导出与校验均在CPU上进行
+    config.device = torch.device("cpu")
+    tokenizer = Tokenizer()
+
+    model = Model(tokenizer.vocab_size, config)
+    model.load(checkpoint_name)
+    model.eval()
+
+    # 追踪用的输入与校验用的输入形状不同，用于验证导出图的batch与序列长度是动态的
+    trace_inputs = example_inputs(tokenizer.vocab_size, [16, 9])
+    parity_inputs = example_inputs(tokenizer.vocab_size, [config.max_len, 37, 128, 5, 300])
+    benchmark_inputs = example_inputs(tokenizer.vocab_size, [200] * 32)
+
+    print("=" * 60)
+    print(f"📦 导出 {checkpoint_name}")
+
+    export_torchscript(model, trace_inputs, checkpoint_name)
+    print(f"    TorchScript: {InferenceBackend.TORCHSCRIPT.path(checkpoint_name)}")
+    export_onnx(model, trace_inputs, checkpoint_name)
+    print(f"    ONNX: {InferenceBackend.ONNX.path(checkpoint_name)}")
+
+    print("=" * 60)
+    print("🔍 数值一致性与耗时（CPU）")
+    for backend in (InferenceBackend.EAGER, InferenceBackend.TORCHSCRIPT, InferenceBackend.ONNX):
+        try:
+            runner = backend.load(checkpoint_name, tokenizer.vocab_size, config)
+        except ImportError:
+            print(f"    {backend.name}: 未安装onnxruntime，跳过校验")
+            continue
+
+        diff = check_parity(model, runner, parity_inputs)
+        load_ms, latency_ms = measure(backend, checkpoint_name, tokenizer.vocab_size, config, benchmark_inputs)
+        print(f"    {backend.name}: 最大误差 {diff:.2e} | 加载 {load_ms:.1f}ms | 推理 {latency_ms:.2f}ms/batch")
+    print("=" * 60)
+
+
+def main():
+    import sys
+
+    name = sys.argv[1] if len(sys.argv) > 1 else "2025-10-30"
+    export(name)
+
+
+if __name__ == '__main__':
+    main()
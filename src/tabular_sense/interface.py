@@ -1,51 +1,159 @@
 """
 表格列语义分类推理接口
 """
-import random
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterable
 
 import torch
 from torch import Tensor
 
+from src.tabular_sense.components.aggregation import Aggregation
+from src.tabular_sense.components.collate import pad_inputs, pack_inputs
+from src.tabular_sense.components.column_sampler import ColumnSampler
 from src.tabular_sense.components.config import Config
-from src.tabular_sense.components.model import Model
+from src.tabular_sense.components.inference_backend import InferenceBackend, Runner
+from src.tabular_sense.components.rule_classifier import RuleClassifier
+from src.tabular_sense.components.table_reader import TableReader
 from src.tabular_sense.components.tokenizer import Tokenizer
-from src.tabular_sense.core.constants import RAW_CORPUS_PER_INPUT
+from src.tabular_sense.core.constants import N_CLASSES
 from src.tabular_sense.core.enum_util import ColumnType
 
 
+@dataclass
+class TableClassification:
+    """
+    整表识别结果
+
+    Attributes:
+        columns: dict[列名, 预测的类型标签列表]，顺序与表头一致，无有效值的列结果为空列表
+        rows: 读取的数据行数
+        elapsed: 读取与推理总耗时，单位秒
+        read_elapsed: 其中读取与采样的耗时，单位秒
+    """
+
+    columns: dict[str, list[str]]
+    rows: int
+    elapsed: float
+    read_elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """读取吞吐，行/秒"""
+        return self.rows / self.read_elapsed if self.read_elapsed > 0 else 0.0
+
+
 class ColumnClassifier:
     """表格列语义分类器"""
 
     tokenizer: Tokenizer
-    model: Model
+    model: Runner
+    config: Config
+    backend: InferenceBackend
     device: torch.device
+    dedup: bool
+    skip_null: bool
+    prefer_distinct: bool
+    n_draws: int
+    aggregation: Aggregation
+    early_stop_confidence: float | None
+    draws_per_round: int
+    rule_classifier: RuleClassifier | None
+    packed: bool
 
-    def __init__(self, checkpoint_name: str = "2025-10-30"):
+    def __init__(
+            self,
+            checkpoint_name: str = "2025-10-30",
+            dedup: bool = True,
+            skip_null: bool = True,
+            prefer_distinct: bool = True,
+            n_draws: int = 1,
+            aggregation: Aggregation = Aggregation.MEAN_PROBA,
+            early_stop_confidence: float | None = None,
+            draws_per_round: int | None = None,
+            fast_path: bool = False,
+            fast_path_confidence: float = 0.99,
+            backend: InferenceBackend = InferenceBackend.EAGER,
+            packed: bool = False,
+            mixed_precision: bool = False,
+            compiled: bool = False,
+    ):
         """
         初始化分类器
-        
+
         Args:
             checkpoint_name: 模型checkpoint名称，默认使用最新训练的模型
+            dedup: 采样时是否对列值去重，默认去重
+            skip_null: 采样时是否跳过空值与空白值，默认跳过
+            prefer_distinct: 组装推理窗口时是否优先选择不同的值，默认优先
+            n_draws: 每列组装的推理窗口数，多个窗口在同一批次中推理后聚合，默认1
+            aggregation: 多窗口结果的聚合策略，默认对概率取平均
+            early_stop_confidence: 早停置信度，每轮推理后所有类型的聚合概率均不低于该值或不高于(1-该值)的列
+                不再继续抽样；默认None，不早停
+            draws_per_round: 启用早停时每轮推理的窗口数，默认为n_draws的一半（向上取整）
+            fast_path: 是否启用规则快速路径，格式明确的列（身份证、银行卡、IP、邮箱、手机号、
+                泛化列名下的短整数）直接由规则判定，跳过模型；默认不启用
+            fast_path_confidence: 规则置信度不低于该值时才跳过模型，默认0.99；
+                降至0.95以下时泛化列名下的短整数列也走快速路径
+            backend: 推理后端，默认eager模式加载训练checkpoint；TORCHSCRIPT/ONNX运行export导出的图，
+                INT8/INT8_EMBEDDING加载checkpoint后动态量化，均固定在CPU上推理
+            packed: 是否将多个推理窗口打包到同一行推理（块对角注意力），短列较多时提高吞吐；
+                导出的TORCHSCRIPT/ONNX图不支持
+            mixed_precision: 是否以bf16自动混合精度推理，需设备支持bf16；仅EAGER后端支持
+            compiled: 是否以torch.compile编译模型，批次长度按长度桶取整以限制编译次数，
+                编译产物缓存在models/compile_cache；仅EAGER后端支持，且不能与packed同时使用
         """
 
-        config = Config.final()
+        if packed and backend.exported:
+            raise ValueError(f"Packed inference is not supported by {backend.name} backend")
+        if mixed_precision and backend != InferenceBackend.EAGER:
+            raise ValueError(f"Mixed precision inference is not supported by {backend.name} backend")
+        if compiled and (packed or backend != InferenceBackend.EAGER):
+            raise ValueError("Compiled inference requires the EAGER backend without packing")
+
+        self.config = Config.final()
+        self.config.mixed_precision = mixed_precision
         self.tokenizer = Tokenizer()
-        self.model = Model(self.tokenizer.vocab_size, config)
-        self.model.load(checkpoint_name)
-        self.device = config.device
+        self.backend = backend
+        self.model = backend.load(checkpoint_name, self.tokenizer.vocab_size, self.config)
+        self.device = backend.device(self.config)
+        # 编译模式下批次长度取整到的长度桶
+        self.buckets: tuple[int, ...] | None = None
+        if compiled:
+            from src.tabular_sense.components.compilation import CompiledModel
+
+            self.model = CompiledModel(self.model, self.config)
+            self.buckets = self.model.buckets
+        self.dedup = dedup
+        self.skip_null = skip_null
+        self.prefer_distinct = prefer_distinct
+        self.n_draws = n_draws
+        self.aggregation = aggregation
+        self.early_stop_confidence = early_stop_confidence
+
+        if early_stop_confidence is None:
+            # 不早停时所有窗口在一轮中完成
+            self.draws_per_round = n_draws
+        else:
+            self.draws_per_round = draws_per_round or (n_draws + 1) // 2
 
-    def predict(self, column_name: str, samples: list[str], threshold: float = 0.5) -> list[str]:
+        self.rule_classifier = RuleClassifier(fast_path_confidence) if fast_path else None
+        self.packed = packed
+
+    def predict(self, column_name: str, samples: Iterable[str], threshold: float = 0.5) -> list[str]:
         """
         用于识别表格列的语义类型（日期、金额、姓名等32种类型）
-        
+
         Args:
             column_name: 列名
-            samples: 列的样本值
+            samples: 列的样本值，可为任意可迭代对象，单次遍历完成采样
             threshold: 置信度阈值，默认0.5
 
         Returns:
-            预测的类型标签列表
-        
+            预测的类型标签列表，列中没有有效值时为空列表
+
         Examples:
             >>> classifier = ColumnClassifier("2025-10-30")
             >>> result = classifier.predict(
@@ -56,24 +164,20 @@ class ColumnClassifier:
             ['PHONE']
         """
 
-        logits = self._get_logits(column_name, samples)
-        probabilities = torch.sigmoid(logits)
-        predictions = (probabilities > threshold).float()
-
-        return list(map(lambda t: t.name, ColumnType.from_multiple_label(predictions[0].tolist())))
+        return self.predict_batch({column_name: samples}, threshold)[column_name]
 
-    def predict_proba(self, column_name: str, samples: list[str], top_k: int = 5) -> dict[str, float]:
+    def predict_proba(self, column_name: str, samples: Iterable[str], top_k: int = 5) -> dict[str, float]:
         """
         预测各类型的概率，返回最可能的前k个类型
-        
+
         Args:
             column_name: 列名
-            samples: 列的样本值
+            samples: 列的样本值，可为任意可迭代对象，单次遍历完成采样
             top_k: 返回概率最高的前k个类型，默认为5
 
         Returns:
-            dict[类型名, 概率]，按概率降序排列
-        
+            dict[类型名, 概率]，按概率降序排列，列中没有有效值时为空字典
+
         Examples:
             >>> classifier = ColumnClassifier("2025-10-30")
             >>> result = classifier.predict_proba(
@@ -90,19 +194,221 @@ class ColumnClassifier:
             5
         """
 
-        logits = self._get_logits(column_name, samples)
-        probabilities = torch.sigmoid(logits)
+        return self.predict_proba_batch({column_name: samples}, top_k)[column_name]
+
+    def predict_batch(self, columns: dict[str, Iterable[str]], threshold: float = 0.5) -> dict[str, list[str]]:
+        """
+        批量识别多列的语义类型，所有列在一次调用中按长度分批推理
+
+        Args:
+            columns: dict[列名, 列的样本值]
+            threshold: 置信度阈值，默认0.5
+
+        Returns:
+            dict[列名, 预测的类型标签列表]，顺序与输入一致，没有有效值的列为空列表
+
+        Examples:
+            >>> classifier = ColumnClassifier("2025-10-30")
+            >>> result = classifier.predict_batch({
+            ...     "phone": ["13812345678", "13998765432"] * 5,
+            ...     "email": ["alice@qq.com", "bob@163.com"] * 5,
+            ... })
+            >>> print(result)  # doctest: +SKIP
+            {'phone': ['PHONE'], 'email': ['EMAIL']}
+        """
+
+        samplers = {column_name: self._sampler().extend(samples) for column_name, samples in columns.items()}
+        return self._predict_samplers(samplers, threshold)
+
+    def predict_proba_batch(self, columns: dict[str, Iterable[str]], top_k: int = 5) -> dict[str, dict[str, float]]:
+        """
+        批量预测多列各类型的概率，每列返回最可能的前k个类型
+
+        Args:
+            columns: dict[列名, 列的样本值]
+            top_k: 每列返回概率最高的前k个类型，默认为5
+
+        Returns:
+            dict[列名, dict[类型名, 概率]]，列顺序与输入一致，概率按降序排列，没有有效值的列为空字典
+        """
+
+        samplers = {column_name: self._sampler().extend(samples) for column_name, samples in columns.items()}
+        valid = {column_name: sampler for column_name, sampler in samplers.items() if sampler}
+        probabilities = self._get_probabilities(valid).tolist()
         column_types = list(ColumnType)
-        type_probabilities = {column_type.name: float(probabilities[0][idx]) for idx, column_type in
-                              enumerate(column_types)}
 
-        return dict(sorted(type_probabilities.items(), key=lambda x: x[1], reverse=True)[:top_k])
+        result: dict[str, dict[str, float]] = {column_name: {} for column_name in samplers}
+        for column_name, column_probabilities in zip(valid, probabilities):
+            type_probabilities = {column_type.name: column_probabilities[idx] for idx, column_type in
+                                  enumerate(column_types)}
+            result[column_name] = dict(sorted(type_probabilities.items(), key=lambda x: x[1], reverse=True)[:top_k])
+
+        return result
+
+    def classify_table(
+            self,
+            path: str | Path,
+            threshold: float = 0.5,
+            sample_size: int = 100,
+            delimiter: str | None = None,
+            encoding: str = "utf-8-sig",
+            progress: bool = True,
+    ) -> TableClassification:
+        """
+        识别CSV/TSV表格中每一列的语义类型
+
+        单次流式遍历文件，每列通过列采样器保留至多sample_size个值，随后对所有列做一次批量推理。
+        内存占用与文件大小无关，可直接用于GB级文件。
+
+        Args:
+            path: 表格文件路径，首行为表头
+            threshold: 置信度阈值，默认0.5
+            sample_size: 每列保留的采样值数量，默认100
+            delimiter: 字段分隔符，默认依据扩展名推断（.tsv/.tab为制表符，其余为逗号）
+            encoding: 文件编码，默认utf-8-sig，兼容带BOM的UTF-8文件
+            progress: 是否显示读取进度（含实时行/秒），默认显示
+
+        Returns:
+            整表识别结果，包含各列类型与读取吞吐
+
+        Examples:
+            >>> classifier = ColumnClassifier("2025-10-30")
+            >>> result = classifier.classify_table("users.csv")  # doctest: +SKIP
+            >>> print(result.columns)  # doctest: +SKIP
+            {'phone': ['PHONE'], 'email': ['EMAIL']}
+            >>> print(f"{result.rows_per_second:.0f} rows/s")  # doctest: +SKIP
+        """
+
+        start = time.perf_counter()
+        table = TableReader(Path(path), partial(self._sampler, sample_size), delimiter, encoding).read(progress)
+
+        return TableClassification(
+            self._predict_samplers(table.columns, threshold),
+            table.rows,
+            time.perf_counter() - start,
+            table.elapsed,
+        )
+
+    def _sampler(self, capacity: int = 100) -> ColumnSampler:
+        """按分类器的采样配置创建列采样器"""
+        return ColumnSampler(capacity, self.dedup, self.skip_null, self.prefer_distinct)
+
+    def _predict_samplers(self, samplers: dict[str, ColumnSampler], threshold: float) -> dict[str, list[str]]:
+        """对已完成采样的列做批量推理，没有有效值的列跳过推理"""
+
+        valid = {column_name: sampler for column_name, sampler in samplers.items() if sampler}
+        probabilities = self._get_probabilities(valid)
+        predictions = (probabilities > threshold).int()
+
+        result: dict[str, list[str]] = {column_name: [] for column_name in samplers}
+        for column_name, prediction in zip(valid, predictions):
+            result[column_name] = [t.name for t in ColumnType.from_multiple_label(prediction.tolist())]
+
+        return result
+
+    def _encode(self, column_name: str, sampler: ColumnSampler) -> list[int]:
+        """从采样器组装推理窗口，按训练样本格式拼接并编码"""
+
+        data = f"{column_name}|{"<sep>".join(sampler.draw())}"
+        # [min(max_len, seq_len)]
+        return self.tokenizer.encode(data)[:self.config.max_len]
+
+    def _get_probabilities(self, samplers: dict[str, ColumnSampler]) -> Tensor:
+        """
+        多列多窗口推理并聚合
+
+        启用规则快速路径时，规则能够明确判定的列不进入模型推理。每轮为所有未决的列各组装draws_per_round个窗口，合并为一批推理；启用早停时，
+        聚合结果已足够确定的列不再进入下一轮
+
+        :return: [n_columns, n_classes]，行顺序与输入一致
+        """
+
+        items = list(samplers.items())
+        # 每列已完成推理的窗口logits
+        draw_logits: list[list[Tensor]] = [[] for _ in items]
+        # [n_columns, n_classes]
+        probabilities = torch.zeros(len(items), N_CLASSES)
+        pending = list(range(len(items)))
+        drawn = 0
+
+        if self.rule_classifier is not None:
+            pending = [idx for idx in pending if not self._apply_rules(*items[idx], probabilities[idx])]
+
+        while pending and drawn < self.n_draws:
+            draws = min(self.draws_per_round, self.n_draws - drawn)
+            owners = [idx for idx in pending for _ in range(draws)]
+            # [len(owners), n_classes]
+            logits = self._get_logits_batch([self._encode(*items[idx]) for idx in owners]).cpu()
+
+            for idx, row in zip(owners, logits):
+                draw_logits[idx].append(row)
+
+            for idx in pending:
+                # [n_draws, n_classes] -> [n_classes]
+                probabilities[idx] = self.aggregation(torch.stack(draw_logits[idx]))
+
+            drawn += draws
+
+            if self.early_stop_confidence is not None:
+                confidence = self.early_stop_confidence
+                pending = [
+                    idx for idx in pending
+                    if not ((probabilities[idx] >= confidence) | (probabilities[idx] <= 1 - confidence)).all()
+                ]
+
+        return probabilities
+
+    def _apply_rules(self, column_name: str, sampler: ColumnSampler, probabilities: Tensor) -> bool:
+        """
+        规则快速路径，命中时将规则判定的类型概率写入probabilities
+
+        :param probabilities: [n_classes]
+        :return: 是否命中
+        """
+
+        result = self.rule_classifier(column_name, sampler.reservoir)
+        if result is None:
+            return False
+
+        types, confidence = result
+        for column_type in types:
+            probabilities[ColumnType[column_type].value] = confidence
+
+        return True
 
     @torch.no_grad()
-    def _get_logits(self, column_name: str, samples: list[str]) -> Tensor:
-        data = f"{column_name}|{"<sep>".join(random.choices(samples, k=RAW_CORPUS_PER_INPUT))}"
-        encoded_data = self.tokenizer.encode(data)
-        input_ = torch.tensor(encoded_data, device=self.device).unsqueeze(0)
-        mask = torch.ones(len(encoded_data), device=self.device).unsqueeze(0)
+    def _get_logits_batch(self, encoded: list[list[int]]) -> Tensor:
+        """
+        批量推理已编码的输入
+
+        :return: [n_inputs, n_classes]，行顺序与输入一致
+        """
+
+        # 按长度排序后分批，减少批次内的padding
+        order = sorted(range(len(encoded)), key=lambda idx: len(encoded[idx]))
+        # [n_columns, n_classes]，混合精度下bf16输出写回时转为fp32
+        logits = torch.empty(len(encoded), N_CLASSES, device=self.device)
+
+        with torch.autocast(self.device.type, dtype=torch.bfloat16, enabled=self.config.mixed_precision):
+            for start in range(0, len(order), self.config.batch_size):
+                indices = order[start:start + self.config.batch_size]
+                inputs = [torch.tensor(encoded[idx]) for idx in indices]
+
+                if self.packed:
+                    # [n_rows, row_len] * 3, [batch]
+                    packed = pack_inputs(inputs, self.config.max_len)
+                    # 写回原始位置
+                    logits[indices] = self.model(packed[0].to(self.device), None,
+                                                 *(tensor.to(self.device) for tensor in packed[1:]))
+                else:
+                    # [batch, batch_len], [batch, batch_len+1]
+                    input_ids, padding_masks = pad_inputs(inputs, buckets=self.buckets)
+                    # 批次内没有padding（如单列推理）时跳过mask；导出与编译的图输入签名固定，始终传入mask
+                    if self.backend.exported or self.buckets is not None or padding_masks.any():
+                        padding_masks = padding_masks.to(self.device)
+                    else:
+                        padding_masks = None
+                    # 写回原始位置
+                    logits[indices] = self.model(input_ids.to(self.device), padding_masks)
 
-        return self.model(input_, mask)
+        return logits
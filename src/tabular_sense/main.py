@@ -1,39 +1,77 @@
+import os
+from functools import partial
+
+import torch.distributed as dist
 from torch.optim import AdamW
 from torch.optim.lr_scheduler import ReduceLROnPlateau
 from torch.utils.data import DataLoader
 
-from src.tabular_sense.components.collate import collate_fn
+from src.tabular_sense.components.collate import collate_fn, pack_collate_fn, length_buckets
 from src.tabular_sense.components.config import Config
-from src.tabular_sense.components.dataset import ColumnDataset
+from src.tabular_sense.components.dataset import TokenizedColumnDataset, worker_init_fn
 from src.tabular_sense.components.dropout_scheduler import DropoutScheduler
 from src.tabular_sense.components.model import Model
 from src.tabular_sense.components.resume_strategy import ResumeStrategy
-from src.tabular_sense.components.sampler import LengthGroupSampler
+from src.tabular_sense.components.sampler import LengthGroupSampler, TokenBudgetSampler
 from src.tabular_sense.components.tokenizer import Tokenizer
 from src.tabular_sense.path import get_data_dir
 from src.tabular_sense.trainer import Trainer
 
 
 def main():
+    # 由torchrun启动多进程时以gloo后端做分布式数据并行，可跨多台CPU机器
+    world_size = int(os.environ.get("WORLD_SIZE", 1))
+    if world_size > 1:
+        dist.init_process_group("gloo")
+    rank = dist.get_rank() if world_size > 1 else 0
+    local_rank = int(os.environ.get("LOCAL_RANK", 0))
+
     data_dir = get_data_dir()
     config = Config.final()
     tokenizer = Tokenizer()
 
-    dataset = ColumnDataset(data_dir / "samples/samples.txt", tokenizer, config)
+    # 每台机器上由local_rank 0先构建tokenize缓存与长度索引，其余进程等待后直接加载
+    if world_size > 1 and local_rank != 0:
+        dist.barrier()
+    dataset = TokenizedColumnDataset(data_dir / "samples/samples.txt", tokenizer, config)
+    if world_size > 1 and local_rank == 0:
+        dist.barrier()
     train_dataset, val_dataset, _ = dataset.split()
 
+    # 打包模式下多个样本拼接在同一行，以块对角mask隔离
+    if config.packing:
+        collate = partial(pack_collate_fn, max_len=config.max_len)
+    else:
+        collate = partial(
+            collate_fn,
+            pad_to_multiple_of=config.pad_to_multiple_of,
+            max_len=config.max_len,
+            # 编译模式下批次长度分桶，限制重新编译的次数
+            buckets=length_buckets(config.max_len) if config.compiled else None,
+        )
+
+    if config.max_tokens is None:
+        train_sampler = LengthGroupSampler("train", train_dataset, config.batch_size, True,
+                                           rank=rank, num_replicas=world_size)
+    else:
+        train_sampler = TokenBudgetSampler("train", train_dataset, config.max_tokens,
+                                           rank=rank, num_replicas=world_size)
+
     train_loader = DataLoader(
         dataset=train_dataset,
-        collate_fn=collate_fn,
-        batch_sampler=LengthGroupSampler("train", train_dataset, config.batch_size, True),
+        collate_fn=collate,
+        batch_sampler=train_sampler,
         num_workers=4,
+        worker_init_fn=worker_init_fn,
         pin_memory=True,
     )
     val_loader = DataLoader(
         dataset=val_dataset,
-        collate_fn=collate_fn,
-        batch_sampler=LengthGroupSampler("val", val_dataset, config.batch_size, True),
+        collate_fn=collate,
+        batch_sampler=LengthGroupSampler("val", val_dataset, config.batch_size, True,
+                                         rank=rank, num_replicas=world_size),
         num_workers=4,
+        worker_init_fn=worker_init_fn,
         pin_memory=True,
     )
 
@@ -77,6 +115,9 @@ def main():
 
     trainer.train()
 
+    if world_size > 1:
+        dist.destroy_process_group()
+
 
 if __name__ == '__main__':
     main()
@@ -1,15 +1,21 @@
+import time
+from functools import partial
+
 import torch
 from torch import Tensor
 from torch.nn import BCEWithLogitsLoss
 from torch.utils.data import DataLoader
 from tqdm import tqdm
 
-from src.tabular_sense.components.collate import collate_fn
+from src.tabular_sense.components.collate import collate_fn, model_inputs, pack_collate_fn
 from src.tabular_sense.components.config import Config
-from src.tabular_sense.components.dataset import ColumnDataset, BatchedColumnSample
+from src.tabular_sense.components.dataset import TokenizedColumnDataset, BatchedColumnSample, PackedColumnSample, \
+    worker_init_fn
+from src.tabular_sense.components.inference_backend import standard_attention
 from src.tabular_sense.components.logger import setup_logger
 from src.tabular_sense.components.metrics import MultiLabelMetrics
 from src.tabular_sense.components.model import Model
+from src.tabular_sense.components.quantization import QuantizedModel, model_size
 from src.tabular_sense.components.sampler import LengthGroupSampler
 from src.tabular_sense.components.tokenizer import Tokenizer
 from src.tabular_sense.core.enum_util import ColumnType
@@ -18,8 +24,9 @@ from src.tabular_sense.path import get_data_dir, get_models_dir
 
 def run_test(
         model: Model,
-        test_loader: DataLoader[ColumnDataset],
+        test_loader: DataLoader[TokenizedColumnDataset],
         criterion: BCEWithLogitsLoss,
+        mixed_precision: bool = False,
 ) -> tuple[float, list[Tensor], list[Tensor]]:
     """核心测试逻辑：运行模型推理并收集结果
 
@@ -27,6 +34,7 @@ def run_test(
         model: 待测试的模型
         test_loader: 测试数据加载器
         criterion: 损失函数
+        mixed_precision: 是否以bf16自动混合精度推理
 
     Returns:
         (平均损失, 预测结果列表, 真实标签列表)
@@ -36,16 +44,16 @@ def run_test(
     all_predictions: list[Tensor] = []
     all_labels: list[Tensor] = []
 
-    progress: tqdm[BatchedColumnSample] = tqdm(test_loader, "[Test]")
+    progress: tqdm[BatchedColumnSample | PackedColumnSample] = tqdm(test_loader, "[Test]")
 
     for batch in progress:
-        input_ids = batch.input_ids.to(device)
-        attention_masks = batch.attention_masks.to(device)
         labels = batch.labels.to(device)
 
-        with torch.no_grad():
-            logits = model(input_ids, attention_masks)
+        with torch.no_grad(), torch.autocast(device.type, dtype=torch.bfloat16, enabled=mixed_precision):
+            logits = model(*model_inputs(batch, device))
 
+        # 以fp32计算loss与指标
+        logits = logits.float()
         total_loss += criterion(logits, labels).item()
         probabilities = torch.sigmoid(logits)
         prediction = (probabilities > 0.5).float()
@@ -73,7 +81,7 @@ def batch_test(name: str):
     logger.info(f"    批次大小: {config.batch_size}")
     logger.info("=" * 60)
 
-    avg_loss, all_predictions, all_labels = run_test(model, test_loader, criterion)
+    avg_loss, all_predictions, all_labels = run_test(model, test_loader, criterion, config.mixed_precision)
     result = metrics(all_predictions, all_labels)
 
     logger.info("=" * 60)
@@ -88,6 +96,92 @@ def batch_test(name: str):
     logger.info("=" * 60)
 
 
+def quantization_test(name: str):
+    """量化评估模式：在测试集上对比fp32与动态int8量化模型的指标、CPU推理耗时与模型大小"""
+    logger = setup_logger(name, "quantization")
+    metrics = MultiLabelMetrics()
+    criterion = BCEWithLogitsLoss()
+
+    model, test_loader, config = initialize(name)
+    # 量化模型仅支持CPU，fp32基准同样在CPU上测量
+    model = model.cpu()
+    models: dict[str, Model] = {
+        "FP32": model,
+        "INT8": QuantizedModel(model).model,
+        "INT8+Embedding": QuantizedModel(model, embedding=True).model,
+    }
+
+    logger.info("=" * 60)
+    logger.info("🧪 开始量化评估")
+    logger.info(f"    Checkpoint: {name}")
+    logger.info(f"    模型架构: {config.d_model}d×{config.n_head}h×{config.n_encoder_layers}L")
+    logger.info(f"    测试样本: {len(test_loader) * config.batch_size}")
+    logger.info(f"    线程数: {torch.get_num_threads()}")
+    logger.info("=" * 60)
+
+    baseline: tuple[float, float, int] | None = None
+    # 量化后的Linear不满足注意力融合快速路径的条件，各模型统一使用标准注意力实现以便对比
+    with standard_attention():
+        for label, candidate in models.items():
+            start = time.perf_counter()
+            avg_loss, all_predictions, all_labels = run_test(candidate, test_loader, criterion)
+            elapsed = time.perf_counter() - start
+            result = metrics(all_predictions, all_labels)
+            size = model_size(candidate)
+
+            if baseline is None:
+                baseline = (elapsed, result.f1, size)
+
+            logger.info(f"📊 {label}")
+            logger.info(f"    Loss: {avg_loss:.8f}")
+            logger.info(f"    Score: {result.score:.8f}")
+            logger.info(f"    F1: {result.f1:.8f} ({result.f1 - baseline[1]:+.8f})")
+            logger.info(f"    Precision: {result.precision:.8f}")
+            logger.info(f"    Recall: {result.recall:.8f}")
+            logger.info(f"    EM: {result.em:.8f}")
+            logger.info(f"    耗时: {elapsed:.2f}s (×{baseline[0] / elapsed:.2f})")
+            logger.info(f"    大小: {size / 2 ** 20:.2f}MB (×{baseline[2] / size:.2f})")
+            logger.info("=" * 60)
+
+
+def precision_test(name: str):
+    """混合精度评估模式：在测试集上对比fp32与bf16自动混合精度的指标与推理耗时"""
+    logger = setup_logger(name, "precision")
+    metrics = MultiLabelMetrics()
+    criterion = BCEWithLogitsLoss()
+
+    model, test_loader, config = initialize(name)
+
+    logger.info("=" * 60)
+    logger.info("🧪 开始混合精度评估")
+    logger.info(f"    Checkpoint: {name}")
+    logger.info(f"    模型架构: {config.d_model}d×{config.n_head}h×{config.n_encoder_layers}L")
+    logger.info(f"    测试样本: {len(test_loader) * config.batch_size}")
+    logger.info(f"    设备: {config.device}")
+    logger.info(f"    线程数: {torch.get_num_threads()}")
+    logger.info("=" * 60)
+
+    baseline: tuple[float, float] | None = None
+    for label, mixed_precision in (("FP32", False), ("BF16", True)):
+        start = time.perf_counter()
+        avg_loss, all_predictions, all_labels = run_test(model, test_loader, criterion, mixed_precision)
+        elapsed = time.perf_counter() - start
+        result = metrics(all_predictions, all_labels)
+
+        if baseline is None:
+            baseline = (elapsed, result.score)
+
+        logger.info(f"📊 {label}")
+        logger.info(f"    Loss: {avg_loss:.8f}")
+        logger.info(f"    Score: {result.score:.8f} ({result.score - baseline[1]:+.8f})")
+        logger.info(f"    F1: {result.f1:.8f}")
+        logger.info(f"    Precision: {result.precision:.8f}")
+        logger.info(f"    Recall: {result.recall:.8f}")
+        logger.info(f"    EM: {result.em:.8f}")
+        logger.info(f"    耗时: {elapsed:.2f}s (×{baseline[0] / elapsed:.2f})")
+        logger.info("=" * 60)
+
+
 def interactive_test(name: str):
     """交互测试模式：支持单样本实时预测"""
     config = Config.final()
@@ -120,11 +214,11 @@ def interactive_test(name: str):
         # Tokenize
         tokens = tokenizer.encode(data)[:config.max_len]
         input_ids = torch.tensor(tokens).unsqueeze(0).to(device)
-        attention_mask = torch.ones(len(tokens)).unsqueeze(0).to(device)
 
         # 推理
         with torch.no_grad():
-            logits = model(input_ids, attention_mask)
+            # 单条输入没有padding，跳过mask
+            logits = model(input_ids, None)
 
         probabilities = torch.sigmoid(logits)
         column_types = list(ColumnType)
@@ -136,7 +230,7 @@ def interactive_test(name: str):
         print(result)
 
 
-def initialize(name: str) -> tuple[Model, DataLoader[ColumnDataset], Config]:
+def initialize(name: str) -> tuple[Model, DataLoader[TokenizedColumnDataset], Config]:
     config = Config.final()
     tokenizer = Tokenizer()
 
@@ -144,13 +238,17 @@ def initialize(name: str) -> tuple[Model, DataLoader[ColumnDataset], Config]:
     model.load(name)
     model.eval()
 
-    dataset = ColumnDataset(data_dir / "samples/samples.txt", tokenizer, config)
+    dataset = TokenizedColumnDataset(data_dir / "samples/samples.txt", tokenizer, config)
     _, _, test_dataset = dataset.split()
     test_loader = DataLoader(
         dataset=test_dataset,
-        collate_fn=collate_fn,
+        collate_fn=(
+            partial(pack_collate_fn, max_len=config.max_len) if config.packing
+            else partial(collate_fn, pad_to_multiple_of=config.pad_to_multiple_of, max_len=config.max_len)
+        ),
         batch_sampler=LengthGroupSampler("test", test_dataset, config.batch_size, True),
         num_workers=4,
+        worker_init_fn=worker_init_fn,
         pin_memory=True,
     )
 
@@ -166,6 +264,10 @@ def main():
 
     if mode == "interactive":
         interactive_test(name)
+    elif mode == "quantization":
+        quantization_test(name)
+    elif mode == "precision":
+        precision_test(name)
     else:
         batch_test(name)
 
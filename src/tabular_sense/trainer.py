@@ -1,10 +1,14 @@
+import logging
 import time
+from contextlib import nullcontext
 from logging import Logger
 from pathlib import Path
 
 import torch
+import torch.distributed as dist
 from torch import Tensor
-from torch.nn import BCEWithLogitsLoss
+from torch.nn import BCEWithLogitsLoss, Module
+from torch.nn.parallel import DistributedDataParallel
 from torch.nn.utils import clip_grad_norm_
 from torch.optim import Optimizer
 from torch.optim.lr_scheduler import ReduceLROnPlateau
@@ -12,22 +16,36 @@ from torch.utils.data import DataLoader
 from torch.utils.tensorboard import SummaryWriter
 from tqdm import tqdm
 
+from src.tabular_sense.components.collate import model_inputs
+from src.tabular_sense.components.compilation import CompiledModel, EAGER_REFERENCE_STEPS
 from src.tabular_sense.components.config import Config
-from src.tabular_sense.components.dataset import BatchedColumnSample
+from src.tabular_sense.components.dataset import BatchedColumnSample, PackedColumnSample
 from src.tabular_sense.components.dropout_scheduler import DropoutScheduler
 from src.tabular_sense.components.logger import setup_logger
 from src.tabular_sense.components.metrics import Metrics
 from src.tabular_sense.components.metrics import MultiLabelMetrics
 from src.tabular_sense.components.model import Model
 from src.tabular_sense.components.resume_strategy import ResumeStrategy
+from src.tabular_sense.components.sampler import LengthGroupSampler, TokenBudgetSampler
 from src.tabular_sense.core.constants import SAMPLES_PER_TYPE, N_CLASSES
 from src.tabular_sense.path import get_models_dir, get_logs_dir
 
 
 class Trainer:
-    """训练器"""
+    """
+    训练器
+
+    在torchrun启动且已初始化进程组时以DistributedDataParallel训练：各rank的采样器按rank切分批次，
+    训练与验证的loss、验证指标的统计计数跨rank求和，各rank的调度与早停决策一致；
+    仅rank 0写checkpoint、TensorBoard与日志。
+    """
 
     model: Model
+    forward_model: Module
+    compiled_model: CompiledModel | None
+    distributed: bool
+    rank: int
+    is_main: bool
     device: torch.device
     config: Config
     train_loader: DataLoader
@@ -41,9 +59,11 @@ class Trainer:
     train_name: str
     start_epoch: int
     epochs: int
+    global_step: int
+    checkpoint_interval: int
     criterion: BCEWithLogitsLoss
     metrics: MultiLabelMetrics
-    summary: SummaryWriter
+    summary: SummaryWriter | None
     best_score: float
     best_epoch: int
     checkpoint_dir: Path
@@ -62,12 +82,20 @@ class Trainer:
             train_name: str,
             early_stop_patience: int = 6,
             epochs: int = 50,
+            checkpoint_interval: int = 1000,
     ):
         """
         :param train_name: 训练名称，将作为日志路径、模型保存路径的一部分
+        :param checkpoint_interval: 每多少次参数更新保存一次epoch内的最新存档点，0为不保存
         """
 
         self.model = model
+        self.distributed = dist.is_available() and dist.is_initialized()
+        self.rank = dist.get_rank() if self.distributed else 0
+        self.is_main = self.rank == 0
+        # 分布式训练时由DDP包装前向，backward中同步梯度；与model共享参数，checkpoint仍由model保存
+        self.forward_model = DistributedDataParallel(model) if self.distributed else model
+        self.compiled_model = CompiledModel(self.forward_model, config) if config.compiled else None
         self.device = device
         self.config = config
         self.train_loader = train_loader
@@ -81,9 +109,12 @@ class Trainer:
         self.train_name = train_name
         self.start_epoch = 1
         self.epochs = epochs
+        # 参数更新次数，梯度累积时每accumulation_steps个批次计一次
+        self.global_step = 0
+        self.checkpoint_interval = checkpoint_interval
         self.criterion = BCEWithLogitsLoss()
         self.metrics = MultiLabelMetrics()
-        self.summary = SummaryWriter(str(get_logs_dir() / train_name))
+        self.summary = SummaryWriter(str(get_logs_dir() / train_name)) if self.is_main else None
         self.best_score = 0
         self.best_epoch = 1
         self.checkpoint_dir = get_models_dir() / f"checkpoint/{train_name}"
@@ -91,18 +122,25 @@ class Trainer:
         if not self.checkpoint_dir.exists():
             self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
-        self.logger = setup_logger(train_name, "train")
+        # 非rank 0的进程只输出警告
+        self.logger = setup_logger(train_name, "train", logging.INFO if self.is_main else logging.WARNING)
 
     def load_checkpoint(
             self,
             checkpoint_name: str,
             resume_strategy: ResumeStrategy,
             reset_training_state: bool = False,
+            latest: bool = False,
     ):
-        """从存档点中恢复状态"""
+        """
+        从存档点中恢复状态
 
-        self.logger.info(f"▶ 尝试加载存档点: {checkpoint_name}")
-        checkpoint_path = self.checkpoint_dir / f"checkpoint_{checkpoint_name}_best.pt"
+        :param latest: 从epoch内的最新存档点恢复，token预算采样器从中断的批次继续；默认从最佳存档点恢复
+        """
+
+        kind = "latest" if latest else "best"
+        self.logger.info(f"▶ 尝试加载存档点: {checkpoint_name} ({kind})")
+        checkpoint_path = self.checkpoint_dir / f"checkpoint_{checkpoint_name}_{kind}.pt"
 
         if not checkpoint_path.exists():
             raise FileNotFoundError(f"Checkpoint file {checkpoint_path} not found")
@@ -156,6 +194,11 @@ class Trainer:
             self.best_epoch = checkpoint["best_epoch"]
             self.early_stop_count = checkpoint["early_stop_count"]
             self.start_epoch = checkpoint["start_epoch"]
+            self.global_step = checkpoint.get("global_step", 0)
+
+            if isinstance(self.train_loader.batch_sampler, TokenBudgetSampler) and checkpoint.get("sampler_state"):
+                self.train_loader.batch_sampler.load_state_dict(checkpoint["sampler_state"])
+                self.logger.info("✓ 采样器状态已恢复")
 
     def train(self):
         self.logger.info("=" * 60)
@@ -164,6 +207,7 @@ class Trainer:
         self.logger.info(f"    模型架构: {self.config}")
         self.logger.info(f"    参数规模: {self.model.param_num}")
         self.logger.info(f"    样本规模: {SAMPLES_PER_TYPE * N_CLASSES}")
+        self.logger.info(f"    梯度累积: {self.config.accumulation_steps}步，当前第{self.global_step}次更新")
         self.logger.info(f"    当前学习率: {self.lr_scheduler.get_last_lr()[0]:.2e}")
         self.logger.info(f"    当前Dropout: {self.dp_scheduler.current_dropout}")
         self.logger.info(f"    最佳分数: {self.best_score}")
@@ -174,6 +218,10 @@ class Trainer:
         for epoch in range(self.start_epoch, self.epochs + 1):
             epoch_start = time.perf_counter()
 
+            # 批次序列由epoch决定，分布式训练时各rank一致
+            if isinstance(self.train_loader.batch_sampler, LengthGroupSampler | TokenBudgetSampler):
+                self.train_loader.batch_sampler.set_epoch(epoch)
+
             train_loss = self.train_epoch(epoch)
             val_loss, metrics = self.validate_epoch(epoch)
 
@@ -188,12 +236,15 @@ class Trainer:
             self.logger.info(f"    LR: {self.lr_scheduler.get_last_lr()[0]:.2e}")
             self.logger.info(f"    DP: {self.dp_scheduler.current_dropout}")
             self.logger.info(f"    Time: {minutes}m {seconds}s")
+            if self.compiled_model is not None:
+                for line in self.compiled_model.stats.report():
+                    self.logger.info(line)
 
             old_lr = self.lr_scheduler.get_last_lr()[0]
             self.lr_scheduler.step(val_loss)
             new_lr = self.lr_scheduler.get_last_lr()[0]
 
-            if old_lr != new_lr:
+            if old_lr != new_lr and self.is_main:
                 self.logger.info(f"🔄 学习率调整 ({epoch}): {old_lr:.2e} -> {new_lr:.2e}")
                 self.summary.add_text("Hyperparams", f"🔄 学习率调整 ({epoch}): {old_lr:.2e} -> {new_lr:.2e}", epoch)
 
@@ -202,68 +253,65 @@ class Trainer:
 
             if old_dp != new_dp:
                 self.early_stop_count = 0
+                # dropout概率编译在图中，调整后需要重新编译
+                if self.compiled_model is not None:
+                    self.compiled_model.reset()
 
                 self.logger.info(f"⚠️ 检测到过拟合趋势 ({epoch})")
                 self.logger.info(f"🔄 Epoch {epoch}: Dropout {old_dp:.3f} → {new_dp:.3f}, 早停计数重置")
 
-                self.summary.add_text(
-                    "Hyperparams",
-                    f"⚠️ 检测到过拟合趋势 ({epoch})\n🔄 Epoch {epoch}: Dropout {old_dp:.3f} → {new_dp:.3f}, 早停计数重置",
-                    epoch,
-                )
-
-            self.summary.add_scalars("Training/Loss", {
-                "train": train_loss,
-                "val": val_loss,
-            }, epoch)
-            self.summary.add_scalar("Training/Score", metrics.score, epoch)
-            self.summary.add_scalars("Metrics", {
-                "Precision": metrics.precision,
-                "Recall": metrics.recall,
-                "F1": metrics.f1,
-            }, epoch)
-            self.summary.add_scalar("Metrics/Hamming Loss", metrics.hamming_loss, epoch)
-            self.summary.add_scalar("Metrics/EM", metrics.em, epoch)
-            self.summary.add_scalar("Hyperparams/LR", self.lr_scheduler.get_last_lr()[0], epoch)
-            self.summary.add_scalar("Hyperparams/DP", self.dp_scheduler.current_dropout, epoch)
-
-            if self._is_best(metrics, epoch):
+                if self.is_main:
+                    self.summary.add_text(
+                        "Hyperparams",
+                        f"⚠️ 检测到过拟合趋势 ({epoch})\n🔄 Epoch {epoch}: Dropout {old_dp:.3f} → {new_dp:.3f}, 早停计数重置",
+                        epoch,
+                    )
+
+            if self.is_main:
+                self.summary.add_scalars("Training/Loss", {
+                    "train": train_loss,
+                    "val": val_loss,
+                }, epoch)
+                self.summary.add_scalar("Training/Score", metrics.score, epoch)
+                self.summary.add_scalars("Metrics", {
+                    "Precision": metrics.precision,
+                    "Recall": metrics.recall,
+                    "F1": metrics.f1,
+                }, epoch)
+                self.summary.add_scalar("Metrics/Hamming Loss", metrics.hamming_loss, epoch)
+                self.summary.add_scalar("Metrics/EM", metrics.em, epoch)
+                self.summary.add_scalar("Hyperparams/LR", self.lr_scheduler.get_last_lr()[0], epoch)
+                self.summary.add_scalar("Hyperparams/DP", self.dp_scheduler.current_dropout, epoch)
+
+            # 指标已跨rank汇总，各rank的判断一致
+            if self._is_best(metrics, epoch) and self.is_main:
                 self.logger.info(f"✨ 新的最佳模型 (Epoch {self.best_epoch}, Score={metrics.score:.8f})")
                 self.summary.add_text(
                     "BestModel",
                     f"✨ 新的最佳模型 (Epoch {self.best_epoch}, Score={metrics.score:.8f})",
                     epoch,
                 )
-                torch.save(
-                    {
-                        "model_state": self.model.state_dict(),
-                        "optimizer_state": self.optimizer.state_dict(),
-                        "lr_scheduler_state": self.lr_scheduler.state_dict(),
-                        "dp_scheduler_state": self.dp_scheduler.state_dict(),
-                        "best_score": self.best_score,
-                        "best_epoch": self.best_epoch,
-                        "early_stop_count": self.early_stop_count,
-                        "start_epoch": epoch + 1,
-                    },
-                    self.checkpoint_dir / f"checkpoint_{self.train_name}_best.pt",
-                )
+                self._save_checkpoint("best", epoch + 1)
 
-            self.summary.add_scalars("Early Stopping", {
-                "early_stop_count": self.early_stop_count,
-                "early_stop_patience": self.early_stop_patience,
-            }, epoch)
+            if self.is_main:
+                self.summary.add_scalars("Early Stopping", {
+                    "early_stop_count": self.early_stop_count,
+                    "early_stop_patience": self.early_stop_patience,
+                }, epoch)
 
             if self.early_stop_count >= self.early_stop_patience:
                 self.logger.info(f"🚨 早停触发: 连续 {self.early_stop_patience} 个epoch无提升")
                 self.logger.info(f"    最佳模型: Epoch {self.best_epoch}, Score={self.best_score:.8f}")
-                self.summary.add_text(
-                    "EarlyStop",
-                    f"🚨 早停触发: 连续 {self.early_stop_patience} 个epoch无提升\n    最佳模型: Epoch {self.best_epoch}, Score={self.best_score:.8f}",
-                    epoch,
-                )
+                if self.is_main:
+                    self.summary.add_text(
+                        "EarlyStop",
+                        f"🚨 早停触发: 连续 {self.early_stop_patience} 个epoch无提升\n    最佳模型: Epoch {self.best_epoch}, Score={self.best_score:.8f}",
+                        epoch,
+                    )
                 break
 
-        self.summary.close()
+        if self.is_main:
+            self.summary.close()
         self.logger.info("=" * 60)
 
         total_time = time.perf_counter() - total_start
@@ -276,28 +324,68 @@ class Trainer:
     def train_epoch(self, epoch: int) -> float:
         self.model.train()
         total_loss = 0.0
-        progress: tqdm[BatchedColumnSample] = tqdm(self.train_loader, f"Epoch {epoch}/{self.epochs} [Train]")
-
+        # 累积窗口内的平均loss
+        window_loss = 0.0
+        accumulation_steps = self.config.accumulation_steps
+        n_batches = len(self.train_loader)
+        progress: tqdm[BatchedColumnSample | PackedColumnSample] = tqdm(
+            self.train_loader, f"Epoch {epoch}/{self.epochs} [Train]", disable=not self.is_main)
+        # 从epoch内存档点恢复时，token预算采样器本epoch已产出的批次数
+        sampler = self.train_loader.batch_sampler
+        resume_position = sampler.position if isinstance(sampler, TokenBudgetSampler) else 0
+
+        self.optimizer.zero_grad()
         for idx, batch in enumerate(progress):
-            logits, loss, labels = self._predict(batch)
+            step_start = time.perf_counter()
+            # 编译模式下先以eager模式运行若干步，作为稳态加速比的基准
+            eager = self.compiled_model is None or self.compiled_model.stats.eager_steps < EAGER_REFERENCE_STEPS
+
+            # 当前累积窗口的批次数，epoch末的窗口可能不足accumulation_steps
+            window_start = idx - idx % accumulation_steps
+            window = min(accumulation_steps, n_batches - window_start)
+            # 窗口的最后一个批次，反向传播后更新参数
+            boundary = idx + 1 == window_start + window
+
+            # 窗口内仅最后一个批次在backward中同步DDP梯度
+            sync = self.forward_model.no_sync() if self.distributed and not boundary else nullcontext()
+            with sync:
+                logits, loss, labels = self._predict(batch, eager)
+                # 按窗口的批次数缩放，累积的梯度即窗口内的平均梯度
+                (loss / window).backward()
+
             total_loss += loss.item()
+            window_loss += loss.item() / window
 
-            self.optimizer.zero_grad()
-            loss.backward()
+            if boundary:
+                if self.global_step % 100 == 0 and self.is_main:
+                    self._record_gradients(self.global_step)
+                    self.summary.add_scalar("Training/StepLoss", window_loss, self.global_step)
 
-            if idx % 100 == 0:
-                self._record_gradients(epoch)
+                # 对累积后的梯度裁剪
+                clip_grad_norm_(self.model.parameters(), self.config.max_grad_norm)
+                self.optimizer.step()
+                self.optimizer.zero_grad()
+                self.global_step += 1
+                window_loss = 0.0
 
-            clip_grad_norm_(self.model.parameters(), self.config.max_grad_norm)
-            self.optimizer.step()
+                # epoch的最后一个批次不保存：恢复后本epoch没有剩余批次，紧接着的epoch末会保存最佳存档点
+                if (self.checkpoint_interval and self.global_step % self.checkpoint_interval == 0
+                        and idx + 1 < n_batches and self.is_main):
+                    self._save_checkpoint("latest", epoch, self._sampler_state(epoch, resume_position + idx + 1))
+
+            if self.compiled_model is not None:
+                self.compiled_model.stats.record(batch.input_ids.shape[1], time.perf_counter() - step_start, not eager)
 
             progress.set_postfix({
                 "loss": f"{loss.item():.8f}",
                 "lr": f"{self.lr_scheduler.get_last_lr()[0]:.2e}",
                 "dp": f"{self.dp_scheduler.current_dropout}",
+                "step": self.global_step,
             })
 
-        avg_loss = total_loss / len(self.train_loader)
+        # 各rank的平均loss，用于调度决策，需跨rank一致
+        total_loss, n_batches = self._all_reduce(torch.tensor([total_loss, n_batches], dtype=torch.float64)).tolist()
+        avg_loss = total_loss / n_batches
         progress.set_postfix({
             "loss": f"{avg_loss:.8f}",
             "lr": f"{self.lr_scheduler.get_last_lr()[0]:.2e}",
@@ -311,7 +399,8 @@ class Trainer:
         total_loss = 0.0
         all_predictions: list[Tensor] = []
         all_labels: list[Tensor] = []
-        progress: tqdm[BatchedColumnSample] = tqdm(self.val_loader, f"Epoch {epoch}/{self.epochs} [Val]")
+        progress: tqdm[BatchedColumnSample | PackedColumnSample] = tqdm(
+            self.val_loader, f"Epoch {epoch}/{self.epochs} [Val]", disable=not self.is_main)
 
         for batch in progress:
             logits, loss, labels = self._predict(batch)
@@ -328,29 +417,78 @@ class Trainer:
                 "dp": f"{self.dp_scheduler.current_dropout}",
             })
 
-        avg_loss = total_loss / len(self.val_loader)
+        total_loss, n_batches = self._all_reduce(torch.tensor([total_loss, len(self.val_loader)], dtype=torch.float64)).tolist()
+        avg_loss = total_loss / n_batches
         progress.set_postfix({
             "loss": f"{avg_loss:.8f}",
             "lr": f"{self.lr_scheduler.get_last_lr()[0]:.2e}",
             "dp": f"{self.dp_scheduler.current_dropout}",
         })
-        return avg_loss, self.metrics(all_predictions, all_labels)
+        # 各rank只验证自己的分片，汇总统计计数后计算指标
+        counts = self._all_reduce(self.metrics.counts(all_predictions, all_labels))
+        return avg_loss, self.metrics.from_counts(counts)
 
-    def _predict(self, batch: BatchedColumnSample) -> tuple[Tensor, Tensor, Tensor]:
+    def _predict(self, batch: BatchedColumnSample | PackedColumnSample, eager: bool = False) -> tuple[Tensor, Tensor, Tensor]:
         """
         模型预测
-        
+
+        :param eager: 编译模式下是否仍以eager模式运行
         :return tuple[logits, loss, labels]
         """
 
-        input_ids = batch.input_ids.to(self.config.device)
-        attention_masks = batch.attention_masks.to(self.config.device)
         labels = batch.labels.to(self.config.device)
+        model = self.forward_model if eager or self.compiled_model is None else self.compiled_model
+
+        # bf16与fp32的指数范围相同，不需要GradScaler
+        with torch.autocast(self.config.device.type, dtype=torch.bfloat16, enabled=self.config.mixed_precision):
+            logits = model(*model_inputs(batch, self.config.device))
 
-        logits = self.model(input_ids, attention_masks)
+        # 在autocast之外以fp32计算loss，避免bf16下sigmoid与log的精度损失
+        logits = logits.float()
         loss = self.criterion(logits, labels)
         return logits, loss, labels
 
+    def _all_reduce(self, tensor: Tensor) -> Tensor:
+        """分布式训练时跨rank求和，单进程时原样返回"""
+
+        if self.distributed:
+            dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+        return tensor
+
+    def _sampler_state(self, epoch: int, position: int) -> dict | None:
+        """
+        token预算采样器在epoch中已消费position个批次时的迭代状态，其余采样器无状态
+
+        DataLoader的worker会预取批次，采样器自身的position领先于已训练的批次，因此由调用方传入已消费的批次数
+        """
+
+        sampler = self.train_loader.batch_sampler
+        if not isinstance(sampler, TokenBudgetSampler):
+            return None
+        return {**sampler.state_dict(), "epoch": epoch, "position": position}
+
+    def _save_checkpoint(self, kind: str, start_epoch: int, sampler_state: dict | None = None):
+        """
+        :param kind: best为epoch结束时的最佳存档点，latest为epoch内定期保存的最新存档点
+        :param start_epoch: 恢复后开始的epoch，epoch内存档点为当前epoch，配合sampler_state从中断处继续
+        """
+
+        torch.save(
+            {
+                "model_state": self.model.state_dict(),
+                "optimizer_state": self.optimizer.state_dict(),
+                "lr_scheduler_state": self.lr_scheduler.state_dict(),
+                "dp_scheduler_state": self.dp_scheduler.state_dict(),
+                "best_score": self.best_score,
+                "best_epoch": self.best_epoch,
+                "early_stop_count": self.early_stop_count,
+                "start_epoch": start_epoch,
+                "global_step": self.global_step,
+                "sampler_state": sampler_state,
+            },
+            self.checkpoint_dir / f"checkpoint_{self.train_name}_{kind}.pt",
+        )
+
     def _is_best(self, metrics: Metrics, epoch: int) -> bool:
         """判断并更新最佳记录和早停计数"""
 
@@ -358,7 +496,8 @@ class Trainer:
         if improvement > self.config.min_delta:
             if self.early_stop_count > 0:
                 self.logger.info(f"✔️ 早停计数重设 ({epoch})")
-                self.summary.add_text("EarlyStop", f"✔️ 早停计数重设 ({epoch})", epoch)
+                if self.is_main:
+                    self.summary.add_text("EarlyStop", f"✔️ 早停计数重设 ({epoch})", epoch)
 
             self.best_score = metrics.score
             self.best_epoch = epoch
@@ -376,15 +515,16 @@ class Trainer:
                 symbol = "🚨"
 
             self.logger.info(f"{symbol} 接近早停阈值 ({self.early_stop_count}/{self.early_stop_patience})")
-            self.summary.add_text(
-                "EarlyStop",
-                f"{symbol} 接近早停阈值 ({self.early_stop_count}/{self.early_stop_patience})",
-                epoch,
-            )
+            if self.is_main:
+                self.summary.add_text(
+                    "EarlyStop",
+                    f"{symbol} 接近早停阈值 ({self.early_stop_count}/{self.early_stop_patience})",
+                    epoch,
+                )
             return False
 
-    def _record_gradients(self, epoch: int):
-        """记录关键组件的梯度范数到TensorBoard"""
+    def _record_gradients(self, step: int):
+        """记录关键组件的梯度范数到TensorBoard，step为参数更新次数"""
 
         def get_component_group(component: str) -> str:
             """根据参数名称确定所属组件分组"""
@@ -420,7 +560,7 @@ class Trainer:
         for group, norms in grad_groups.items():
             if norms:  # 确保列表不为空
                 avg_norm = sum(norms) / len(norms)
-                self.summary.add_scalar(f"GradNorm/{group}", avg_norm, epoch)
+                self.summary.add_scalar(f"GradNorm/{group}", avg_norm, step)
 
         # 记录全局梯度范数（所有参数）
         total_norm = 0.0
@@ -429,4 +569,4 @@ class Trainer:
                 param_norm = p.grad.norm().item()
                 total_norm += param_norm ** 2
         total_norm = total_norm ** 0.5
-        self.summary.add_scalar("GradNorm/global", total_norm, epoch)
+        self.summary.add_scalar("GradNorm/global", total_norm, step)
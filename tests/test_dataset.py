@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.components.dataset import ColumnDataset, TokenizedColumnDataset, line_offsets
+
+
+class CharTokenizer:
+    """按字符编码的词表，记录被tokenize的文本"""
+
+    vocab_size = 256
+    digest = "char"
+
+    def __init__(self):
+        self.encoded: list[str] = []
+
+    def encode(self, text: str) -> list[int]:
+        return [ord(char) % self.vocab_size for char in text]
+
+    def encode_batch(self, texts: list[str]) -> list[list[int]]:
+        self.encoded.extend(texts)
+        return list(map(self.encode, texts))
+
+
+def write_samples(sample_dir: Path, shards: dict[str, list[str]]):
+    """按sample_generator的布局写入分片、manifest.json与拼接后的samples.txt"""
+
+    (sample_dir / "shards").mkdir(parents=True, exist_ok=True)
+    entries = []
+    for file_name, lines in shards.items():
+        path = sample_dir / "shards" / file_name
+        path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+        entries.append({"file": file_name, "bytes": path.stat().st_size,
+                        "sha256": hashlib.sha256(path.read_bytes()).hexdigest()})
+
+    (sample_dir / "manifest.json").write_text(json.dumps({"shards": entries}), encoding="utf-8")
+    (sample_dir / "samples.txt").write_bytes(b"".join((sample_dir / "shards" / entry["file"]).read_bytes()
+                                                      for entry in entries))
+
+
+@pytest.fixture
+def sample_dir(tmp_path: Path) -> Path:
+    write_samples(tmp_path, {
+        "email.txt": ["EMAIL|mail|a@b.com<sep>c@d.com", "EMAIL|邮箱|x@y.cn"],
+        "phone.txt": ["PHONE|tel|13800138000", "PHONE|手机|13900139000<sep>13700137000", "PHONE|p|1"],
+    })
+    return tmp_path
+
+
+def test_shard_index_matches_full_scan(sample_dir: Path):
+    tokenizer = CharTokenizer()
+    dataset = ColumnDataset(sample_dir / "samples.txt", tokenizer, Config.micro())
+
+    np.testing.assert_array_equal(dataset.offsets, line_offsets(sample_dir / "samples.txt"))
+    lines = (sample_dir / "samples.txt").read_text(encoding="utf-8").splitlines()
+    np.testing.assert_array_equal(dataset.lengths, [len(line.split("|", maxsplit=1)[1]) for line in lines])
+    assert dataset[2].input.tolist() == tokenizer.encode("tel|13800138000")
+
+
+def test_only_changed_shard_is_rebuilt(sample_dir: Path):
+    ColumnDataset(sample_dir / "samples.txt", CharTokenizer(), Config.micro()).lengths
+
+    write_samples(sample_dir, {
+        "email.txt": ["EMAIL|mail|a@b.com<sep>c@d.com", "EMAIL|邮箱|x@y.cn"],
+        "phone.txt": ["PHONE|tel|13600136000"],
+    })
+    tokenizer = CharTokenizer()
+    dataset = ColumnDataset(sample_dir / "samples.txt", tokenizer, Config.micro())
+
+    np.testing.assert_array_equal(dataset.offsets, line_offsets(sample_dir / "samples.txt"))
+    assert len(dataset.lengths) == 3
+    assert tokenizer.encoded == ["tel|13600136000"]
+    # 旧的phone分片索引被清理，每种索引各剩两个分片
+    assert len(list((sample_dir / "samples.index/shards").glob("*.offset.npy"))) == 2
+    assert len(list((sample_dir / "samples.index/shards").glob("*.length.npy"))) == 2
+
+
+def test_tokenized_freshness_follows_manifest(sample_dir: Path):
+    sample_file = sample_dir / "samples.txt"
+    TokenizedColumnDataset(sample_file, CharTokenizer(), Config.micro())
+
+    # 内容不变只更新修改时间时不重新tokenize
+    os.utime(sample_file)
+    tokenizer = CharTokenizer()
+    TokenizedColumnDataset(sample_file, tokenizer, Config.micro())
+    assert tokenizer.encoded == []
+
+    write_samples(sample_dir, {
+        "email.txt": ["EMAIL|mail|e@f.com"],
+        "phone.txt": ["PHONE|tel|13800138000", "PHONE|手机|13900139000<sep>13700137000", "PHONE|p|1"],
+    })
+    os.utime(sample_dir / "samples.tokenized/meta.json")
+    tokenizer = CharTokenizer()
+    dataset = TokenizedColumnDataset(sample_file, tokenizer, Config.micro())
+    assert tokenizer.encoded == ["mail|e@f.com"]
+    assert len(dataset) == 4
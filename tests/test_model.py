@@ -0,0 +1,33 @@
+import pytest
+import torch
+
+from src.tabular_sense.components.config import Config
+from src.tabular_sense.components.model import Model
+
+
+@pytest.fixture
+def model() -> Model:
+    torch.manual_seed(0)
+    config = Config.micro()
+    config.device = torch.device("cpu")
+    return Model(100, config).eval()
+
+
+def test_legacy_attention_masks(model: Model):
+    # [batch, seq_len]，第二行末尾两个位置为padding
+    input_ids = torch.tensor([[5, 6, 7, 8], [5, 6, 0, 0]])
+    padding_masks = torch.tensor([[False, False, False, False], [False, False, True, True]])
+
+    with torch.no_grad():
+        expected = model(input_ids, padding_masks)
+        for attention_masks in ((~padding_masks).long(), (~padding_masks).float()):
+            torch.testing.assert_close(model(input_ids, attention_masks), expected)
+
+
+def test_cls_inclusive_mask(model: Model):
+    input_ids = torch.tensor([[5, 6, 7, 8], [5, 6, 0, 0]])
+    padding_masks = torch.tensor([[False, False, False, False], [False, False, True, True]])
+    cls_masks = torch.cat([torch.zeros(2, 1, dtype=torch.bool), padding_masks], dim=1)
+
+    with torch.no_grad():
+        torch.testing.assert_close(model(input_ids, cls_masks), model(input_ids, padding_masks))
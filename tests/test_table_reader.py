@@ -0,0 +1,31 @@
+import csv
+from pathlib import Path
+
+from src.tabular_sense.components.table_reader import TableReader
+
+
+def test_utf8_bom_header(tmp_path: Path):
+    # Excel导出的CSV以BOM开头
+    path = tmp_path / "users.csv"
+    path.write_text("phone,email\n13800138000,a@b.com\n", encoding="utf-8-sig")
+
+    table = TableReader(path).read(progress=False)
+
+    assert list(table.columns) == ["phone", "email"]
+    assert table.rows == 1
+
+
+def test_oversized_field(tmp_path: Path):
+    path = tmp_path / "notes.csv"
+    path.write_text(f"id,note\n1,\"{'x' * 200 * 1024}\"\n2,short\n", encoding="utf-8")
+    limit = csv.field_size_limit()
+
+    table = TableReader(path).read(progress=False)
+
+    assert table.rows == 2
+    assert len(table.columns["note"]) == 2
+    assert csv.field_size_limit() == limit
+
+
+def test_unique_names():
+    assert TableReader._unique_names(["a", "a.1", "a", " a "]) == ["a", "a.1", "a.2", "a.3"]
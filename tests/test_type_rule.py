@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from src.tabular_sense.core.type_rule import is_bank_card, is_ip
+from src.tabular_sense.core.utils import is_luhn_valid, luhn_checksum
+
+# 公开的测试卡号，均通过标准Luhn校验
+VALID_PANS = ["4111111111111111", "5500000000000004", "4012888888881881", "6011111111111117", "3566002020360505"]
+
+
+@pytest.mark.parametrize("pan", VALID_PANS)
+def test_known_valid_pans(pan: str):
+    assert is_luhn_valid(pan)
+    assert luhn_checksum(pan[:-1]) == int(pan[-1])
+    assert is_bank_card(pan)
+    assert is_bank_card(" ".join(pan[i:i + 4] for i in range(0, len(pan), 4)))
+
+
+@pytest.mark.parametrize("pan", VALID_PANS)
+def test_wrong_check_digit(pan: str):
+    wrong = pan[:-1] + str((int(pan[-1]) + 1) % 10)
+    assert not is_luhn_valid(wrong)
+    assert not is_bank_card(wrong)
+
+
+def test_generated_check_digit_is_valid():
+    # 生成样本时按luhn_checksum补校验位，结果须被is_bank_card接受
+    rng = random.Random(0)
+    for _ in range(2000):
+        payload = "".join(str(rng.randint(0, 9)) for _ in range(rng.randint(15, 18)))
+        assert is_bank_card(payload + str(luhn_checksum(payload)))
+
+
+@pytest.mark.parametrize("value", ["1.2.3.4", "1.2.3.4/0", "10.0.0.0/8", "1.2.3.4/32", "1.2.3.4:8080",
+                                   "::1", "2001:db8::/32", "2001:db8::/128", "[::1]:443"])
+def test_ip_accepted(value: str):
+    assert is_ip(value)
+
+
+@pytest.mark.parametrize("value", ["1.2.3.4/33", "1.2.3.4/99", "2001:db8::/129", "1.2.3.4/", "1.2.3.4/a", "1.2.3"])
+def test_ip_rejected(value: str):
+    assert not is_ip(value)